@@ -0,0 +1,55 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# -------- Settings --------
+AUTOMAP = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts", "automap.py"))
+COMMANDS = {
+    "validate": ["--country", "au"],
+    "pipeline": ["--country", "au"],
+    "patch-abs": [],
+    "reverse-geocode": [],
+    "build-index": ["--country", "au"],
+    "build-au": [],
+}
+# Startup budgets in seconds (interpreter start to subcommand ready) for lightweight commands
+BUDGETS = {"validate": 1.0}
+
+
+def measure(command, repeat=5):
+    """Wall times of fresh `automap --startup-only <command>` processes, plus the last report line"""
+    times, report = [], ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, AUTOMAP, "--startup-only", command, *COMMANDS[command]],
+            capture_output=True, text=True, check=True,
+        )
+        times.append(time.perf_counter() - start)
+        report = done.stdout.strip()
+    return times, report
+
+
+def main(commands, repeat):
+    over_budget = []
+    print(f"{'command':<16} {'min':>7} {'median':>7}  modules")
+    for command in commands:
+        times, report = measure(command, repeat)
+        loaded = report.split("(loaded: ", 1)[-1].rstrip(")")
+        print(f"{command:<16} {min(times):6.2f}s {statistics.median(times):6.2f}s  {loaded}")
+        if command in BUDGETS and statistics.median(times) > BUDGETS[command]:
+            over_budget.append(command)
+    for command in over_budget:
+        print(f"❌ {command} startup is over its {BUDGETS[command]:.1f}s budget")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure automap subcommand startup time")
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="Comma-separated subcommands to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per subcommand")
+    args = parser.parse_args()
+    sys.exit(main([c.strip() for c in args.commands.split(",") if c.strip()], args.repeat))
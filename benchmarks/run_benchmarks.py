@@ -0,0 +1,231 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+from scripts.boundary_index import BoundaryIndex
+from scripts.join_geocoded_with_region_fallback import assign_regions, nearest_region_fallback
+from scripts.pipeline import map_regions
+from scripts.synthetic_data import misspell, synthetic_boundaries, synthetic_reference, synthetic_suburbs
+from scripts.table_io import write_table
+from scripts.validate_mapping import validate_output
+from streamlit_app.dashboard_index import DashboardIndex
+
+# -------- Settings --------
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BENCH_COUNTRY = "bench"
+MISSPELLED_FRACTION = 0.05
+UNKNOWN_FRACTION = 0.02
+DEFAULT_THRESHOLD = 1.25
+GRID_RESOLUTION = 0.05
+
+
+# -------- Dataset --------
+def make_dataset(points, polygons, workdir):
+    """Synthetic boundaries, geocoded suburbs and a SAL-style reference at the requested scale"""
+    boundaries = synthetic_boundaries(polygons)
+    index = BoundaryIndex(boundaries.geometry.values, boundaries.drop(columns="geometry"), "region",
+                          grid_resolution=GRID_RESOLUTION)
+    suburbs = synthetic_suburbs(points)
+    reference = synthetic_reference(suburbs, index)
+
+    geocoded = suburbs.copy()
+    geocoded["suburb"] = misspell(geocoded["suburb"], MISSPELLED_FRACTION)
+    unknown = np.random.default_rng(3).random(points) < UNKNOWN_FRACTION
+    geocoded.loc[unknown, "suburb"] = "Nowhere " + geocoded.index[unknown].astype(str)
+
+    return {
+        "boundaries": boundaries,
+        "index": index,
+        "suburbs": suburbs,
+        "reference": reference,
+        "geocoded": geocoded,
+        "workdir": workdir,
+    }
+
+
+# -------- Stages --------
+# Each stage takes the dataset and returns a zero-argument callable to time; setup cost
+# (including earlier stages it depends on) stays outside the timing.
+def stage_index_build(data):
+    boundaries = data["boundaries"]
+
+    def run():
+        index = BoundaryIndex(boundaries.geometry.values, boundaries.drop(columns="geometry"), "region",
+                              grid_resolution=GRID_RESOLUTION)
+        index.locate([0.0], [0.0])  # the STRtree is built lazily on first query
+    return run
+
+
+def stage_pipeline_sjoin(data):
+    return lambda: map_regions(data["suburbs"], data["index"], {"region_field": "region"})
+
+
+def stage_fuzzy_match(data):
+    return lambda: assign_regions(data["geocoded"], data["reference"])
+
+
+def stage_kdtree_fallback(data):
+    assigned = assign_regions(data["geocoded"], data["reference"])
+    cache_path = os.path.join(data["workdir"], "nearest_region.pkl")
+    return lambda: nearest_region_fallback(assigned, data["reference"], cache_path=cache_path)
+
+
+def stage_validate_mapping(data):
+    output_file = os.path.join(data["workdir"], "output.parquet")
+    write_table(map_regions(data["suburbs"], data["index"], {"region_field": "region"}), output_file)
+    COUNTRY_CONFIG[BENCH_COUNTRY] = {"name": "Benchmark", "output_file": output_file}
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            validate_output(BENCH_COUNTRY)
+    return run
+
+
+def stage_dashboard_index(data):
+    mapped = map_regions(data["suburbs"], data["index"], {"region_field": "region"})
+    return lambda: DashboardIndex(mapped)
+
+
+def stage_dashboard_filter(data):
+    index = DashboardIndex(map_regions(data["suburbs"], data["index"], {"region_field": "region"}))
+    state, region = index.state_options()[0], index.region_options()[0]
+    queries = [
+        {"state": state}, {"region": region}, {"suburb_query": "mar"}, {"suburb_query": "ba"},
+        {"state": state, "suburb_query": "ton"}, {"state": state, "region": region, "suburb_query": "wil"},
+    ]
+    return lambda: [index.filter(**query) for query in queries]
+
+
+# Stages whose throughput is measured in polygons rather than points
+POLYGON_STAGES = {"index_build"}
+
+STAGES = {
+    "index_build": stage_index_build,
+    "pipeline_sjoin": stage_pipeline_sjoin,
+    "fuzzy_match": stage_fuzzy_match,
+    "kdtree_fallback": stage_kdtree_fallback,
+    "validate_mapping": stage_validate_mapping,
+    "dashboard_index": stage_dashboard_index,
+    "dashboard_filter": stage_dashboard_filter,
+}
+
+
+# -------- Runner --------
+def time_stage(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(points_list, polygons_list, stages=None, repeat=3):
+    """Time every stage at every (points, polygons) scale and return a JSON-ready report"""
+    stages = stages or list(STAGES)
+    results = []
+    try:
+        for polygons in polygons_list:
+            for points in points_list:
+                with tempfile.TemporaryDirectory() as workdir:
+                    data = make_dataset(points, polygons, workdir)
+                    for stage in stages:
+                        samples = time_stage(STAGES[stage](data), repeat)
+                        best = min(samples)
+                        rows = polygons if stage in POLYGON_STAGES else points
+                        results.append({
+                            "stage": stage,
+                            "points": points,
+                            "polygons": polygons,
+                            "seconds_min": round(best, 6),
+                            "seconds_median": round(statistics.median(samples), 6),
+                            "rows": rows,
+                            "rows_per_s": round(rows / best, 1) if best else None,
+                        })
+                        print(f"⏱️ {stage:<18} {points:>10,} pts {polygons:>7,} polys  "
+                              f"{best * 1000:10.1f} ms  ({rows / best:,.0f} rows/s)")
+    finally:
+        # stage_validate_mapping registers a temporary country; never leave it behind
+        COUNTRY_CONFIG.pop(BENCH_COUNTRY, None)
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Stages at least `threshold` times slower than the baseline (matched on stage and scale)"""
+    key = lambda r: (r["stage"], r["points"], r["polygons"])
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(key(result))
+        if not before or not before["seconds_min"]:
+            continue
+        ratio = result["seconds_min"] / before["seconds_min"]
+        flag = "🐢" if ratio >= threshold else "✅"
+        print(f"{flag} {result['stage']:<18} {result['points']:>10,} pts {result['polygons']:>7,} polys  "
+              f"{ratio:5.2f}x vs {baseline.get('commit') or 'baseline'}")
+        if ratio >= threshold:
+            regressions.append({**result, "baseline_seconds_min": before["seconds_min"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def parse_sizes(text):
+    return [int(float(size)) for size in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data (runs offline)")
+    parser.add_argument("--points", type=parse_sizes, default=[10_000], help="Comma-separated point counts, e.g. 1e4,1e5,1e6")
+    parser.add_argument("--polygons", type=parse_sizes, default=[100], help="Comma-separated polygon counts, e.g. 100,5000")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None, help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best and median are recorded)")
+    parser.add_argument("--output", default=None, help="Results JSON path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    report = run_suite(args.points, args.polygons, args.stages, args.repeat)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit'] or 'nocommit'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} stage(s) regressed by {args.threshold}x or more")
+            sys.exit(1)
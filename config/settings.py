@@ -1,22 +1,38 @@
+# Default format for pipeline outputs: "parquet", "feather" or "csv" (CSV is kept for exports)
+OUTPUT_FORMAT = "parquet"
+OUTPUT_FORMATS = ("parquet", "feather", "csv")
+
+# bbox: (min_lon, min_lat, max_lon, max_lat) used by QA to flag coordinates outside the country.
+# grid_resolution: cell size in degrees of the precomputed region lookup grid (None disables it).
+# Finer grids resolve more points without polygon tests but take longer to build and more memory.
+# boundary_columns: extra boundary attributes carried into the output besides region_field (default none).
+
 COUNTRY_CONFIG = {
     "au": {
         "name": "Australia",
         "input_file": "countries/au/final_output_fully_patched.csv",
         "boundary_file": "countries/au/boundaries/SA4_2021_AUST_GDA2020.shp",
-        "output_file": "countries/au/output.csv"
+        "output_file": "countries/au/output.csv",
+        "region_field": "SA4_NAME21",
+        "grid_resolution": 0.05,
+        "bbox": (110.0, -44.0, 155.0, -10.0)
     },
     "nz": {
         "name": "New Zealand",
         "input_file": "countries/nz/source.csv",
         "output_file": "countries/nz/output.csv",
         "boundary_file": "countries/nz/boundaries/nz-suburbs-and-localities.shp",
-        "region_field": "territoria"
+        "region_field": "territoria",
+        "grid_resolution": 0.02,
+        "bbox": (165.8, -47.5, 178.7, -34.0)
     },
     "in": {
         "name": "India",
         "input_file": "countries/in/source.csv",
         "output_file": "countries/in/output.csv",
         "boundary_file": "countries/in/boundaries/india-districts.shp",
-        "region_field": "DISTRICT"
+        "region_field": "DISTRICT",
+        "grid_resolution": 0.05,
+        "bbox": (68.0, 6.5, 97.5, 37.5)
     }
 }
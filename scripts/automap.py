@@ -0,0 +1,133 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+START = time.perf_counter()
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT, OUTPUT_FORMATS
+
+# Only argparse and config are loaded up front. Each subcommand imports its own module when it
+# runs, so `validate` never pays for geopandas and `--help` imports nothing heavy.
+HEAVY_MODULES = ("pandas", "pyarrow", "shapely", "geopandas", "pyogrio", "scipy", "rapidfuzz", "requests")
+
+
+# -------- Subcommands --------
+def _pipeline(pipeline, args):
+    pipeline_kwargs = dict(rebuild_index=args.rebuild_index, chunksize=args.chunksize, workers=args.workers,
+                           full=args.full, output_format=args.format, profile=args.profile,
+                           clip_boundaries=args.clip_boundaries)
+    countries = pipeline.parse_countries(args.country)
+    if len(countries) == 1:
+        pipeline.run_pipeline(countries[0], **pipeline_kwargs)
+        return 0
+    summary = pipeline.run_countries(countries, jobs=args.jobs, **pipeline_kwargs)
+    return 1 if any(run["status"] != "ok" for run in summary["countries"]) else 0
+
+
+def _validate(validate_mapping, args):
+    validate_mapping.validate_output(args.country.lower())
+
+
+def _patch_abs(patch_using_abs_boundaries, args):
+    patch_using_abs_boundaries.main(output_format=args.format)
+
+
+def _reverse_geocode(reverse_geocode_region, args):
+    endpoint = {"endpoint": args.endpoint} if args.endpoint else {}
+    reverse_geocode_region.main(rate=args.rate, concurrency=args.concurrency, output_format=args.format, **endpoint)
+
+
+def _build_index(boundary_index, args):
+    boundary_index.prebuild_indexes(args.country, rebuild=args.rebuild)
+
+
+def _build_au(build_au, args):
+    endpoint = {"endpoint": args.endpoint} if args.endpoint else {}
+    build_au.main(target=args.target, exports=args.export, force=args.force, workers=args.workers,
+                  output_format=args.format, mode=args.mode, join_workers=args.join_workers, rate=args.rate,
+                  concurrency=args.concurrency, prune=args.prune, **endpoint)
+
+
+# name → (module imported on demand, handler, help)
+COMMANDS = {
+    "pipeline": ("scripts.pipeline", _pipeline, "Country-aware suburb-to-region mapping"),
+    "validate": ("scripts.validate_mapping", _validate, "Cross-country QA validation"),
+    "patch-abs": ("scripts.patch_using_abs_boundaries", _patch_abs, "Correct regions using official ABS SA4 boundaries"),
+    "reverse-geocode": ("scripts.reverse_geocode_region", _reverse_geocode, "Reverse geocode suburbs to county/district/state"),
+    "build-index": ("scripts.boundary_index", _build_index, "Prebuild boundary indexes for fast pipeline runs"),
+    "build-au": ("scripts.build_au", _build_au, "Build the AU SAL → SA4 chain as a cached DAG"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="automap", description="AutoMap360 suburb-to-region tools")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="Parse arguments and import the subcommand, print the startup time and exit")
+    sub = parser.add_subparsers(dest="command", required=True)
+    commands = {name: sub.add_parser(name, help=help_text, description=help_text)
+                for name, (_, _, help_text) in COMMANDS.items()}
+
+    p = commands["pipeline"]
+    p.add_argument("--country", required=True, help="Country code (au, nz, in), a comma-separated list, or 'all'")
+    p.add_argument("--jobs", type=int, default=None, help="Countries to run at once (default: one process per country); --workers is split between them")
+    p.add_argument("--rebuild-index", action="store_true", help="Force a rebuild of the boundary index")
+    p.add_argument("--chunksize", type=int, default=None, help="Stream the input in chunks of N rows")
+    p.add_argument("--workers", type=int, default=1, help="Join partitions on N worker processes")
+    p.add_argument("--full", action="store_true", help="Ignore the run manifest and re-map every row")
+    p.add_argument("--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT, help="Output file format")
+    p.add_argument("--profile", action="store_true",
+                   help="cProfile the spatial join stage into qa_logs/ (profile with --workers 1 to see the join itself)")
+    p.add_argument("--clip-boundaries", action="store_true",
+                   help="Read only the boundary polygons around the input's extent (e.g. single-state runs)")
+
+    commands["validate"].add_argument("--country", required=True, help="Country code (au, nz, in)")
+
+    commands["patch-abs"].add_argument("--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT, help="Output file format")
+
+    p = commands["reverse-geocode"]
+    p.add_argument("--endpoint", default=None, help="Nominatim reverse endpoint (default: public Nominatim)")
+    p.add_argument("--rate", type=float, default=None, help="Requests per second (default: per-endpoint limit)")
+    p.add_argument("--concurrency", type=int, default=1, help="Concurrent requests in flight")
+    p.add_argument("--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT, help="Output file format")
+
+    p = commands["build-index"]
+    p.add_argument("--country", required=True, help="Country code (au, nz, in) or 'all'")
+    p.add_argument("--rebuild", action="store_true", help="Rebuild even if the boundary file is unchanged")
+
+    stages = ["sal_to_sa4", "enriched", "geo_fallback", "abs_patched", "nominatim_patched"]
+    p = commands["build-au"]
+    p.add_argument("--target", choices=stages, default="nominatim_patched",
+                   help="Last stage to build (abs_patched needs no network)")
+    p.add_argument("--export", nargs="+", choices=stages, default=None,
+                   help="Stages written to their usual data/ or output/ file (default: the target)")
+    p.add_argument("--force", nargs="+", choices=stages, default=(),
+                   help="Rerun these stages and everything after them even if their inputs are unchanged")
+    p.add_argument("--workers", type=int, default=4, help="Independent stages run at once")
+    p.add_argument("--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT, help="Output file format")
+    p.add_argument("--mode", choices=["fast", "within"], default="fast", help="SAL → SA4 assignment mode")
+    p.add_argument("--join-workers", type=int, default=1, help="Worker processes for the SAL → SA4 assignment")
+    p.add_argument("--endpoint", default=None, help="Nominatim reverse endpoint (default: public Nominatim)")
+    p.add_argument("--rate", type=float, default=None, help="Requests per second (default: per-endpoint limit)")
+    p.add_argument("--concurrency", type=int, default=1, help="Concurrent requests in flight")
+    p.add_argument("--prune", action="store_true", help="Delete cached artifacts the current build no longer uses")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    module_name, handler, _ = COMMANDS[args.command]
+    module = importlib.import_module(module_name)
+    if args.startup_only:
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"⏱️ automap {args.command}: ready in {time.perf_counter() - START:.3f}s "
+              f"(loaded: {', '.join(loaded) or 'none'})")
+        return 0
+    return handler(module, args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
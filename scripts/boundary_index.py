@@ -0,0 +1,462 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import shapely
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+
+# geopandas, pyogrio and pyproj are only needed to (re)build an index from the boundary file, so they
+# are imported inside those functions; loading a prebuilt index needs numpy, pandas and shapely only
+
+# -------- Settings --------
+INDEX_DIR = "cache/boundary_index"
+INDEX_CRS = "EPSG:4326"
+INDEX_VERSION = 3
+SHAPEFILE_PARTS = (".shp", ".shx", ".dbf", ".prj", ".cpg")
+HASH_CHUNK_SIZE = 1 << 20
+GRID_ROOT_CELLS = 16
+GRID_BATCH_CELLS = 100_000
+BOUNDS_SUFFIX = ".bounds.npz"
+EXTENT_MARGIN_DEG = 0.1
+
+
+# -------- Source Fingerprints --------
+def boundary_source_files(boundary_path):
+    """List the files that make up a boundary source (all shapefile parts for .shp)"""
+    root, ext = os.path.splitext(boundary_path)
+    if ext.lower() != ".shp":
+        return [boundary_path]
+    return [root + part for part in SHAPEFILE_PARTS if os.path.exists(root + part)]
+
+
+def boundary_signature(boundary_path):
+    """Cheap (name, size, mtime) signature used to skip re-hashing unchanged files"""
+    return tuple(
+        (os.path.basename(path), os.path.getsize(path), os.path.getmtime(path))
+        for path in boundary_source_files(boundary_path)
+    )
+
+
+def hash_boundary_file(boundary_path):
+    """SHA-256 content hash over every part of the boundary source"""
+    digest = hashlib.sha256()
+    for path in boundary_source_files(boundary_path):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_path(country_code):
+    return os.path.join(INDEX_DIR, f"{country_code}.pkl")
+
+
+def boundary_columns(config):
+    """Attribute columns a country needs from its boundary file: region_field plus any boundary_columns"""
+    region_field = config.get("region_field")
+    return [region_field] + [c for c in config.get("boundary_columns", []) if c != region_field]
+
+
+# -------- Partial Reads --------
+def bounds_path(boundary_path):
+    return os.path.splitext(boundary_path)[0] + BOUNDS_SUFFIX
+
+
+def read_feature_bounds(boundary_path):
+    """
+    Per-feature bounding boxes (in the file's CRS) from a sidecar next to the boundary file,
+    rebuilt when the file signature changes. The sidecar also keeps the content hash, so partial
+    reads do not have to hash the whole file again.
+    """
+    path = bounds_path(boundary_path)
+    signature = json.dumps(boundary_signature(boundary_path))
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            meta = json.loads(str(cached["meta"]))
+            if meta["signature"] == signature:
+                return {"fids": cached["fids"], "bounds": cached["bounds"], **meta}
+
+    import pyogrio
+
+    print(f"🔄 Indexing feature bounds of {boundary_path}")
+    fids, bounds = pyogrio.read_bounds(boundary_path)
+    meta = {
+        "signature": signature,
+        "source_hash": hash_boundary_file(boundary_path),
+        "crs": pyogrio.read_info(boundary_path)["crs"],
+    }
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, fids=fids, bounds=bounds.T, meta=json.dumps(meta))
+    os.replace(tmp_path, path)
+    return {"fids": fids, "bounds": bounds.T, **meta}
+
+
+def input_extent(lon, lat, margin=EXTENT_MARGIN_DEG):
+    """(min_lon, min_lat, max_lon, max_lat) of the valid input coordinates plus `margin` degrees"""
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    valid = np.isfinite(lon) & np.isfinite(lat)
+    if not valid.any():
+        return None
+    return (
+        max(lon[valid].min() - margin, -180.0), max(lat[valid].min() - margin, -90.0),
+        min(lon[valid].max() + margin, 180.0), min(lat[valid].max() + margin, 90.0),
+    )
+
+
+def read_boundaries(boundary_path, bbox=None, columns=None):
+    """
+    Read a boundary file, optionally only the features whose bounds intersect `bbox`
+    (EPSG:4326 degrees) and only the given attribute `columns`.
+    """
+    import geopandas as gpd
+    from pyproj import CRS, Transformer
+
+    if bbox is None:
+        return gpd.read_file(boundary_path, columns=columns)
+
+    feature_bounds = read_feature_bounds(boundary_path)
+    crs = CRS.from_user_input(feature_bounds["crs"]) if feature_bounds["crs"] else CRS.from_user_input(INDEX_CRS)
+    min_x, min_y, max_x, max_y = Transformer.from_crs(INDEX_CRS, crs, always_xy=True).transform_bounds(
+        *bbox, densify_pts=21
+    )
+    b = feature_bounds["bounds"]
+    hit = (b[:, 0] <= max_x) & (b[:, 2] >= min_x) & (b[:, 1] <= max_y) & (b[:, 3] >= min_y)
+    fids = feature_bounds["fids"][hit]
+    if not len(fids):
+        # An empty fid list would read every feature, so read one and drop it to keep the schema
+        return gpd.read_file(boundary_path, columns=columns, max_features=1).iloc[:0]
+    return gpd.read_file(boundary_path, columns=columns, fids=fids)
+
+
+# -------- Grid Lookup --------
+class GridLookup:
+    """
+    Regular grid over the boundary extent storing, per cell, the one polygon that contains the
+    whole cell, -1 when the cell touches no polygon, or BORDER when points in it need the exact test.
+
+    Built as a quadtree: coarse blocks that are fully inside one polygon (or outside all of them)
+    are filled in one go, and only blocks crossing a boundary are split further.
+    """
+
+    OUTSIDE = -1
+    BORDER = -2
+
+    def __init__(self, geometries, tree, resolution):
+        self.resolution = resolution
+        self.minx, self.miny, maxx, maxy = shapely.total_bounds(geometries)
+        self.nx = max(int(np.ceil((maxx - self.minx) / resolution)), 1)
+        self.ny = max(int(np.ceil((maxy - self.miny) / resolution)), 1)
+        self.codes = np.full((self.ny, self.nx), self.OUTSIDE, dtype=np.int32)
+
+        level = max(int(np.ceil(np.log2(max(self.nx, self.ny) / GRID_ROOT_CELLS))), 0)
+        size = 1 << level
+        cy, cx = np.divmod(np.arange(-(-self.ny // size) * -(-self.nx // size)), -(-self.nx // size))
+        while len(cx):
+            size = 1 << level
+            codes = self._classify(geometries, tree, cx, cy, size)
+            if level == 0:
+                self.codes[cy, cx] = codes
+                break
+            for x, y, code in zip(cx[codes != self.BORDER], cy[codes != self.BORDER], codes[codes != self.BORDER]):
+                self.codes[y * size:(y + 1) * size, x * size:(x + 1) * size] = code
+
+            # Split border blocks into their four children that still overlap the grid
+            split = codes == self.BORDER
+            cx = (cx[split][:, None] * 2 + np.array([0, 1, 0, 1])).ravel()
+            cy = (cy[split][:, None] * 2 + np.array([0, 0, 1, 1])).ravel()
+            level -= 1
+            keep = (cx << level < self.nx) & (cy << level < self.ny)
+            cx, cy = cx[keep], cy[keep]
+
+    def _classify(self, geometries, tree, cx, cy, size):
+        """Polygon position, OUTSIDE or BORDER for blocks of `size`×`size` cells"""
+        codes = np.empty(len(cx), dtype=np.int32)
+        # Blocks are tested as slightly enlarged closed boxes, so a point that rounds into a
+        # neighbouring cell is still covered by that cell's answer
+        eps = self.resolution * 1e-6
+        step = size * self.resolution
+        for start in range(0, len(cx), GRID_BATCH_CELLS):
+            x0 = self.minx + cx[start:start + GRID_BATCH_CELLS] * step
+            y0 = self.miny + cy[start:start + GRID_BATCH_CELLS] * step
+            boxes = shapely.box(x0 - eps, y0 - eps, x0 + step + eps, y0 + step + eps)
+            cell_idx, poly_idx = tree.query(boxes, predicate="intersects")
+            counts = np.bincount(cell_idx, minlength=len(boxes))
+            batch = np.where(counts > 0, self.BORDER, self.OUTSIDE).astype(np.int32)
+
+            # Overlapping polygons must all be reported, so only single-polygon blocks shortcut
+            single = counts[cell_idx] == 1
+            cell_idx, poly_idx = cell_idx[single], poly_idx[single]
+            inside = shapely.contains_properly(geometries[poly_idx], boxes[cell_idx])
+            batch[cell_idx[inside]] = poly_idx[inside]
+            codes[start:start + len(boxes)] = batch
+        return codes
+
+    @property
+    def resolved_share(self):
+        """Share of cells answered without any polygon test"""
+        return float((self.codes != self.BORDER).mean())
+
+    def lookup(self, lon, lat):
+        """Polygon position, OUTSIDE, or BORDER per point, by index arithmetic only"""
+        ix = np.floor((lon - self.minx) / self.resolution)
+        iy = np.floor((lat - self.miny) / self.resolution)
+        on_grid = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        codes = np.full(len(lon), self.OUTSIDE, dtype=np.int64)
+        codes[~(np.isfinite(lon) & np.isfinite(lat))] = self.BORDER  # let the exact test decide
+        codes[on_grid] = self.codes[iy[on_grid].astype(np.int64), ix[on_grid].astype(np.int64)]
+        return codes
+
+
+# -------- Index --------
+class BoundaryIndex:
+    """Pre-projected boundary polygons with prepared geometries, an STRtree and an optional grid lookup"""
+
+    def __init__(self, geometries, attributes, region_field, source_hash=None, source_signature=None,
+                 grid_resolution=None, columns=None, extent=None):
+        self.version = INDEX_VERSION
+        self.crs = INDEX_CRS
+        self.geometries = geometries
+        self.attributes = attributes.reset_index(drop=True)
+        self.region_field = region_field
+        self.source_hash = source_hash
+        self.source_signature = source_signature
+        self.columns = columns  # attribute columns read from the source (None: all of them)
+        self.extent = extent  # bbox the polygons were clipped to on read (None: the whole file)
+        self.tree = shapely.STRtree(self.geometries)
+        shapely.prepare(self.geometries)
+        self.grid = None
+        self.build_grid(grid_resolution)
+
+    def build_grid(self, resolution):
+        """(Re)build the grid lookup at `resolution` degrees; None disables it"""
+        self.grid = GridLookup(self.geometries, self.tree, resolution) if resolution and len(self) else None
+
+    @property
+    def grid_resolution(self):
+        return self.grid.resolution if self.grid is not None else None
+
+    def __setstate__(self, state):
+        # Prepared geometries do not survive pickling, so re-prepare on load
+        self.__dict__.update(state)
+        shapely.prepare(self.geometries)
+
+    def __len__(self):
+        return len(self.geometries)
+
+    @property
+    def regions(self):
+        return self.attributes[self.region_field].to_numpy()
+
+    def _query_exact(self, lon, lat):
+        points = shapely.points(lon, lat)
+        point_idx, poly_idx = self.tree.query(points)
+        inside = shapely.contains_xy(self.geometries[poly_idx], lon[point_idx], lat[point_idx])
+        return point_idx[inside], poly_idx[inside]
+
+    def query(self, lon, lat):
+        """Return (point_position, polygon_position) pairs for points within polygons"""
+        lon = np.asarray(lon, dtype="float64")
+        lat = np.asarray(lat, dtype="float64")
+        if self.grid is None:
+            point_idx, poly_idx = self._query_exact(lon, lat)
+        else:
+            # Interior cells answer directly; only points in border cells hit the polygons
+            codes = self.grid.lookup(lon, lat)
+            direct = np.flatnonzero(codes >= 0)
+            border = np.flatnonzero(codes == GridLookup.BORDER)
+            border_idx, border_poly = self._query_exact(lon[border], lat[border])
+            point_idx = np.concatenate([direct, border[border_idx]])
+            poly_idx = np.concatenate([codes[direct], border_poly])
+        order = np.lexsort((poly_idx, point_idx))
+        return point_idx[order], poly_idx[order]
+
+    def locate(self, lon, lat):
+        """First containing polygon position per point (-1 when outside every polygon)"""
+        point_idx, poly_idx = self.query(lon, lat)
+        positions = np.full(np.size(lon), -1, dtype=np.int64)
+        first = np.r_[True, point_idx[1:] != point_idx[:-1]] if len(point_idx) else np.zeros(0, dtype=bool)
+        positions[point_idx[first]] = poly_idx[first]
+        return positions
+
+    def locate_point(self, lon, lat):
+        """Single-point fast path for locate() without array set-up"""
+        if self.grid is not None:
+            code = int(self.grid.lookup(np.array([lon], dtype="float64"), np.array([lat], dtype="float64"))[0])
+            if code != GridLookup.BORDER:
+                return code
+        for poly in sorted(self.tree.query(shapely.Point(lon, lat))):
+            if shapely.contains_xy(self.geometries[poly], lon, lat):
+                return int(poly)
+        return -1
+
+    def join(self, df, lon_col="longitude", lat_col="latitude"):
+        """Left point-in-polygon join with the same column layout as gpd.sjoin(how="left")"""
+        point_idx, poly_idx = self.query(df[lon_col].to_numpy(), df[lat_col].to_numpy())
+
+        unmatched = np.ones(len(df), dtype=bool)
+        unmatched[point_idx] = False
+        unmatched_idx = np.flatnonzero(unmatched)
+        left_pos = np.concatenate([point_idx, unmatched_idx])
+        right_pos = np.concatenate([poly_idx, np.full(len(unmatched_idx), -1)])
+        order = np.argsort(left_pos, kind="stable")
+        left_pos, right_pos = left_pos[order], right_pos[order]
+
+        overlap = set(df.columns) & set(self.attributes.columns)
+        left = df.iloc[left_pos].rename(columns={c: f"{c}_left" for c in overlap})
+        right = self.attributes.reindex(right_pos).rename(columns={c: f"{c}_right" for c in overlap})
+        right.index = left.index
+        index_right = pd.Series(np.where(right_pos >= 0, right_pos, np.nan), index=left.index, name="index_right")
+        return pd.concat([left, index_right, right], axis=1)
+
+
+# -------- Build / Load --------
+def build_index(boundary_path, region_field, grid_resolution=None, columns=None, bbox=None):
+    """
+    Read a boundary file once and turn it into a BoundaryIndex. `columns` limits the attribute
+    columns read; `bbox` (EPSG:4326) limits the polygons to those that may contain points inside it.
+    """
+    import pyogrio
+
+    if not region_field:
+        raise ValueError(f"❌ No region_field configured for {boundary_path}")
+
+    fields = list(pyogrio.read_info(boundary_path)["fields"])
+    if region_field not in fields:
+        raise ValueError(f"❌ Region field '{region_field}' not found in {boundary_path}")
+    missing = [c for c in columns or [] if c not in fields]
+    if missing:
+        raise ValueError(f"❌ Boundary columns {missing} not found in {boundary_path}")
+
+    boundary_gdf = read_boundaries(boundary_path, bbox=bbox, columns=columns)
+    if "index_right" in boundary_gdf.columns:
+        boundary_gdf = boundary_gdf.drop(columns=["index_right"])
+
+    boundary_gdf = boundary_gdf.to_crs(INDEX_CRS)
+    attributes = pd.DataFrame(boundary_gdf.drop(columns=boundary_gdf.geometry.name))
+    # Clipped reads take the hash from the bounds sidecar instead of re-reading the whole file
+    source_hash = hash_boundary_file(boundary_path) if bbox is None else read_feature_bounds(boundary_path)["source_hash"]
+    return BoundaryIndex(
+        geometries=np.asarray(boundary_gdf.geometry.values, dtype=object),
+        attributes=attributes,
+        region_field=region_field,
+        source_hash=source_hash,
+        source_signature=boundary_signature(boundary_path),
+        grid_resolution=grid_resolution,
+        columns=columns,
+        extent=bbox,
+    )
+
+
+def save_index(index, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_index(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def describe_grid(index):
+    grid = index.grid
+    if grid is None:
+        return "no grid lookup"
+    return (f"{grid.resolution}° grid {grid.nx}×{grid.ny}, "
+            f"{grid.resolved_share:.0%} of cells resolved without polygon tests")
+
+
+def load_or_build_index(boundary_path, region_field, path, rebuild=False, grid_resolution=None, columns=None):
+    """Load the artifact at `path`, rebuilding it only when the boundary source or columns changed"""
+    index = None
+    if not rebuild and os.path.exists(path):
+        cached = read_index(path)
+        usable = (
+            getattr(cached, "version", None) == INDEX_VERSION
+            and cached.region_field == region_field
+            and cached.columns == columns
+        )
+        if usable and not os.path.exists(boundary_path):
+            print(f"⚠️ {boundary_path} not found, using prebuilt index {path}")
+            index = cached
+        elif usable and cached.source_signature == boundary_signature(boundary_path):
+            index = cached
+        elif usable and cached.source_hash == hash_boundary_file(boundary_path):
+            # Content unchanged (e.g. file was touched or copied), refresh the cheap signature
+            cached.source_signature = boundary_signature(boundary_path)
+            save_index(cached, path)
+            index = cached
+
+    if index is None:
+        print(f"🔄 Building boundary index from {boundary_path}")
+        index = build_index(boundary_path, region_field, grid_resolution, columns=columns)
+        save_index(index, path)
+        print(f"✅ Boundary index saved to {path} ({len(index)} polygons, {describe_grid(index)})")
+    elif index.grid_resolution != grid_resolution:
+        # Only the grid depends on the configured resolution, the polygons are reused
+        print(f"🔄 Rebuilding grid lookup for {path} at {grid_resolution}°")
+        index.build_grid(grid_resolution)
+        save_index(index, path)
+        print(f"✅ Grid lookup saved ({describe_grid(index)})")
+    return index
+
+
+def load_index(country_code, rebuild=False):
+    config = COUNTRY_CONFIG.get(country_code)
+    if not config:
+        raise ValueError(f"❌ Unsupported country code: {country_code}")
+    return load_or_build_index(
+        config["boundary_file"], config.get("region_field"), index_path(country_code), rebuild=rebuild,
+        grid_resolution=config.get("grid_resolution"), columns=boundary_columns(config),
+    )
+
+
+def load_clipped_index(country_code, lon, lat, margin=EXTENT_MARGIN_DEG):
+    """
+    Index of only the polygons around the input points, read straight from the boundary file.
+    Joins give the same answers as the full index for these points; it is not persisted.
+    """
+    config = COUNTRY_CONFIG.get(country_code)
+    if not config:
+        raise ValueError(f"❌ Unsupported country code: {country_code}")
+    bbox = input_extent(lon, lat, margin)
+    if bbox is None:
+        print("⚠️ No valid input coordinates, loading the full boundary index")
+        return load_index(country_code)
+
+    index = build_index(
+        config["boundary_file"], config.get("region_field"), config.get("grid_resolution"),
+        columns=boundary_columns(config), bbox=bbox,
+    )
+    total = len(read_feature_bounds(config["boundary_file"])["fids"])
+    extent = ", ".join(f"{v:.2f}" for v in bbox)
+    print(f"✂️ Loaded {len(index)} of {total} polygons intersecting the input extent ({extent})")
+    return index
+
+
+def prebuild_indexes(country, rebuild=False):
+    """Build (or verify) the index for one country code or 'all'"""
+    countries = list(COUNTRY_CONFIG) if country.lower() == "all" else [country.lower()]
+    for code in countries:
+        start = time.perf_counter()
+        index = load_index(code, rebuild=rebuild)
+        print(f"🌍 {COUNTRY_CONFIG[code]['name']}: {len(index)} polygons ready in {time.perf_counter() - start:.2f}s "
+              f"({describe_grid(index)})")
+
+
+if __name__ == "__main__":
+    # Arguments live in the unified CLI: `python scripts/automap.py build-index ...`
+    from scripts.automap import main
+    sys.exit(main(["build-index", *sys.argv[1:]]))
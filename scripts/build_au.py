@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT
+from scripts import (
+    boundary_index,
+    enrich_sal_to_sa4_with_latlon as enrich,
+    geocode_worker,
+    join_geocoded_with_region_fallback as geo_fallback,
+    nearest_region,
+    patch_missing_regions_via_nominatim as nominatim,
+    patch_using_abs_boundaries as abs_patch,
+    qa_engine,
+    region_matcher,
+    region_patches,
+    schema,
+    spatial_join_sal_to_sa4 as sal_join,
+    table_io,
+)
+from scripts.dag import DEFAULT_WORKERS, DagRunner, Stage
+from scripts.geocode_worker import NOMINATIM_URL
+from scripts.schema import STORED_COORDINATE_DTYPE, apply_schema
+from scripts.table_io import find_table, read_table, with_format, write_table
+
+# -------- Settings --------
+FINAL_STAGE = "nominatim_patched"
+
+# Stage → file the hand-run chain wrote; `--export` writes a stage's frame there
+EXPORTS = {
+    "sal_to_sa4": sal_join.output_path,
+    "enriched": enrich.output_path,
+    "geo_fallback": geo_fallback.output_path,
+    "abs_patched": abs_patch.OUTPUT_PATH,
+    "nominatim_patched": nominatim.OUTPUT_CSV,
+}
+
+
+# -------- Stages --------
+def _sal_to_sa4(mode, workers):
+    return sal_join.build_mapping(mode=mode, workers=workers)
+
+
+def _geocoded(path):
+    return read_table(path)
+
+
+def _sa4_boundaries():
+    return abs_patch.read_sa4_boundaries()
+
+
+def _enriched(mapping, geocoded):
+    return enrich.add_latlon(mapping, geocoded)
+
+
+def _geo_fallback(geocoded, enriched):
+    df_geo = apply_schema(geocoded, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    df_map = apply_schema(enriched, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    return geo_fallback.regions_with_fallback(df_geo, df_map)
+
+
+def _abs_patched(df, sa4_boundaries):
+    return abs_patch.patch_with_abs(apply_schema(df, "au", coordinate_dtype=STORED_COORDINATE_DTYPE), sa4_boundaries)
+
+
+def _nominatim_patched(df, endpoint, rate, concurrency):
+    df = apply_schema(df, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    return nominatim.patch_missing_regions(df, endpoint=endpoint, rate=rate, concurrency=concurrency)
+
+
+def au_stages(mode="fast", join_workers=1, endpoint=NOMINATIM_URL, rate=None, concurrency=1):
+    """
+    The AU chain as a DAG. The SAL join, the geocoded table and the SA4 boundaries have no
+    dependencies on each other, so they load concurrently; source reads are not cached. Each
+    stage lists the modules holding its logic, so editing them invalidates its cached output.
+    """
+    geocoded_path = find_table(enrich.geo_path)
+    return [
+        Stage("sal_to_sa4", _sal_to_sa4, files=[sal_join.sal_path, sal_join.sa4_path], code=[sal_join],
+              params={"mode": mode, "workers": join_workers}),
+        Stage("geocoded", _geocoded, files=[geocoded_path], params={"path": geocoded_path}, code=[table_io],
+              persist=False),
+        Stage("sa4_boundaries", _sa4_boundaries, files=[abs_patch.SA4_PATH], code=[boundary_index], persist=False),
+        Stage("enriched", _enriched, inputs=["sal_to_sa4", "geocoded"], code=[enrich]),
+        Stage("geo_fallback", _geo_fallback, inputs=["geocoded", "enriched"],
+              code=[geo_fallback, region_matcher, nearest_region, schema]),
+        Stage("abs_patched", _abs_patched, inputs=["geo_fallback", "sa4_boundaries"],
+              code=[abs_patch, region_patches, qa_engine, schema]),
+        Stage("nominatim_patched", _nominatim_patched, inputs=["abs_patched"],
+              code=[nominatim, geocode_worker, region_patches, qa_engine, schema],
+              params={"endpoint": endpoint, "rate": rate, "concurrency": concurrency}),
+    ]
+
+
+def main(target=FINAL_STAGE, exports=None, force=(), workers=DEFAULT_WORKERS, output_format=OUTPUT_FORMAT,
+         mode="fast", join_workers=1, endpoint=NOMINATIM_URL, rate=None, concurrency=1, prune=False):
+    start = time.perf_counter()
+    runner = DagRunner(au_stages(mode=mode, join_workers=join_workers, endpoint=endpoint, rate=rate,
+                                 concurrency=concurrency), workers=workers)
+    exports = list(exports) if exports else [target]
+    unknown = [name for name in exports if name not in EXPORTS]
+    if unknown:
+        raise ValueError(f"❌ No export path for stages: {', '.join(unknown)} (choose from {', '.join(EXPORTS)})")
+
+    frames, report = runner.run(targets=sorted(set(exports) | {target}), force=force)
+    for name in exports:
+        saved = write_table(frames[name], with_format(EXPORTS[name], output_format))
+        print(f"💾 {name} → {saved}")
+    if prune:
+        print(f"🧹 Removed {runner.prune(targets=[target])} stale artifacts from {runner.cache_dir}")
+    ran = sum(entry["action"] == "run" for entry in report.values())
+    print(f"✅ AU build done: {ran} of {len(report)} stages ran in {time.perf_counter() - start:.1f}s")
+    return report
+
+
+if __name__ == "__main__":
+    # Arguments live in the unified CLI: `python scripts/automap.py build-au ...`
+    from scripts.automap import main as automap_main
+    sys.exit(automap_main(["build-au", *sys.argv[1:]]))
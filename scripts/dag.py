@@ -0,0 +1,235 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.boundary_index import boundary_signature, hash_boundary_file
+from scripts.table_io import read_table, write_table
+
+# -------- Settings --------
+DAG_CACHE_DIR = "cache/dag"
+DAG_VERSION = 1
+FILE_HASHES = "file_hashes.json"
+DEFAULT_WORKERS = 4
+
+
+class Stage:
+    """
+    One step of a build: `func(*upstream_frames, **params)` returns a DataFrame. `files` are the
+    source files it reads itself and `code` the modules holding the logic it calls; both are
+    hashed into its key. Stages with persist=False (e.g. boundary reads) are never cached and only
+    run when a stage that needs them runs.
+    """
+
+    def __init__(self, name, func, inputs=(), files=(), code=(), params=None, persist=True, version=1):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.files = tuple(files)
+        self.code = tuple(code)
+        self.params = dict(params or {})
+        self.persist = persist
+        self.version = version
+
+
+# -------- Keys --------
+class FileHasher:
+    """Content hashes of source files, re-hashed only when their (name, size, mtime) signature changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.known = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.known = json.load(f)
+
+    def __call__(self, file_path):
+        if not os.path.exists(file_path):
+            raise ValueError(f"❌ Stage input not found: {file_path}")
+        signature = boundary_signature(file_path)
+        with self.lock:
+            entry = self.known.get(file_path)
+            if entry and entry["signature"] == signature:
+                return entry["hash"]
+        digest = hash_boundary_file(file_path)
+        with self.lock:
+            self.known[file_path] = {"signature": signature, "hash": digest}
+        return digest
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".partial", "w") as f:
+            json.dump(self.known, f, indent=1, sort_keys=True)
+        os.replace(self.path + ".partial", self.path)
+
+
+def source_hash(obj):
+    """SHA-256 of a function's or module's source (its qualified name if the source is unavailable)"""
+    try:
+        source = inspect.getsource(obj)
+    except (OSError, TypeError):
+        source = getattr(obj, "__qualname__", getattr(obj, "__name__", repr(obj)))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def stage_key(stage, file_hashes, input_keys):
+    """
+    Content address of a stage's output: its function and `code` modules, params, source file
+    hashes and upstream keys. A change anywhere upstream changes every key below it, so exactly
+    the affected stages rerun.
+    """
+    code = {"func": source_hash(stage.func)}
+    code.update({module.__name__: source_hash(module) for module in stage.code})
+    payload = {
+        "dag": DAG_VERSION, "stage": stage.name, "version": stage.version, "code": code,
+        "params": {k: repr(v) for k, v in sorted(stage.params.items())},
+        "files": file_hashes, "inputs": input_keys,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+# -------- Runner --------
+class DagRunner:
+    """Plans and runs stages, passing frames in memory and caching persisted outputs by key"""
+
+    def __init__(self, stages, cache_dir=DAG_CACHE_DIR, workers=DEFAULT_WORKERS):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"❌ Stage {stage.name} depends on unknown stages: {', '.join(unknown)}")
+        self.order = self._topological_order()
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.hasher = FileHasher(os.path.join(cache_dir, FILE_HASHES))
+
+    def _topological_order(self):
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"❌ Stage graph has a cycle through {name}")
+            state[name] = "visiting"
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def upstream(self, targets):
+        """`targets` and every stage they depend on"""
+        needed, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise ValueError(f"❌ Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                todo.extend(self.stages[name].inputs)
+        return needed
+
+    def downstream(self, names):
+        """`names` and every stage that depends on them"""
+        affected = set(names)
+        for name in self.order:
+            if affected.intersection(self.stages[name].inputs):
+                affected.add(name)
+        return affected
+
+    def artifact_path(self, name, key):
+        return os.path.join(self.cache_dir, f"{name}-{key[:16]}.parquet")
+
+    def keys(self, names):
+        keys = {}
+        for name in self.order:
+            if name in names:
+                stage = self.stages[name]
+                files = {os.path.basename(path): self.hasher(path) for path in stage.files}
+                keys[name] = stage_key(stage, files, {dep: keys[dep] for dep in stage.inputs})
+        self.hasher.save()
+        return keys
+
+    def plan(self, targets=None, force=()):
+        """
+        Stage → (key, action) for everything `targets` needs. Actions: "run" (no artifact for its
+        key, forced, or feeding a stage that runs), "load" (cached and needed in memory), "skip".
+        """
+        targets = list(targets or self.order)
+        needed = self.upstream(targets)
+        keys = self.keys(needed)
+        forced = self.downstream(force) & needed
+        actions = {}
+        for name in reversed(self.order):
+            if name not in needed:
+                continue
+            stage = self.stages[name]
+            consumers = [n for n in needed if name in self.stages[n].inputs and actions[n] == "run"]
+            cached = stage.persist and os.path.exists(self.artifact_path(name, keys[name]))
+            if name in forced or (stage.persist and not cached):
+                actions[name] = "run"
+            elif consumers or name in targets:
+                actions[name] = "load" if cached else "run"
+            else:
+                actions[name] = "skip"
+        return {name: (keys[name], actions[name]) for name in self.order if name in needed}
+
+    def _execute(self, name, key, action, frames):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        if action == "load":
+            frame = read_table(self.artifact_path(name, key))
+        else:
+            frame = stage.func(*[frames[dep] for dep in stage.inputs], **stage.params)
+            if stage.persist:
+                write_table(frame, self.artifact_path(name, key))
+        return frame, time.perf_counter() - start
+
+    def run(self, targets=None, force=()):
+        """Run the plan; returns ({target: frame}, {stage: {"action", "key", "seconds"}})"""
+        targets = list(targets or [self.order[-1]])
+        plan = self.plan(targets, force)
+        report = {name: {"action": action, "key": key[:16], "seconds": 0.0} for name, (key, action) in plan.items()}
+        todo = {name for name, (_, action) in plan.items() if action != "skip"}
+        frames, running = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while todo or running:
+                ready = [name for name in self.order if name in todo
+                         and all(dep in frames or plan[dep][1] == "skip" for dep in self.stages[name].inputs)]
+                for name in ready:
+                    todo.discard(name)
+                    key, action = plan[name]
+                    running[pool.submit(self._execute, name, key, action, dict(frames))] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    frames[name], report[name]["seconds"] = future.result()
+                    icon = "✅" if report[name]["action"] == "run" else "♻️"
+                    print(f"{icon} {name}: {report[name]['action']} in {report[name]['seconds']:.2f}s")
+        for name, entry in report.items():
+            if entry["action"] == "skip":
+                print(f"⏭️ {name}: unchanged")
+        return {name: frames[name] for name in targets}, report
+
+    def prune(self, targets=None):
+        """Delete cached artifacts that no stage of the current plan points to"""
+        plan = self.plan(targets)
+        current = {os.path.basename(self.artifact_path(name, key)) for name, (key, _) in plan.items()}
+        removed = 0
+        if os.path.isdir(self.cache_dir):
+            for entry in os.listdir(self.cache_dir):
+                if entry.endswith(".parquet") and entry not in current:
+                    os.remove(os.path.join(self.cache_dir, entry))
+                    removed += 1
+        return removed
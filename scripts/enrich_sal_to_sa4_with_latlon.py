@@ -1,25 +1,42 @@
 import pandas as pd
+import argparse
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT
+from scripts.table_io import FORMATS, find_table, read_table, with_format, write_table
 
 # File paths
 geo_path = "data/suburbs_geocoded.csv"
 map_path = "data/sal_to_sa4_mapping.csv"
 output_path = "data/sal_to_sa4_mapping_with_latlon.csv"
 
-# Load geocoded suburbs and mapping
-df_geo = pd.read_csv(geo_path)
-df_map = pd.read_csv(map_path)
 
-# Clean suburb names
-df_geo["suburb_clean"] = df_geo["suburb"].str.lower().str.strip()
-df_map["suburb_clean"] = df_map["suburb"].str.lower().str.strip()
+def add_latlon(df_map, df_geo):
+    """SAL → SA4 mapping with the geocoded lat/lon of each suburb"""
+    df_geo = df_geo.assign(suburb_clean=df_geo["suburb"].str.lower().str.strip())
+    df_map = df_map.assign(suburb_clean=df_map["suburb"].str.lower().str.strip())
+
+    # Merge on suburb name to get lat/lon into mapping file
+    df_merged = pd.merge(df_map, df_geo[["suburb_clean", "latitude", "longitude"]], on="suburb_clean", how="left")
+    return df_merged.drop(columns=["suburb_clean"])
+
+
+def main(output_format=OUTPUT_FORMAT):
+    # Load geocoded suburbs and mapping
+    df_geo = read_table(find_table(geo_path))
+    df_map = read_table(find_table(map_path))
+    df_merged = add_latlon(df_map, df_geo)
 
-# Merge on suburb name to get lat/lon into mapping file
-df_merged = pd.merge(df_map, df_geo[["suburb_clean", "latitude", "longitude"]], on="suburb_clean", how="left")
+    # Save enriched mapping file
+    saved = write_table(df_merged, with_format(output_path, output_format))
+    print(f"✅ Mapping file updated with lat/lon → {saved}")
 
-# Drop helper
-df_merged.drop(columns=["suburb_clean"], inplace=True)
 
-# Save enriched mapping file
-df_merged.to_csv(output_path, index=False)
-print(f"✅ Mapping file updated with lat/lon → {output_path}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add suburb lat/lon to the SAL → SA4 mapping")
+    parser.add_argument("--format", choices=list(FORMATS), default=OUTPUT_FORMAT, help="Output file format")
+    args = parser.parse_args()
+    main(output_format=args.format)
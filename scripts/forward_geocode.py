@@ -0,0 +1,209 @@
+import argparse
+import csv
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.boundary_index import hash_boundary_file
+from scripts.region_matcher import FUZZY_SCORE_CUTOFF, match_regions, normalize_state, normalize_suburb
+from scripts.table_io import FORMATS, find_table, read_table, with_format, write_table
+
+# -------- Settings --------
+POSTAL_DUMP = "data/AU.txt"  # GeoNames postal code file (see data/readme.txt), or allCountries.txt
+FORWARD_INDEX_DIR = "cache/forward_geocode"
+FORWARD_INDEX_VERSION = 1
+GEOCODE_CACHE = "cache/geocode_cache.csv"
+CACHE_COLUMNS = ["suburb", "state", "latitude", "longitude"]
+CACHE_KEYS = ["suburb_key", "state_key"]
+INPUT_PATH = "data/sal_to_sa4_mapping.csv"
+OUTPUT_PATH = "data/suburbs_geocoded.csv"
+
+# Tab-delimited columns of the GeoNames postal code dump, in file order
+GEONAMES_COLUMNS = [
+    "country_code", "postal_code", "place_name", "admin_name1", "admin_code1", "admin_name2",
+    "admin_code2", "admin_name3", "admin_code3", "latitude", "longitude", "accuracy",
+]
+
+
+# -------- Index --------
+def read_postal_dump(path):
+    """The columns of the GeoNames postal dump needed for place lookups"""
+    return pd.read_csv(
+        path, sep="\t", header=None, names=GEONAMES_COLUMNS, quoting=csv.QUOTE_NONE,
+        usecols=["country_code", "place_name", "admin_name1", "latitude", "longitude"],
+        dtype={"country_code": "string", "place_name": "string", "admin_name1": "string"},
+        keep_default_na=False, na_values={"latitude": [""], "longitude": [""]},  # "NA" is Namibia
+    )
+
+
+def build_forward_index(dump):
+    """
+    One row per normalized (place, admin1, country) key. A place listed under several postcodes
+    gets the mean of their coordinates.
+    """
+    keys = pd.DataFrame({
+        "country": dump["country_code"].str.upper(),
+        "place_key": normalize_suburb(dump["place_name"]),
+        "state_key": normalize_state(dump["admin_name1"]),
+        "latitude": dump["latitude"].astype("float64"),
+        "longitude": dump["longitude"].astype("float64"),
+    }).dropna()
+    index = keys.groupby(["country", "place_key", "state_key"], sort=True, observed=True).agg(
+        latitude=("latitude", "mean"), longitude=("longitude", "mean"), postcodes=("latitude", "size"),
+    ).reset_index()
+    index["country"] = index["country"].astype("category")
+    index["latitude"] = index["latitude"].astype("float32")
+    index["longitude"] = index["longitude"].astype("float32")
+    return index
+
+
+def forward_index_path(dump_path, dump_hash):
+    key = hashlib.sha256(f"{FORWARD_INDEX_VERSION}:{dump_hash}".encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(dump_path))[0]
+    return os.path.join(FORWARD_INDEX_DIR, f"{name}-{key}.parquet")
+
+
+def load_or_build_forward_index(dump_path=POSTAL_DUMP, rebuild=False):
+    """Compact Parquet index of the dump, rebuilt only when the dump's content changes"""
+    if not os.path.exists(dump_path):
+        raise ValueError(f"❌ GeoNames postal dump not found: {dump_path} (see data/readme.txt)")
+    path = forward_index_path(dump_path, hash_boundary_file(dump_path))
+    if not rebuild and os.path.exists(path):
+        return read_table(path)
+
+    print(f"🔄 Building forward geocoding index from {dump_path}")
+    index = build_forward_index(read_postal_dump(dump_path))
+    write_table(index, path)
+    print(f"✅ Forward geocoding index saved to {path} ({len(index):,} places)")
+    return index
+
+
+# -------- Geocoding --------
+class ForwardGeocoder:
+    """Offline (place, state) → coordinates lookups against one country of the postal index"""
+
+    def __init__(self, index, country):
+        self.country = country.upper()
+        places = index[index["country"] == self.country]
+        if places.empty:
+            raise ValueError(f"❌ No places for country {self.country} in the postal index")
+        self.places = places.reset_index(drop=True)
+        self.reference = pd.DataFrame({
+            "suburb": self.places["place_key"], "state": self.places["state_key"],
+            "place_pos": np.arange(len(self.places)),
+        })
+
+    def geocode(self, df, suburb_col="suburb", state_col="state", score_cutoff=FUZZY_SCORE_CUTOFF, workers=None):
+        """
+        Frame aligned to `df` with latitude, longitude, matched_place, match_score and match_type.
+        Exact keys are resolved in one join; the rest are fuzzy matched within their state.
+        """
+        pairs = df[[suburb_col, state_col]].drop_duplicates()
+        matches = match_regions(
+            pairs, self.reference, suburb_col=suburb_col, state_col=state_col, region_col="place_pos",
+            score_cutoff=score_cutoff, workers=workers,
+        )
+        positions = matches["place_pos"].fillna(-1).to_numpy(dtype=np.int64)
+        found = self.places.reindex(positions)
+        resolved = pd.DataFrame({
+            suburb_col: pairs[suburb_col].to_numpy(),
+            state_col: pairs[state_col].to_numpy(),
+            "latitude": found["latitude"].astype("float64").to_numpy(),
+            "longitude": found["longitude"].astype("float64").to_numpy(),
+            "matched_place": matches["matched_suburb"].to_numpy(),
+            "match_score": matches["match_score"].to_numpy(),
+            "match_type": matches["match_type"].to_numpy(),
+        })
+        result = df[[suburb_col, state_col]].merge(resolved, on=[suburb_col, state_col], how="left")
+        result.index = df.index
+        return result.drop(columns=[suburb_col, state_col])
+
+
+# -------- Cache --------
+def cache_keys(df):
+    """Normalized (suburb, state) lookup keys: "MELBOURNE " / "Victoria" and "Melbourne" / "VIC" share one"""
+    return pd.DataFrame({
+        "suburb_key": normalize_suburb(df["suburb"]), "state_key": normalize_state(df["state"]),
+    }, index=df.index)
+
+
+def read_geocode_cache(path=GEOCODE_CACHE):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=CACHE_COLUMNS)
+    return pd.read_csv(path)
+
+
+def update_geocode_cache(results, path=GEOCODE_CACHE):
+    """Merge geocoded (suburb, state, latitude, longitude) rows into the cache; new rows win per normalized pair"""
+    cache = read_geocode_cache(path)
+    new = results[CACHE_COLUMNS].dropna(subset=["latitude", "longitude"])
+    cache = pd.concat([cache, new], ignore_index=True) if len(cache) else new
+    cache = cache[~cache_keys(cache).duplicated(keep="last")]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    cache.to_csv(path, index=False)
+    return cache
+
+
+def geocode_frame(df, geocoder, cache_path=GEOCODE_CACHE, score_cutoff=FUZZY_SCORE_CUTOFF, workers=None):
+    """
+    Coordinates for every (suburb, state) pair in `df`. Pairs already in the geocode cache are
+    reused as-is (matched on normalized names), so manual fixes there win over the postal index.
+    Only exact matches are cached; fuzzy guesses are matched again on every run.
+    """
+    cache = read_geocode_cache(cache_path).astype({"latitude": "float64", "longitude": "float64"})
+    cached = pd.concat([cache_keys(cache), cache[["latitude", "longitude"]]], axis=1)
+    cached = cached.drop_duplicates(CACHE_KEYS, keep="last")
+    found = cache_keys(df).merge(cached, on=CACHE_KEYS, how="left")
+    out = df[["suburb", "state"]].copy()
+    out["latitude"] = found["latitude"].to_numpy()
+    out["longitude"] = found["longitude"].to_numpy()
+    out["matched_place"] = pd.Series(None, index=out.index, dtype=object)
+    out["match_score"] = np.nan
+    out["match_type"] = np.where(out["latitude"].notna(), "cache", None)
+    todo = out["latitude"].isna()
+    if not todo.any():
+        return out
+
+    resolved = geocoder.geocode(df.loc[todo], score_cutoff=score_cutoff, workers=workers)
+    out.loc[todo, resolved.columns] = resolved
+    exact = todo & out["match_type"].eq("exact")
+    if exact.any():
+        update_geocode_cache(out.loc[exact].drop_duplicates(["suburb", "state"]), cache_path)
+    return out
+
+
+def main(dump_path=POSTAL_DUMP, country="au", input_path=INPUT_PATH, output_path=OUTPUT_PATH,
+         output_format="csv", rebuild=False, score_cutoff=FUZZY_SCORE_CUTOFF, workers=None):
+    start = time.perf_counter()
+    geocoder = ForwardGeocoder(load_or_build_forward_index(dump_path, rebuild=rebuild), country)
+    df = read_table(find_table(input_path))
+    print(f"✅ Loaded {len(df)} rows from {input_path}")
+
+    out = geocode_frame(df, geocoder, score_cutoff=score_cutoff, workers=workers)
+    counts = out["match_type"].fillna("unresolved").value_counts()
+    print("📍 " + ", ".join(f"{kind}: {n}" for kind, n in counts.items()))
+
+    result = out[CACHE_COLUMNS].drop_duplicates(["suburb", "state"])
+    saved = write_table(result, with_format(output_path, output_format))
+    print(f"✅ {len(result)} geocoded localities → {saved} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline forward geocoding from the GeoNames postal dump")
+    parser.add_argument("--dump", default=POSTAL_DUMP, help="GeoNames postal code file (e.g. data/AU.txt)")
+    parser.add_argument("--country", default="au", help="Country code of the input localities")
+    parser.add_argument("--input", default=INPUT_PATH, help="Table with suburb and state columns")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Geocoded suburbs table")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv", help="Output file format")
+    parser.add_argument("--score-cutoff", type=float, default=FUZZY_SCORE_CUTOFF, help="Minimum fuzzy match score")
+    parser.add_argument("--workers", type=int, default=None, help="Threads for fuzzy matching (-1 = all cores)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the postal index even if the dump is unchanged")
+    args = parser.parse_args()
+    main(dump_path=args.dump, country=args.country, input_path=args.input, output_path=args.output,
+         output_format=args.format, rebuild=args.rebuild, score_cutoff=args.score_cutoff, workers=args.workers)
@@ -0,0 +1,165 @@
+import math
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# -------- Settings --------
+CACHE_DB = "cache/reverse_lookup_cache.sqlite"
+LEGACY_CACHE_CSV = "cache/reverse_lookup_cache.csv"
+DEFAULT_PRECISION = 6
+FIELDS = ("county", "state_district", "state")
+
+
+class ReverseGeocodeCache:
+    """
+    Reverse-geocode results keyed on coordinates quantized to `precision` decimals.
+
+    Lookups hit an in-memory dict; every write is committed to SQLite straight away,
+    so an interrupted run keeps everything it already fetched.
+    """
+
+    def __init__(self, path=CACHE_DB, precision=DEFAULT_PRECISION, legacy_csv=LEGACY_CACHE_CSV):
+        self.path = path
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS reverse_lookup ("
+            "lat_key INTEGER, lon_key INTEGER, county TEXT, state_district TEXT, state TEXT, "
+            "PRIMARY KEY (lat_key, lon_key)) WITHOUT ROWID"
+        )
+        self._check_precision()
+
+        self._entries = {
+            (lat_key, lon_key): values
+            for lat_key, lon_key, *values in self.conn.execute(
+                "SELECT lat_key, lon_key, county, state_district, state FROM reverse_lookup"
+            )
+        }
+        self._frame = None
+        if not self._entries and legacy_csv and os.path.exists(legacy_csv):
+            self._import_legacy_csv(legacy_csv)
+
+    def _check_precision(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'precision'").fetchone()
+        if row is None:
+            self.conn.execute("INSERT INTO meta VALUES ('precision', ?)", (str(self.precision),))
+            self.conn.commit()
+        elif int(row[0]) != self.precision:
+            raise ValueError(
+                f"❌ {self.path} was built with precision {row[0]}, not {self.precision}"
+            )
+
+    def _import_legacy_csv(self, legacy_csv):
+        legacy = pd.read_csv(legacy_csv)
+        legacy = legacy.astype({field: object for field in FIELDS})
+        legacy = legacy.where(legacy.notna() & (legacy != "Unknown"), None)
+        self.put_many(legacy.to_dict("records"))
+        print(f"📦 Imported {len(legacy)} cached lookups from {legacy_csv}")
+
+    # -------- Keys --------
+    def quantize(self, values):
+        values = np.asarray(values, dtype="float64")
+        if not np.isfinite(values).all():
+            raise ValueError("❌ Cannot key non-finite coordinates; drop NaN/inf rows first")
+        return np.round(values * 10 ** self.precision).astype("int64")
+
+    def key(self, lat, lon):
+        lat, lon = float(lat), float(lon)
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            raise ValueError(f"❌ Cannot key non-finite coordinates ({lat}, {lon})")
+        scale = 10 ** self.precision
+        return int(round(lat * scale)), int(round(lon * scale))
+
+    # -------- Reads --------
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, coords):
+        return self.key(*coords) in self._entries
+
+    def get(self, lat, lon):
+        values = self._entries.get(self.key(lat, lon))
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(zip(FIELDS, values))
+
+    def to_frame(self):
+        if self._frame is None:
+            keys = np.array(list(self._entries.keys()), dtype="int64").reshape(-1, 2)
+            values = list(self._entries.values())
+            self._frame = pd.DataFrame(values, columns=list(FIELDS), dtype=object)
+            self._frame.insert(0, "lon_key", keys[:, 1])
+            self._frame.insert(0, "lat_key", keys[:, 0])
+        return self._frame
+
+    def get_many(self, df, lat_col="latitude", lon_col="longitude"):
+        """
+        Vectorized lookup for a whole frame; returns FIELDS aligned to df plus a `cached` flag.
+        Rows without finite coordinates are never cached.
+        """
+        lat = df[lat_col].to_numpy(dtype="float64", na_value=np.nan)
+        lon = df[lon_col].to_numpy(dtype="float64", na_value=np.nan)
+        finite = np.isfinite(lat) & np.isfinite(lon)
+        keys = pd.DataFrame({
+            "lat_key": self.quantize(lat[finite]),
+            "lon_key": self.quantize(lon[finite]),
+        })
+        found = keys.merge(self.to_frame(), on=["lat_key", "lon_key"], how="left", indicator=True)
+        found["cached"] = found.pop("_merge").eq("both")
+
+        hits = int(found["cached"].sum())
+        self.hits += hits
+        self.misses += len(found) - hits
+
+        positions = np.full(len(df), -1)
+        positions[finite] = np.arange(len(found))
+        found = found.reindex(positions)  # -1 → an all-NaN row for non-finite coordinates
+        found["cached"] = found["cached"].eq(True)
+        found.index = df.index
+        return found[list(FIELDS) + ["cached"]]
+
+    # -------- Writes --------
+    def put(self, lat, lon, county=None, state_district=None, state=None):
+        self.put_many([{"latitude": lat, "longitude": lon, "county": county,
+                        "state_district": state_district, "state": state}])
+
+    def put_many(self, records):
+        rows = []
+        for record in records:
+            key = self.key(record["latitude"], record["longitude"])
+            values = [record.get(field) for field in FIELDS]
+            self._entries[key] = values
+            rows.append((*key, *values))
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO reverse_lookup VALUES (?, ?, ?, ?, ?)", rows)
+        self._frame = None
+
+    # -------- Stats --------
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.geocode_cache import ReverseGeocodeCache, CACHE_DB
+
+# -------- Settings --------
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+USER_AGENT = "AutoMapAU-Geocoder"
+
+# Requests per second allowed per endpoint host (Nominatim usage policy: 1/s)
+ENDPOINT_RATE_LIMITS = {
+    "nominatim.openstreetmap.org": 1.0,
+}
+DEFAULT_RATE_LIMIT = 1.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def rate_limit_for(endpoint):
+    return ENDPOINT_RATE_LIMITS.get(urlparse(endpoint).hostname, DEFAULT_RATE_LIMIT)
+
+
+def parse_address(data):
+    """(county, state_district, state) from a Nominatim reverse response"""
+    addr = data.get("address", {})
+    return (
+        addr.get("county"),
+        addr.get("state_district", addr.get("region")),
+        addr.get("state"),
+    )
+
+
+# -------- Rate Limiting --------
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# -------- Worker --------
+class ReverseGeocoder:
+    """
+    Concurrent reverse geocoder over a pooled requests session.
+
+    Identical coordinates (after cache quantization) are fetched once, every result
+    is committed to the cache as it arrives, and coordinates already in the cache
+    are skipped, so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, cache, endpoint=NOMINATIM_URL, rate=None, burst=1, concurrency=4,
+                 max_retries=4, backoff=1.0, timeout=10, user_agent=USER_AGENT):
+        self.cache = cache
+        self.endpoint = endpoint
+        self.rate = rate or rate_limit_for(endpoint)
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.stats = {"requested": 0, "fetched": 0, "failed": 0, "retries": 0, "skipped": 0}
+
+    def _get(self, lat, lon):
+        params = {"lat": lat, "lon": lon, "format": "jsonv2", "zoom": 10, "addressdetails": 1}
+        return self.session.get(self.endpoint, params=params, timeout=self.timeout)
+
+    async def lookup(self, bucket, lat, lon):
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            delay = self.backoff * 2 ** attempt * (1 + random.random())
+            try:
+                res = await asyncio.to_thread(self._get, lat, lon)
+                if res.status_code == 200:
+                    return parse_address(res.json())
+                if res.status_code not in RETRY_STATUSES:
+                    print(f"⚠️ HTTP {res.status_code} for ({lat}, {lon})")
+                    return None
+                retry_after = res.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            except (requests.RequestException, ValueError) as e:
+                print(f"⚠️ Error for ({lat}, {lon}): {e}")
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+        return None
+
+    async def run(self, coords, progress_every=100):
+        """Geocode every (lat, lon) row of `coords` that is not cached yet; NaN/inf rows are skipped"""
+        finite = (np.isfinite(coords["latitude"].to_numpy(dtype="float64", na_value=np.nan))
+                  & np.isfinite(coords["longitude"].to_numpy(dtype="float64", na_value=np.nan)))
+        self.stats["skipped"] = int((~finite).sum())
+        if self.stats["skipped"]:
+            print(f"⚠️ Skipping {self.stats['skipped']} rows without finite coordinates")
+        coords = coords[finite]
+        keys = coords.assign(
+            lat_key=self.cache.quantize(coords["latitude"]),
+            lon_key=self.cache.quantize(coords["longitude"]),
+        ).drop_duplicates(["lat_key", "lon_key"])
+        pending = keys[~self.cache.get_many(keys)["cached"]]
+        self.stats["requested"] = len(pending)
+        print(f"📦 {len(keys) - len(pending)} / {len(keys)} unique coordinates cached, {len(pending)} to look up")
+        if pending.empty:
+            return
+
+        queue = asyncio.Queue()
+        for row in pending.itertuples(index=False):
+            queue.put_nowait((row.latitude, row.longitude))
+        bucket = TokenBucket(self.rate, self.burst)
+        start = time.perf_counter()
+
+        async def worker():
+            while True:
+                try:
+                    lat, lon = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await self.lookup(bucket, lat, lon)
+                if result is None:
+                    self.stats["failed"] += 1
+                else:
+                    self.cache.put(lat, lon, *result)  # committed immediately (checkpoint)
+                    self.stats["fetched"] += 1
+                done = self.stats["fetched"] + self.stats["failed"]
+                if done % progress_every == 0:
+                    rate = done / (time.perf_counter() - start)
+                    print(f"🔍 {done} / {len(pending)} coordinates ({rate:.1f}/s)")
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+        print(f"✅ Geocoded {self.stats['fetched']} coordinates in {elapsed:.1f}s "
+              f"({self.stats['failed']} failed, {self.stats['retries']} retries)")
+
+    def geocode_frame(self, df, lat_col="latitude", lon_col="longitude"):
+        """Fill the cache for every coordinate in df and return the cached fields aligned to df"""
+        coords = pd.DataFrame({"latitude": df[lat_col].to_numpy(), "longitude": df[lon_col].to_numpy()})
+        asyncio.run(self.run(coords))
+        return self.cache.get_many(df, lat_col=lat_col, lon_col=lon_col)
+
+    def close(self):
+        self.session.close()
+
+
+# -------- Offline Benchmark --------
+def benchmark(points, rate, concurrency, latency, server_rate):
+    """Run the worker against a local mock Nominatim server and report throughput"""
+    import tempfile
+    from scripts.mock_nominatim import start_server
+
+    server = start_server(port=0, latency=latency, rate=server_rate)
+    endpoint = f"http://127.0.0.1:{server.server_port}/reverse"
+    rng = np.random.default_rng(0)
+    coords = pd.DataFrame({
+        "latitude": rng.uniform(-44, -10, points).round(4),
+        "longitude": rng.uniform(113, 154, points).round(4),
+    })
+    coords = pd.concat([coords, coords.sample(frac=0.2, random_state=0)])  # duplicates are fetched once
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ReverseGeocodeCache(os.path.join(tmp, "bench.sqlite"), legacy_csv=None)
+        geocoder = ReverseGeocoder(cache, endpoint=endpoint, rate=rate, burst=concurrency,
+                                   concurrency=concurrency, backoff=0.05)
+        start = time.perf_counter()
+        geocoder.geocode_frame(coords)
+        elapsed = time.perf_counter() - start
+        geocoder.close()
+        cache.close()
+
+    server.shutdown()
+    print(f"📊 {len(coords)} rows / {geocoder.stats['requested']} unique in {elapsed:.2f}s "
+          f"→ {geocoder.stats['fetched'] / elapsed:.1f} req/s (limit {rate}/s), "
+          f"server saw {server.stats['requests']} requests, {server.stats['throttled']} throttled")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the reverse-geocoding worker against a local mock server")
+    parser.add_argument("--points", type=int, default=500, help="Unique coordinates to geocode")
+    parser.add_argument("--rate", type=float, default=100.0, help="Client-side requests per second")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests in flight")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock server latency in seconds")
+    parser.add_argument("--server-rate", type=float, default=None, help="Mock server limit (429 above this)")
+    args = parser.parse_args()
+    benchmark(args.points, args.rate, args.concurrency, args.latency, args.server_rate)
@@ -1,64 +1,96 @@
 import pandas as pd
+import argparse
 import os
-from rapidfuzz import process, fuzz
-from scipy.spatial import cKDTree
+import sys
 import numpy as np
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT
+from scripts.nearest_region import (
+    DEFAULT_MAX_DISTANCE_KM, DEFAULT_NEIGHBOURS, load_or_build_nearest_index, nearest_index_path,
+)
+from scripts.region_matcher import match_regions, normalize_state, FUZZY_SCORE_CUTOFF
+from scripts.schema import STORED_COORDINATE_DTYPE, apply_schema, read_typed_table
+from scripts.table_io import FORMATS, find_table, with_format, write_table
+
 # -------- File Paths --------
 geo_path = "data/suburbs_geocoded.csv"
 map_path = "data/sal_to_sa4_mapping_with_latlon.csv"  # <-- must include lat/lon
 output_path = "output/final_output_with_geo_fallback.csv"
 
-# -------- Load Data --------
-df_geo = pd.read_csv(geo_path)
-df_map = pd.read_csv(map_path)
 
-df_geo["suburb_clean"] = df_geo["suburb"].str.lower().str.strip()
-df_map["suburb_clean"] = df_map["suburb"].str.lower().str.strip()
+# -------- Step 1: Exact + Fuzzy Matching --------
+def assign_regions(df_geo, df_map, score_cutoff=FUZZY_SCORE_CUTOFF, workers=None):
+    matches = match_regions(df_geo, df_map, score_cutoff=score_cutoff, workers=workers)
+    df_geo = df_geo.copy()
+    df_geo["matched_suburb"] = matches["matched_suburb"]
+    df_geo["match_score"] = matches["match_score"]
+
+    # Fallback: Regional STATE
+    regional = "Regional " + normalize_state(df_geo["state"]).fillna("")
+    df_geo["assigned_region"] = matches["assigned_region"].astype(object).fillna(regional)
+    return df_geo
 
-# Map for exact and fuzzy matches
-suburb_to_region = df_map.set_index("suburb_clean")["assigned_region"].to_dict()
 
-# -------- Matching Function --------
-def match_region(row):
-    suburb = row["suburb_clean"]
-    state = row["state"].strip().upper()
+# -------- Step 2: Patch "Regional" using nearest known suburbs --------
+def nearest_region_fallback(df_geo, df_map, k=DEFAULT_NEIGHBOURS, max_distance_km=DEFAULT_MAX_DISTANCE_KM,
+                            cache_path=nearest_index_path("sal_to_sa4")):
+    df_geo = df_geo.copy()
+    unmapped = df_geo["assigned_region"].str.contains("Regional", na=False).to_numpy()
+    df_geo["fallback_distance_km"] = np.nan
+    if not unmapped.any():
+        return df_geo
 
-    # 1. Exact match
-    if suburb in suburb_to_region:
-        return suburb_to_region[suburb]
+    # Persisted great-circle KD-tree over known region locations, one batched vote for all unmapped rows
+    index = load_or_build_nearest_index(df_map, cache_path)
+    votes = index.query(
+        df_geo.loc[unmapped, "latitude"].to_numpy(), df_geo.loc[unmapped, "longitude"].to_numpy(),
+        k=k, max_distance_km=max_distance_km,
+    )
+    found = votes["region"].notna().to_numpy()
+    positions = np.flatnonzero(unmapped)[found]
+    regions = df_geo["assigned_region"].to_numpy(dtype=object).copy()
+    distances = df_geo["fallback_distance_km"].to_numpy().copy()
+    regions[positions] = votes["region"].to_numpy()[found]
+    distances[positions] = votes["distance_km"].to_numpy()[found]
+    df_geo["assigned_region"] = regions
+    df_geo["fallback_distance_km"] = distances
+    print(f"📍 Nearest-region fallback: {found.sum()} of {unmapped.sum()} 'Regional' rows within {max_distance_km} km")
+    return df_geo
 
-    # 2. Fuzzy match
-    match, score, _ = process.extractOne(suburb, suburb_to_region.keys(), scorer=fuzz.ratio)
-    if score >= 90:
-        return suburb_to_region[match]
 
-    # 3. Fallback: Regional STATE
-    return f"Regional {state}"
+def regions_with_fallback(df_geo, df_map, score_cutoff=FUZZY_SCORE_CUTOFF, workers=None,
+                          neighbours=DEFAULT_NEIGHBOURS, max_distance_km=DEFAULT_MAX_DISTANCE_KM):
+    """Steps 1 and 2 on in-memory frames: exact/fuzzy region match, then the nearest-region fallback"""
+    df_geo = assign_regions(df_geo, df_map, score_cutoff=score_cutoff, workers=workers)
+    final_df = nearest_region_fallback(df_geo, df_map, k=neighbours, max_distance_km=max_distance_km)
+    return apply_schema(final_df, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
 
-# -------- Step 1: Basic Matching --------
-df_geo["assigned_region"] = df_geo.apply(match_region, axis=1)
 
-# -------- Step 2: Patch "Regional" using nearest lat/lon --------
-df_geo_missing = df_geo[~df_geo["assigned_region"].str.contains("Regional", na=False)].copy()
-df_geo_unmapped = df_geo[df_geo["assigned_region"].str.contains("Regional", na=False)].copy()
+def main(workers=None, score_cutoff=FUZZY_SCORE_CUTOFF, output_format=OUTPUT_FORMAT,
+         neighbours=DEFAULT_NEIGHBOURS, max_distance_km=DEFAULT_MAX_DISTANCE_KM):
+    # -------- Load Data --------
+    df_geo = read_typed_table(find_table(geo_path), "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    df_map = read_typed_table(find_table(map_path), "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
 
-# Prepare KDTree from known region locations
-mapped_coords = df_map[["latitude", "longitude"]].dropna().values
-mapped_regions = df_map["assigned_region"].values
-tree = cKDTree(mapped_coords)
+    final_df = regions_with_fallback(df_geo, df_map, score_cutoff=score_cutoff, workers=workers,
+                                     neighbours=neighbours, max_distance_km=max_distance_km)
 
-# Get lat/lon of unmapped rows
-query_coords = df_geo_unmapped[["latitude", "longitude"]].values
+    # -------- Final Save --------
+    saved = write_table(final_df, with_format(output_path, output_format))
 
-# Query nearest neighbors
-distances, indices = tree.query(query_coords, k=1)
-df_geo_unmapped["assigned_region"] = [mapped_regions[i] for i in indices]
+    print(f"✅ Final mapping saved to: {saved}")
 
-# -------- Final Merge and Save --------
-final_df = pd.concat([df_geo_missing, df_geo_unmapped])
-final_df.drop(columns=["suburb_clean"], inplace=True)
-os.makedirs("output", exist_ok=True)
-final_df.to_csv(output_path, index=False)
 
-print(f"✅ Final mapping saved to: {output_path}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign SA4 regions to geocoded suburbs")
+    parser.add_argument("--workers", type=int, default=None, help="Threads for fuzzy matching (-1 = all cores)")
+    parser.add_argument("--score-cutoff", type=float, default=FUZZY_SCORE_CUTOFF, help="Minimum fuzzy match score")
+    parser.add_argument("--format", choices=list(FORMATS), default=OUTPUT_FORMAT, help="Output file format")
+    parser.add_argument("--neighbours", type=int, default=DEFAULT_NEIGHBOURS, help="Nearest suburbs voting on a region")
+    parser.add_argument("--max-distance-km", type=float, default=DEFAULT_MAX_DISTANCE_KM,
+                        help="Ignore neighbours further away than this")
+    args = parser.parse_args()
+    main(workers=args.workers, score_cutoff=args.score_cutoff, output_format=args.format,
+         neighbours=args.neighbours, max_distance_km=args.max_distance_km)
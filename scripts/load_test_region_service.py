@@ -0,0 +1,96 @@
+import argparse
+import http.client
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import shapely
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.region_service import RegionLookupService, start_server
+from scripts.synthetic_data import AU_EXTENT, synthetic_index
+
+
+def percentiles(samples_ms):
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return f"p50 {p50:.3f} ms · p95 {p95:.3f} ms · p99 {p99:.3f} ms"
+
+
+def random_points(n, extent, seed=1):
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = extent
+    return rng.uniform(miny, maxy, n), rng.uniform(minx, maxx, n)
+
+
+def run_in_process(service, country, lats, lons):
+    service.lookup(country, lats[0], lons[0])  # warm up
+    samples = []
+    for lat, lon in zip(lats, lons):
+        start = time.perf_counter()
+        service.lookup(country, lat, lon)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"⚡ In-process single lookups ({len(samples)}): {percentiles(samples)}")
+
+    start = time.perf_counter()
+    service.lookup_batch(country, lats, lons)
+    elapsed = time.perf_counter() - start
+    print(f"⚡ In-process batch of {len(lats)}: {elapsed * 1000:.1f} ms ({len(lats) / elapsed:,.0f} points/s)")
+
+
+def run_http(service, country, lats, lons, clients):
+    server = start_server(service)
+    port = server.server_port
+
+    def client(chunk):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        samples = []
+        for lat, lon in chunk:
+            start = time.perf_counter()
+            conn.request("GET", f"/lookup?country={country}&lat={lat}&lon={lon}")
+            conn.getresponse().read()
+            samples.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        return samples
+
+    chunks = np.array_split(np.column_stack([lats, lons]), clients)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        samples = [s for result in pool.map(client, chunks) for s in result]
+    elapsed = time.perf_counter() - start
+    print(f"🌐 HTTP single lookups ({len(samples)}, {clients} clients): {percentiles(samples)} "
+          f"· {len(samples) / elapsed:,.0f} req/s")
+
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps({"country": country, "lat": lats.tolist(), "lon": lons.tolist()})
+    start = time.perf_counter()
+    conn.request("POST", "/lookup/batch", body=body, headers={"Content-Type": "application/json"})
+    conn.getresponse().read()
+    elapsed = time.perf_counter() - start
+    print(f"🌐 HTTP batch of {len(lats)}: {elapsed * 1000:.1f} ms ({len(lats) / elapsed:,.0f} points/s)")
+    conn.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the region lookup service")
+    parser.add_argument("--country", default="au", help="Country code to query")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic polygons instead of the real boundaries")
+    parser.add_argument("--requests", type=int, default=5000, help="Number of single-point lookups")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent HTTP clients")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        index = synthetic_index(args.synthetic)
+        service = RegionLookupService(indexes={args.country: index})
+        extent = AU_EXTENT
+    else:
+        service = RegionLookupService([args.country])
+        extent = tuple(shapely.total_bounds(service.index(args.country).geometries))
+
+    lats, lons = random_points(args.requests, extent)
+    run_in_process(service, args.country, lats, lons)
+    run_http(service, args.country, lats, lons, args.clients)
@@ -0,0 +1,102 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# -------- Mock Nominatim --------
+class MockNominatimHandler(BaseHTTPRequestHandler):
+    """Answers /reverse with a deterministic address derived from the coordinates"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+        with server.lock:
+            server.stats["requests"] += 1
+            throttled = not server.allow_request()
+            if throttled:
+                server.stats["throttled"] += 1
+
+        if url.path == "/stats":
+            return self.reply(200, server.stats)
+        if url.path != "/reverse":
+            return self.reply(404, {"error": "not found"})
+        if throttled:
+            return self.reply(429, {"error": "rate limited"}, headers={"Retry-After": "1"})
+
+        query = parse_qs(url.query)
+        try:
+            lat = float(query["lat"][0])
+            lon = float(query["lon"][0])
+        except (KeyError, ValueError):
+            return self.reply(400, {"error": "lat/lon required"})
+
+        time.sleep(server.latency)
+        cell = f"{int(lat)}_{int(lon)}"
+        return self.reply(200, {
+            "lat": str(lat),
+            "lon": str(lon),
+            "address": {
+                "county": f"County {cell}",
+                "state_district": f"District {cell}",
+                "state": f"State {int(lon) // 10}",
+            },
+        })
+
+    def reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockNominatimServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, rate=None):
+        super().__init__(address, MockNominatimHandler)
+        self.latency = latency
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0}
+        self.window_start = time.monotonic()
+        self.window_count = 0
+
+    def allow_request(self):
+        """Fixed one-second window limit, like a strict upstream; always allows when rate is None"""
+        if self.rate is None:
+            return True
+        now = time.monotonic()
+        if now - self.window_start >= 1.0:
+            self.window_start, self.window_count = now, 0
+        self.window_count += 1
+        return self.window_count <= self.rate
+
+
+def start_server(host="127.0.0.1", port=0, latency=0.0, rate=None):
+    """Start the mock server on a background thread (port=0 picks a free port)"""
+    server = MockNominatimServer((host, port), latency=latency, rate=rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Nominatim reverse API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second before returning 429")
+    args = parser.parse_args()
+
+    server = MockNominatimServer((args.host, args.port), latency=args.latency, rate=args.rate)
+    print(f"🛰️ Mock Nominatim listening on http://{args.host}:{args.port}/reverse")
+    server.serve_forever()
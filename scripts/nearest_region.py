@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# -------- Settings --------
+NEAREST_CACHE_DIR = "cache/nearest_region"
+NEAREST_VERSION = 1
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_NEIGHBOURS = 5
+DEFAULT_MAX_DISTANCE_KM = 100.0
+
+
+def to_unit_xyz(lat, lon):
+    """Degrees → points on the unit sphere, where straight-line distance is monotonic in great-circle distance"""
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    lon = np.radians(np.asarray(lon, dtype="float64"))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def km_to_chord(km):
+    return 2 * np.sin(min(km / (2 * EARTH_RADIUS_KM), np.pi / 2))
+
+
+def reference_hash(lat, lon, regions):
+    """Content hash of the reference points, used to reuse a persisted tree"""
+    frame = pd.DataFrame({"lat": lat, "lon": lon, "region": pd.Series(regions).astype(str).to_numpy()})
+    return hashlib.sha256(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()).hexdigest()
+
+
+# -------- Index --------
+class NearestRegionIndex:
+    """KD-tree over reference suburbs on the unit sphere, answering k-NN region votes in km"""
+
+    def __init__(self, lat, lon, regions):
+        lat = np.asarray(lat, dtype="float64")
+        lon = np.asarray(lon, dtype="float64")
+        regions = pd.Series(regions).reset_index(drop=True)
+        self.version = NEAREST_VERSION
+        self.source_hash = reference_hash(lat, lon, regions)
+
+        # Filter coordinates and regions with one mask so positions stay aligned
+        keep = np.isfinite(lat) & np.isfinite(lon) & regions.notna().to_numpy()
+        self.codes, self.regions = pd.factorize(regions[keep])
+        self.regions = np.asarray(self.regions, dtype=object)
+        self.tree = cKDTree(to_unit_xyz(lat[keep], lon[keep]))
+
+    def __len__(self):
+        return self.tree.n
+
+    def query(self, lat, lon, k=DEFAULT_NEIGHBOURS, max_distance_km=DEFAULT_MAX_DISTANCE_KM, power=1.0):
+        """
+        Vote among the `k` nearest reference points within `max_distance_km`, weighting each by
+        1 / distance**power. Returns a frame with the winning region (None if no neighbour is
+        in range), its vote share, and the distance to the nearest neighbour in km.
+        """
+        lat = np.asarray(lat, dtype="float64")
+        lon = np.asarray(lon, dtype="float64")
+        n = len(lat)
+        region = np.full(n, None, dtype=object)
+        share = np.full(n, np.nan)
+        nearest_km = np.full(n, np.nan)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        k = min(k, len(self))
+        if not len(valid) or k == 0:
+            return pd.DataFrame({"region": region, "vote_share": share, "distance_km": nearest_km})
+
+        upper = km_to_chord(max_distance_km) if max_distance_km else np.inf
+        chords, neighbours = self.tree.query(to_unit_xyz(lat[valid], lon[valid]), k=k, distance_upper_bound=upper)
+        chords, neighbours = chords.reshape(len(valid), k), neighbours.reshape(len(valid), k)
+        found = neighbours < len(self)  # missing neighbours come back as index n with infinite distance
+        km = chord_to_km(np.where(found, chords, 0))
+        if not found.any():
+            return pd.DataFrame({"region": region, "vote_share": share, "distance_km": nearest_km})
+
+        # Sum weights per (query, region) pair, then keep the heaviest region per query
+        rows = np.broadcast_to(np.arange(len(valid))[:, None], found.shape)[found]
+        codes = self.codes[neighbours[found]]
+        weights = 1.0 / np.maximum(km[found], 1e-3) ** power
+        keys, inverse = np.unique(rows * len(self.regions) + codes, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        key_rows = keys // len(self.regions)
+        order = np.lexsort((scores, key_rows))
+        last = np.r_[key_rows[order][1:] != key_rows[order][:-1], True]
+        winners = order[last]
+        totals = np.bincount(rows, weights=weights, minlength=len(valid))
+
+        answered = valid[key_rows[winners]]
+        region[answered] = self.regions[keys[winners] % len(self.regions)]
+        share[answered] = scores[winners] / totals[key_rows[winners]]
+        nearest_km[answered] = km[key_rows[winners], 0]
+        return pd.DataFrame({"region": region, "vote_share": share, "distance_km": nearest_km})
+
+
+# -------- Persistence --------
+def nearest_index_path(name):
+    return os.path.join(NEAREST_CACHE_DIR, f"{name}.pkl")
+
+
+def save_nearest_index(index, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_or_build_nearest_index(reference, path, lat_col="latitude", lon_col="longitude",
+                                region_col="assigned_region"):
+    """Reuse the tree persisted at `path` while the reference points are unchanged"""
+    lat, lon, regions = reference[lat_col].to_numpy(), reference[lon_col].to_numpy(), reference[region_col]
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        if getattr(index, "version", None) == NEAREST_VERSION and index.source_hash == reference_hash(lat, lon, regions):
+            return index
+
+    print(f"🔄 Building nearest-region index from {len(reference)} reference points")
+    index = NearestRegionIndex(lat, lon, regions)
+    save_nearest_index(index, path)
+    return index
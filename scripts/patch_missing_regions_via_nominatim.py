@@ -1,47 +1,59 @@
 import pandas as pd
-import requests
-import time
-
-df = pd.read_csv("output/final_output_cleaned_by_abs.csv")
-
-missing = df[df['final_region'].isna() | df['final_region'].astype(str).str.strip().isin(["None", "Unknown", "", "Regional"])].copy()
-
-def reverse_geocode(lat, lon):
-    url = "https://nominatim.openstreetmap.org/reverse"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "format": "json",
-        "zoom": 10,
-        "addressdetails": 1
-    }
-    headers = {"User-Agent": "AutoMapAU QA Tool"}
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        return data.get("address", {}).get("state_district") or data.get("address", {}).get("county")
-    except Exception as e:
-        return None
-
-patches = []
-for idx, row in missing.iterrows():
-    region = reverse_geocode(row['latitude'], row['longitude'])
-    patches.append(region)
-    print(f"{row['suburb']} ({row['latitude']}, {row['longitude']}) → {region}")
-    time.sleep(1)  # Respect Nominatim rate limit
-
-missing['patched_region'] = patches
-
-# Apply patches to full dataset
-for i, row in missing.iterrows():
-    df.loc[
-        (df['suburb'] == row['suburb']) &
-        (df['state'] == row['state']) &
-        (df['latitude'] == row['latitude']) &
-        (df['longitude'] == row['longitude']),
-        'final_region'
-    ] = row['patched_region']
-
-# Save the fully patched file
-df.to_csv("output/final_output_fully_patched.csv", index=False)
-print("✅ Saved to output/final_output_fully_patched.csv")
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT
+from scripts.geocode_cache import ReverseGeocodeCache, CACHE_DB
+from scripts.geocode_worker import ReverseGeocoder, NOMINATIM_URL
+from scripts.qa_engine import unmapped_mask
+from scripts.region_patches import build_patches, apply_region_patches
+from scripts.schema import STORED_COORDINATE_DTYPE, apply_schema, read_typed_table
+from scripts.table_io import FORMATS, find_table, with_format, write_table
+
+INPUT_CSV = "output/final_output_cleaned_by_abs.csv"
+OUTPUT_CSV = "output/final_output_fully_patched.csv"
+
+
+def patch_missing_regions(df, endpoint=NOMINATIM_URL, rate=None, concurrency=1):
+    """`df` with unmapped final_region values filled from Nominatim's state_district (or county)"""
+    missing = df[unmapped_mask(df['final_region'])].copy()
+
+    # Shared with reverse_geocode_region.py, so coordinates looked up there are not fetched again
+    cache = ReverseGeocodeCache(CACHE_DB)
+    geocoder = ReverseGeocoder(cache, endpoint=endpoint, rate=rate, concurrency=concurrency)
+    addresses = geocoder.geocode_frame(missing)
+    geocoder.close()
+    cache.close()
+
+    missing['patched_region'] = addresses["state_district"].fillna(addresses["county"])
+    for row in missing.itertuples():
+        print(f"{row.suburb} ({row.latitude}, {row.longitude}) → {row.patched_region}")
+
+    # Apply patches to full dataset in one keyed update
+    patches = build_patches(missing, "patched_region", source="nominatim")
+    df, patched = apply_region_patches(df, patches)
+    df = apply_schema(df, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    print(f"🩹 Patched {patched} / {len(missing)} missing regions")
+    return df
+
+
+def main(endpoint=NOMINATIM_URL, rate=None, concurrency=1, output_format=OUTPUT_FORMAT):
+    df = read_typed_table(find_table(INPUT_CSV), "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    df = patch_missing_regions(df, endpoint=endpoint, rate=rate, concurrency=concurrency)
+
+    # Save the fully patched file
+    saved = write_table(df, with_format(OUTPUT_CSV, output_format))
+    print(f"✅ Saved to {saved}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Patch missing regions via Nominatim reverse geocoding")
+    parser.add_argument("--endpoint", default=NOMINATIM_URL, help="Nominatim reverse endpoint")
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second (default: per-endpoint limit)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent requests in flight")
+    parser.add_argument("--format", choices=list(FORMATS), default=OUTPUT_FORMAT, help="Output file format")
+    args = parser.parse_args()
+    main(endpoint=args.endpoint, rate=args.rate, concurrency=args.concurrency, output_format=args.format)
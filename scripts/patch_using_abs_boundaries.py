@@ -1,34 +1,65 @@
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+import os
+import sys
 
-# Load suburb data
-df = pd.read_csv("output/final_output_with_geo_fallback.csv")
-gdf_suburbs = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs="EPSG:4326")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Load ABS SA4 boundaries (GDA2020 projection)
-gdf_sa4 = gpd.read_file("data/SA4_2021_AUST_GDA2020.shp")
+from config.settings import OUTPUT_FORMAT
+from scripts.boundary_index import input_extent, read_boundaries
+from scripts.qa_engine import same_region
+from scripts.region_patches import build_patches, apply_region_patches, first_match
+from scripts.schema import STORED_COORDINATE_DTYPE, apply_schema, read_typed_table
+from scripts.table_io import find_table, with_format, write_table
 
-# Project suburb data to match SA4 CRS
-gdf_suburbs = gdf_suburbs.to_crs(gdf_sa4.crs)
+INPUT_PATH = "output/final_output_with_geo_fallback.csv"
+SA4_PATH = "data/SA4_2021_AUST_GDA2020.shp"
+OUTPUT_PATH = "output/final_output_cleaned_by_abs.csv"
 
-# Spatial join: point-in-polygon
-gdf_joined = gpd.sjoin(gdf_suburbs, gdf_sa4[["SA4_NAME21", "geometry"]], how="left", predicate="within")
 
-# Replace assigned_region with official
-gdf_joined["final_region"] = gdf_joined["SA4_NAME21"]
+def read_sa4_boundaries(bbox=None):
+    """ABS SA4 boundaries (GDA2020 projection); `bbox` (lon/lat) limits the read to the regions it touches"""
+    return read_boundaries(SA4_PATH, bbox=bbox, columns=["SA4_NAME21"])
 
-# Identify mismatches
-gdf_joined["was_different"] = gdf_joined.apply(
-    lambda row: str(row["assigned_region"]).strip().lower() != str(row["final_region"]).strip().lower(),
-    axis=1
-)
 
-# Export cleaned version
-final = gdf_joined.drop(columns=["geometry"])
-final.to_csv("output/final_output_cleaned_by_abs.csv", index=False)
+def patch_with_abs(df, gdf_sa4):
+    """`df` with final_region taken from the SA4 polygon containing each suburb, and was_different flagged"""
+    df = df.reset_index(drop=True)  # the join's left index identifies each suburb row
+    gdf_suburbs = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs="EPSG:4326")
 
-# Summary
-changed = gdf_joined["was_different"].sum()
-total = len(gdf_joined)
-print(f"✅ Mapping complete. {changed} / {total} suburbs had corrected regions.")
+    # Project suburb data to match SA4 CRS
+    gdf_suburbs = gdf_suburbs.to_crs(gdf_sa4.crs)
+
+    # Spatial join: point-in-polygon
+    gdf_joined = gpd.sjoin(gdf_suburbs, gdf_sa4[["SA4_NAME21", "geometry"]], how="left", predicate="within")
+
+    # Replace assigned_region with official; a suburb in overlapping polygons takes the first one
+    final = first_match(pd.DataFrame(gdf_joined.drop(columns=["geometry"])))
+    patches = build_patches(final, "SA4_NAME21", source="abs_sa4")
+    final, patched = apply_region_patches(final, patches)
+    final = apply_schema(final, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+
+    # Identify mismatches
+    final["was_different"] = ~same_region(final["assigned_region"], final["final_region"])
+    return final
+
+
+def main(output_format=OUTPUT_FORMAT):
+    # Load suburb data, and only the SA4 regions around the suburbs
+    df = read_typed_table(find_table(INPUT_PATH), "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    gdf_sa4 = read_sa4_boundaries(bbox=input_extent(df.longitude, df.latitude))
+    final = patch_with_abs(df, gdf_sa4)
+
+    # Export cleaned version
+    saved = write_table(final, with_format(OUTPUT_PATH, output_format))
+
+    # Summary
+    changed = final["was_different"].sum()
+    total = len(final)
+    print(f"✅ Mapping complete. {changed} / {total} suburbs had corrected regions → {saved}")
+
+
+if __name__ == "__main__":
+    # Arguments live in the unified CLI: `python scripts/automap.py patch-abs ...`
+    from scripts.automap import main
+    sys.exit(main(["patch-abs", *sys.argv[1:]]))
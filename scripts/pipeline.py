@@ -1,49 +1,36 @@
 import pandas as pd
-import geopandas as gpd
-import argparse
+import numpy as np
+import contextlib
+import json
 import os
-from shapely.geometry import Point
 import sys
-import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from config.settings import COUNTRY_CONFIG
-def run_pipeline(country_code):
-    config = COUNTRY_CONFIG.get(country_code)
-    if not config:
-        raise ValueError(f"❌ Unsupported country code: {country_code}")
+from config.settings import COUNTRY_CONFIG, OUTPUT_FORMAT
+from scripts.boundary_index import INDEX_VERSION, load_clipped_index, load_index
+from scripts.run_metrics import StageMetrics
+from scripts.schema import STORED_COORDINATE_DTYPE, apply_schema, read_typed_table
+from scripts.table_io import TableWriter, find_table, iter_table, read_table, with_format, write_table
+from scripts.run_manifest import (
+    HASH_COL, POS_COL, tag_rows, split_changed, merge_incremental,
+    load_previous_run, save_manifest, invalidate_manifest,
+)
 
-    print(f"🌍 Running pipeline for {config['name']}")
+SUMMARY_PATH = "qa_logs/pipeline_summary.json"
 
-    # Load source data
-    df = pd.read_csv(config["input_file"])
-    print(f"✅ Loaded {len(df)} rows from {config['input_file']}")
-
-    # Convert to GeoDataFrame
-    gdf = gpd.GeoDataFrame(
-        df,
-        geometry=gpd.points_from_xy(df.longitude, df.latitude),
-        crs="EPSG:4326"
-    )
 
-    # Load boundaries (GeoJSON or SHP)
-    boundary_path = config["boundary_file"]
-    boundary_gdf = gpd.read_file(boundary_path)
-    
+def map_regions(df, boundary_index, config):
+    """Join one frame of suburbs against the boundary index and derive final_region"""
     # Drop conflicting columns
-    if "index_right" in gdf.columns:
-        gdf = gdf.drop(columns=["index_right"])
-    if "index_right" in boundary_gdf.columns:
-        boundary_gdf = boundary_gdf.drop(columns=["index_right"])
-
-    # Reproject suburb data to match
-    gdf = gdf.to_crs(boundary_gdf.crs)
+    if "index_right" in df.columns:
+        df = df.drop(columns=["index_right"])
 
     # Spatial join
-    gdf_joined = gpd.sjoin(gdf, boundary_gdf, how="left", predicate="within")
-    
-    print("🧩 Columns in joined data:", gdf_joined.columns.tolist())
-
+    gdf_joined = boundary_index.join(df)
 
     # Pick best available region column
     region_col = None
@@ -64,15 +51,267 @@ def run_pipeline(country_code):
     )
     else:
         gdf_joined["was_different"] = False
+    return gdf_joined
+
+
+# -------- Parallel Workers --------
+_worker = {}
+
+
+def _init_worker(country_code, config, boundary_index=None):
+    # Each worker process loads the prebuilt index once and reuses it for every partition;
+    # clipped indexes are not persisted, so they are shipped to the worker instead
+    _worker["index"] = boundary_index if boundary_index is not None else load_index(country_code)
+    _worker["config"] = config
+
+
+def _map_partition(df):
+    return map_regions(df, _worker["index"], _worker["config"])
+
+
+def iter_mapped(frames, boundary_index, config, country_code, workers=1):
+    """Yield map_regions() for each frame, in input order, optionally on a process pool"""
+    if workers <= 1:
+        for df in frames:
+            yield df, map_regions(df, boundary_index, config)
+        return
+
+    shipped = boundary_index if boundary_index.extent is not None else None
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(country_code, config, shipped)) as pool:
+        pending = deque()
+        for df in frames:
+            pending.append((df, pool.submit(_map_partition, df)))
+            if len(pending) >= workers * 2:  # bound in-flight partitions to keep memory flat
+                df, future = pending.popleft()
+                yield df, future.result()
+        while pending:
+            df, future = pending.popleft()
+            yield df, future.result()
+
+
+def split_frame(df, workers):
+    """Contiguous row blocks, so concatenating results preserves input order"""
+    if workers <= 1 or len(df) < workers:
+        return [df]
+    bounds = np.linspace(0, len(df), workers * 4 + 1, dtype=int)
+    return [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def run_pipeline(country_code, rebuild_index=False, chunksize=None, workers=1, full=False,
+                 output_format=OUTPUT_FORMAT, profile=False, clip_boundaries=False):
+    config = COUNTRY_CONFIG.get(country_code)
+    if not config:
+        raise ValueError(f"❌ Unsupported country code: {country_code}")
+
+    print(f"🌍 Running pipeline for {config['name']}")
+    metrics = StageMetrics(
+        country_code, profile_stage="sjoin" if profile else None,
+        mode="stream" if chunksize else ("full" if full else "incremental"),
+        workers=workers, output_format=output_format, clip_boundaries=clip_boundaries,
+    )
+
+    # Load prebuilt boundary index (rebuilt and reprojected only when the boundary file changes),
+    # or read only the polygons around the input when clipping
+    input_path = find_table(config["input_file"])
+    with metrics.stage("load_boundaries"):
+        if clip_boundaries:
+            coords = read_table(input_path, columns=["longitude", "latitude"])
+            boundary_index = load_clipped_index(country_code, coords["longitude"], coords["latitude"])
+            del coords
+        else:
+            boundary_index = load_index(country_code, rebuild=rebuild_index)
+    metrics.add_rows("load_boundaries", rows_out=len(boundary_index))
 
-    # Save
-    output_path = config["output_file"]
-    gdf_joined.drop(columns=["geometry"]).to_csv(output_path, index=False)
+    output_path = with_format(config["output_file"], output_format)
+    if chunksize:
+        invalidate_manifest(output_path)  # streamed outputs are not tracked row by row
+        stream_pipeline(country_code, config, boundary_index, output_path, chunksize, workers, metrics)
+        return metrics.finish()
+
+    # Load source data
+    with metrics.stage("load_input"):
+        df = read_typed_table(input_path, country_code, coordinate_dtype=STORED_COORDINATE_DTYPE)
+    metrics.add_rows("load_input", rows_out=len(df))
+    print(f"✅ Loaded {len(df)} rows from {input_path}")
+    if "index_right" in df.columns:
+        df = df.drop(columns=["index_right"])
+    input_columns = df.columns.tolist()
+
+    # Only re-map rows that are new or changed since the last run with the same boundaries
+    with metrics.stage("diff", rows_in=len(df)) as record:
+        df = tag_rows(df)
+        previous = None if full else load_previous_run(
+            output_path, boundary_index.source_hash, input_columns, boundary_columns=boundary_index.columns,
+            index_version=INDEX_VERSION, extent=boundary_index.extent, read_output=read_table,
+        )
+        changed = split_changed(df, previous) if previous is not None else None
+        todo = df if changed is None else df[changed]
+        record["rows_out"] = len(todo)
+    if changed is not None:
+        print(f"♻️ Incremental run: {len(todo)} new or changed rows, {len(df) - len(todo)} reused")
+
+    # Spatial join and region selection
+    with metrics.stage("sjoin", rows_in=len(todo)) as record:
+        parts = split_frame(todo, workers)
+        gdf_joined = pd.concat(
+            [mapped for _, mapped in iter_mapped(parts, boundary_index, config, country_code, workers)]
+        )
+        record["rows_out"] = len(gdf_joined)
+    if changed is not None:
+        with metrics.stage("merge", rows_in=len(gdf_joined)) as record:
+            gdf_joined = merge_incremental(df, changed, previous, gdf_joined)
+            record["rows_out"] = len(gdf_joined)
+    print("🧩 Columns in joined data:", [c for c in gdf_joined.columns if c not in (HASH_COL, POS_COL)])
+
+    # Save (regions share the boundary file's category list)
+    with metrics.stage("write", rows_in=len(gdf_joined)):
+        gdf_joined = apply_schema(
+            gdf_joined, country_code, regions=boundary_index.regions, coordinate_dtype=STORED_COORDINATE_DTYPE
+        )
+        write_table(gdf_joined.drop(columns=[HASH_COL, POS_COL]), output_path)
+        save_manifest(output_path, gdf_joined, boundary_index.source_hash, input_columns,
+                      boundary_columns=boundary_index.columns, index_version=INDEX_VERSION,
+                      extent=boundary_index.extent)
+    assigned = int(gdf_joined["final_region"].notna().sum())
+    metrics.note(rows=len(gdf_joined), assigned=assigned)
+    print(f"✅ Output saved to {output_path}")
+    print(f"🔍 Regions assigned: {assigned} / {len(gdf_joined)}")
+    return metrics.finish()
+
+
+def stream_pipeline(country_code, config, boundary_index, output_path, chunksize, workers=1, metrics=None):
+    """Map the input chunk by chunk, appending to the output so memory stays flat"""
+    metrics = metrics or StageMetrics(country_code)
+    writer = TableWriter(output_path)
+    rows_in = rows_out = assigned = 0
+    start = time.perf_counter()
+
+    # Reading a chunk and joining it are interleaved (and overlap across workers), so they are
+    # charged together to "sjoin"
+    chunks = (
+        apply_schema(chunk, country_code, coordinate_dtype=STORED_COORDINATE_DTYPE)
+        for chunk in iter_table(find_table(config["input_file"]), chunksize)
+    )
+    mapped = metrics.timed_iter("sjoin", iter_mapped(chunks, boundary_index, config, country_code, workers))
+    for i, (chunk, gdf_joined) in enumerate(mapped):
+        if i == 0:
+            print("🧩 Columns in joined data:", gdf_joined.columns.tolist())
+        metrics.add_rows("sjoin", rows_in=len(chunk), rows_out=len(gdf_joined))
+        with metrics.stage("write", rows_in=len(gdf_joined)):
+            writer.write(apply_schema(
+                gdf_joined, country_code, regions=boundary_index.regions, coordinate_dtype=STORED_COORDINATE_DTYPE
+            ))
+
+        rows_in += len(chunk)
+        rows_out += len(gdf_joined)
+        assigned += int(gdf_joined["final_region"].notna().sum())
+        elapsed = time.perf_counter() - start
+        print(f"⏳ Chunk {i + 1}: {rows_in:,} rows mapped ({rows_in / elapsed:,.0f} rows/s)")
+
+    if rows_in == 0:
+        raise ValueError(f"❌ No rows found in {config['input_file']}")
+    with metrics.stage("write"):
+        writer.close()
+    metrics.note(rows=rows_out, assigned=assigned)
     print(f"✅ Output saved to {output_path}")
-    print(f"🔍 Regions assigned: {gdf_joined['final_region'].notna().sum()} / {len(gdf_joined)}")
+    print(f"🔍 Regions assigned: {assigned} / {rows_out} in {time.perf_counter() - start:.1f}s")
+
+
+# -------- Multiple Countries --------
+class _PrefixedStream:
+    """Prefix every output line so interleaved progress from concurrent countries stays readable"""
+
+    def __init__(self, stream, prefix):
+        self.stream = stream
+        self.prefix = prefix
+        self.line_start = True
+
+    def write(self, text):
+        for piece in text.splitlines(keepends=True):
+            if self.line_start:
+                self.stream.write(self.prefix)
+            self.stream.write(piece)
+            self.line_start = piece.endswith("\n")
+        self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _run_country(country_code, pipeline_kwargs):
+    with contextlib.redirect_stdout(_PrefixedStream(sys.stdout, f"[{country_code}] ")):
+        return run_pipeline(country_code, **pipeline_kwargs)
+
+
+def parse_countries(text):
+    """'all', a single code, or a comma-separated list of country codes"""
+    text = text.lower()
+    codes = list(COUNTRY_CONFIG) if text == "all" else [c.strip() for c in text.split(",") if c.strip()]
+    unknown = [c for c in codes if c not in COUNTRY_CONFIG]
+    if unknown:
+        raise ValueError(f"❌ Unsupported country code: {', '.join(unknown)}")
+    return codes
+
+
+def country_workers(workers, jobs):
+    """Join workers per country process, so `jobs` countries together stay within `workers` processes"""
+    return max(1, (workers or 1) // jobs)
+
+
+def run_countries(country_codes, jobs=None, summary_path=SUMMARY_PATH, **pipeline_kwargs):
+    """
+    Run several countries at once, one process per country, so one country's I/O overlaps
+    another's spatial join. A failing country is reported in the summary without stopping the rest.
+    Each country opens its own join pool, so `workers` is split between the `jobs` countries
+    (at least one each) instead of starting jobs × workers processes.
+    """
+    jobs = jobs or min(len(country_codes), os.cpu_count() or 1)
+    workers = country_workers(pipeline_kwargs.get("workers", 1), jobs)
+    if workers != pipeline_kwargs.get("workers", 1):
+        print(f"⚖️ Splitting {pipeline_kwargs['workers']} join workers across {jobs} countries: {workers} each")
+    pipeline_kwargs = {**pipeline_kwargs, "workers": workers}
+    print(f"🌍 Running {', '.join(country_codes)} on {jobs} process(es)")
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    start = time.perf_counter()
+    runs = {}
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = {pool.submit(_run_country, code, pipeline_kwargs): code for code in country_codes}
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                runs[code] = {"status": "ok", **future.result()}
+                print(f"✅ {COUNTRY_CONFIG[code]['name']} finished in {runs[code]['wall_s']:.1f}s")
+            except Exception as e:
+                runs[code] = {"country": code, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                print(f"❌ {COUNTRY_CONFIG[code]['name']} failed: {e}")
+
+    summary = {
+        "started_at": started_at,
+        "jobs": jobs,
+        "workers_per_country": workers,
+        "wall_s": round(time.perf_counter() - start, 4),
+        "countries": [runs[code] for code in country_codes],
+    }
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print("\n📋 Combined summary")
+    for run in summary["countries"]:
+        if run["status"] != "ok":
+            print(f"   {run['country']:<4} ❌ {run['error']}")
+            continue
+        rate = run["rows"] / run["wall_s"] if run["wall_s"] else 0
+        share = run["assigned"] / run["rows"] * 100 if run["rows"] else 0
+        print(f"   {run['country']:<4} ✅ {run['wall_s']:7.1f}s  {run['rows']:>10,} rows  "
+              f"{share:6.2f}% assigned  {rate:>10,.0f} rows/s")
+    serial = sum(run.get("wall_s", 0) for run in summary["countries"])
+    print(f"⏱️ {summary['wall_s']:.1f}s wall for {serial:.1f}s of country runs → {summary_path}")
+    return summary
+
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Country-aware suburb-to-region mapping")
-    parser.add_argument("--country", required=True, help="Country code (au, nz, in)")
-    args = parser.parse_args()
-    run_pipeline(args.country.lower())
+    # Arguments live in the unified CLI: `python scripts/automap.py pipeline ...`
+    from scripts.automap import main
+    sys.exit(main(["pipeline", *sys.argv[1:]]))
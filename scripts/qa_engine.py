@@ -0,0 +1,129 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# -------- Settings --------
+PLACEHOLDER_REGIONS = ("Unknown", "None", "", "Regional", "Unmappable - Needs Manual Classification")
+QA_REPORT_DIR = "qa_logs"
+
+
+# -------- Vectorized Helpers --------
+def _factorize(values):
+    """Codes and distinct values; categoricals reuse their own categories"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+def _masks_from_codes(codes, uniques):
+    # String checks run once per distinct value rather than once per row
+    is_placeholder = np.asarray(pd.Index(uniques).astype(str).str.strip().isin(PLACEHOLDER_REGIONS))
+    missing = codes < 0
+    placeholder = np.zeros(len(codes), dtype=bool)
+    placeholder[~missing] = is_placeholder[codes[~missing]]
+    return missing, placeholder
+
+
+def region_masks(regions):
+    """(missing, placeholder) boolean arrays for a region column"""
+    return _masks_from_codes(*_factorize(pd.Series(regions)))
+
+
+def unmapped_mask(regions):
+    """True where the region is missing or a placeholder such as 'Unknown' or 'Regional'"""
+    missing, placeholder = region_masks(regions)
+    return missing | placeholder
+
+
+def compare_regions(left, right, compare):
+    """Apply `compare(left_value, right_value)` once per distinct pair and broadcast to every row"""
+    left_codes, left_values = _factorize(pd.Series(left))
+    right_codes, right_values = _factorize(pd.Series(right))
+    # Shift codes by one so missing (-1) gets its own slot holding NaN
+    left_values = np.r_[[np.nan], np.asarray(left_values, dtype=object)]
+    right_values = np.r_[[np.nan], np.asarray(right_values, dtype=object)]
+    keys, inverse = np.unique((left_codes + 1) * len(right_values) + right_codes + 1, return_inverse=True)
+    results = np.array(
+        [compare(left_values[k // len(right_values)], right_values[k % len(right_values)]) for k in keys], dtype=bool
+    )
+    return results[inverse]
+
+
+def _normalized(value):
+    return str(value).strip().lower()
+
+
+def same_region(left, right):
+    """Case- and whitespace-insensitive equality of two region columns (missing compares as 'nan')"""
+    return compare_regions(left, right, lambda a, b: _normalized(a) == _normalized(b))
+
+
+def region_contains(needle, haystack):
+    """True where `needle` occurs in `haystack` (case-insensitive); False when either is missing"""
+    return compare_regions(
+        needle, haystack,
+        lambda a, b: pd.notnull(a) and pd.notnull(b) and str(a).lower() in str(b).lower(),
+    )
+
+
+# -------- Report --------
+def run_qa(df, bbox=None, region_col="final_region", lat_col="latitude", lon_col="longitude"):
+    """
+    All QA metrics for one output frame: missing/placeholder regions, coordinate ranges and
+    validity, country bounding-box violations, was_different rate and per-region counts.
+    `bbox` is (min_lon, min_lat, max_lon, max_lat).
+    """
+    total = len(df)
+    codes, uniques = _factorize(df[region_col])
+    missing, placeholder = _masks_from_codes(codes, uniques)
+    unmapped = missing | placeholder
+
+    lat = df[lat_col].to_numpy(dtype="float64")
+    lon = df[lon_col].to_numpy(dtype="float64")
+    valid = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)  # NaN compares False
+    coordinates = {
+        "invalid": int((~valid).sum()),
+        "lat_min": float(lat[valid].min()) if valid.any() else None,
+        "lat_max": float(lat[valid].max()) if valid.any() else None,
+        "lon_min": float(lon[valid].min()) if valid.any() else None,
+        "lon_max": float(lon[valid].max()) if valid.any() else None,
+    }
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        inside = (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        coordinates["bbox"] = list(bbox)
+        coordinates["outside_bbox"] = int((valid & ~inside).sum())
+
+    counts = np.bincount(codes[~unmapped], minlength=len(uniques)) if total else np.zeros(len(uniques), dtype=int)
+    order = np.argsort(-counts, kind="stable")
+    regions = {str(uniques[i]): int(counts[i]) for i in order if counts[i]}
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rows": total,
+        "mapped": int(total - unmapped.sum()),
+        "mapped_pct": round(float((total - unmapped.sum()) / total * 100), 2) if total else 0.0,
+        "missing": int(missing.sum()),
+        "placeholder": int(placeholder.sum()),
+        "coordinates": coordinates,
+        "unique_regions": len(regions),
+        "regions": regions,
+    }
+    if "was_different" in df.columns:
+        changed = int(df["was_different"].fillna(False).astype(bool).sum())
+        report["was_different"] = {"count": changed, "rate": round(changed / total, 4) if total else 0.0}
+    return report
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def report_path(country_code):
+    return os.path.join(QA_REPORT_DIR, f"qa_report_{country_code}.json")
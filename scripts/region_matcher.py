@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+# -------- Settings --------
+FUZZY_SCORE_CUTOFF = 90
+FUZZY_BATCH_SIZE = 2000
+
+# ABS state names → the abbreviations used in our geocoded inputs
+STATE_ABBREVIATIONS = {
+    "AUSTRALIAN CAPITAL TERRITORY": "ACT",
+    "NEW SOUTH WALES": "NSW",
+    "NORTHERN TERRITORY": "NT",
+    "QUEENSLAND": "QLD",
+    "SOUTH AUSTRALIA": "SA",
+    "TASMANIA": "TAS",
+    "VICTORIA": "VIC",
+    "WESTERN AUSTRALIA": "WA",
+    "OTHER TERRITORIES": "OT",
+}
+
+
+# -------- Normalisation --------
+def normalize_suburb(series):
+    return series.astype("string").str.lower().str.strip()
+
+
+def normalize_state(series):
+    states = series.astype("string").str.strip().str.upper()
+    return states.replace(STATE_ABBREVIATIONS)
+
+
+# -------- Fuzzy Matching --------
+def fuzzy_match_block(queries, choices, score_cutoff=FUZZY_SCORE_CUTOFF, workers=None):
+    """Best choice per query via batched rapidfuzz cdist; returns (choice positions, scores)"""
+    best_idx = np.full(len(queries), -1, dtype=np.int64)
+    best_score = np.zeros(len(queries), dtype=np.float32)
+    if len(queries) == 0 or len(choices) == 0:
+        return best_idx, best_score
+
+    for start in range(0, len(queries), FUZZY_BATCH_SIZE):
+        batch = queries[start:start + FUZZY_BATCH_SIZE]
+        scores = process.cdist(
+            batch, choices, scorer=fuzz.ratio, score_cutoff=score_cutoff,
+            dtype=np.float32, workers=workers or 1,
+        )
+        idx = scores.argmax(axis=1)
+        score = scores[np.arange(len(batch)), idx]
+        matched = score > 0
+        best_idx[start:start + len(batch)] = np.where(matched, idx, -1)
+        best_score[start:start + len(batch)] = score
+    return best_idx, best_score
+
+
+def match_regions(df, reference, suburb_col="suburb", state_col="state", region_col="assigned_region",
+                  score_cutoff=FUZZY_SCORE_CUTOFF, workers=None):
+    """
+    Match (suburb, state) pairs in `df` against `reference`.
+
+    Exact matches come from a hash join on the normalised (suburb, state) key.
+    The rest are fuzzy matched only against reference suburbs in the same state.
+    Returns a frame aligned to `df` with matched_suburb, match_score, match_type and region_col.
+    """
+    ref = pd.DataFrame({
+        "suburb_key": normalize_suburb(reference[suburb_col]),
+        "state_key": normalize_state(reference[state_col]),
+        "matched_region": reference[region_col],
+    }).dropna(subset=["suburb_key", "state_key", "matched_region"])
+    ref = ref.drop_duplicates(["suburb_key", "state_key"], keep="last")
+
+    keys = pd.DataFrame({
+        "suburb_key": normalize_suburb(df[suburb_col]).to_numpy(),
+        "state_key": normalize_state(df[state_col]).to_numpy(),
+    })
+
+    # 1. Exact match on the composite key (positional index until the end)
+    result = keys.merge(ref, on=["suburb_key", "state_key"], how="left")
+    exact = result["matched_region"].notna()
+    result["matched_suburb"] = result["suburb_key"].astype(object).where(exact)
+    result["match_score"] = np.where(exact, 100.0, np.nan)
+    result["match_type"] = np.where(exact, "exact", None)
+
+    # 2. Fuzzy match leftovers, blocked by state
+    leftovers = result.loc[~exact & result["suburb_key"].notna(), ["suburb_key", "state_key"]]
+    ref_by_state = {state: group for state, group in ref.groupby("state_key", sort=False)}
+    for state, rows in leftovers.groupby("state_key", sort=False):
+        candidates = ref_by_state.get(state)
+        if candidates is None:
+            continue
+        queries = rows["suburb_key"].unique()
+        idx, score = fuzzy_match_block(
+            queries.tolist(), candidates["suburb_key"].tolist(), score_cutoff=score_cutoff, workers=workers
+        )
+        hits = idx >= 0
+        if not hits.any():
+            continue
+        found = pd.DataFrame({
+            "matched_suburb": candidates["suburb_key"].to_numpy()[idx[hits]],
+            "matched_region": candidates["matched_region"].to_numpy()[idx[hits]],
+            "match_score": score[hits].astype("float64"),
+        }, index=pd.Index(queries[hits], name="suburb_key"))
+        found = found.reindex(rows["suburb_key"].to_numpy())
+        matched_rows = rows.index[found["matched_region"].notna().to_numpy()]
+        found = found.dropna(subset=["matched_region"])
+        result.loc[matched_rows, "matched_suburb"] = found["matched_suburb"].to_numpy()
+        result.loc[matched_rows, "matched_region"] = found["matched_region"].to_numpy()
+        result.loc[matched_rows, "match_score"] = found["match_score"].to_numpy()
+        result.loc[matched_rows, "match_type"] = "fuzzy"
+
+    result.index = df.index
+    result = result.rename(columns={"matched_region": region_col})
+    return result[["matched_suburb", "match_score", "match_type", region_col]]
@@ -0,0 +1,73 @@
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# -------- Settings --------
+PATCH_KEYS = ["suburb", "state", "latitude", "longitude"]
+
+
+def row_keys(df, keys=PATCH_KEYS):
+    """64-bit hash of each row's key columns, used to join patches without a MultiIndex"""
+    return pd.util.hash_pandas_object(df[keys], index=False).to_numpy()
+
+
+def first_match(joined, order_col="index_right"):
+    """
+    One row per left row of a left spatial join. A point where polygons overlap matches each of
+    them; keep the match with the lowest `order_col` (boundary file order) so every run agrees.
+    """
+    ordered = joined.sort_values(order_col, kind="stable", na_position="last")
+    return ordered[~ordered.index.duplicated(keep="first")].sort_index(kind="stable")
+
+
+def build_patches(df, value_col, source, keys=PATCH_KEYS, target_col="final_region"):
+    """Turn rows carrying a proposed region in `value_col` into a patch table"""
+    patches = df[keys + [value_col]].rename(columns={value_col: target_col})
+    patches["region_source"] = source
+    return patches
+
+
+def apply_region_patches(df, patches, keys=PATCH_KEYS, target_col="final_region", source="manual", timestamp=None):
+    """
+    Apply a patch table (keys + target_col, optionally region_source/region_patched_at) in one keyed update.
+
+    Patches with a null value are ignored and the last patch wins for duplicate keys.
+    Patched rows get region_source / region_patched_at provenance; other rows keep theirs.
+    Returns (patched frame, number of rows patched).
+    """
+    patches = patches.dropna(subset=[target_col]).drop_duplicates(keys, keep="last")
+    timestamp = timestamp or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    positions = pd.Index(row_keys(patches, keys)).get_indexer(row_keys(df, keys))
+    hit = positions >= 0
+    take = positions[hit]
+
+    out = df.copy()
+    provenance = {
+        target_col: patches[target_col],
+        "region_source": patches["region_source"] if "region_source" in patches else pd.Series(source, index=patches.index),
+        "region_patched_at": patches["region_patched_at"] if "region_patched_at" in patches else pd.Series(timestamp, index=patches.index),
+    }
+    for col, values in provenance.items():
+        current = out[col].to_numpy(dtype=object) if col in out else np.full(len(out), None, dtype=object)
+        current = current.copy()
+        current[hit] = values.to_numpy(dtype=object)[take]
+        out[col] = current
+    return out, int(hit.sum())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply a region patch table (e.g. manual overrides) to a mapping file")
+    parser.add_argument("--input", required=True, help="Mapping CSV to patch")
+    parser.add_argument("--patches", required=True, help=f"CSV with {', '.join(PATCH_KEYS)} and final_region")
+    parser.add_argument("--output", help="Where to write the patched CSV (defaults to --input)")
+    parser.add_argument("--source", default="manual", help="Provenance label for patches without region_source")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    patched, count = apply_region_patches(df, pd.read_csv(args.patches), source=args.source)
+    output = args.output or args.input
+    patched.to_csv(output, index=False)
+    print(f"✅ Applied {count} region patches → {output}")
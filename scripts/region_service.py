@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+from scripts.boundary_index import load_index
+
+DEFAULT_PORT = 8765
+MAX_BATCH_SIZE = 100_000
+
+
+# -------- In-process API --------
+class IndexUnavailable(RuntimeError):
+    """A supported country's boundary index could not be loaded (missing or unreadable boundary file)"""
+
+
+class RegionLookupService:
+    """Point-in-region lookups against warm, in-memory boundary indexes"""
+
+    def __init__(self, countries=None, indexes=None):
+        self.indexes = dict(indexes or {})
+        self.lock = threading.Lock()
+        for code in countries or []:
+            self.index(code)
+
+    def index(self, country_code):
+        index = self.indexes.get(country_code)
+        if index is None:
+            if country_code not in COUNTRY_CONFIG:
+                raise ValueError(f"❌ Unsupported country code: {country_code}")
+            with self.lock:
+                if country_code not in self.indexes:
+                    try:
+                        self.indexes[country_code] = load_index(country_code)
+                    except Exception as e:
+                        raise IndexUnavailable(f"❌ Boundary index for {country_code} could not be loaded: {e}") from e
+                index = self.indexes[country_code]
+        return index
+
+    def lookup(self, country_code, lat, lon):
+        """Region name containing (lat, lon), or None"""
+        index = self.index(country_code)
+        position = index.locate_point(float(lon), float(lat))
+        return region_name(index, position)
+
+    def lookup_batch(self, country_code, lats, lons):
+        """Region names for arrays of coordinates (None where no region contains the point)"""
+        index = self.index(country_code)
+        positions = index.locate(np.asarray(lons, dtype="float64"), np.asarray(lats, dtype="float64"))
+        regions = index.regions.astype(object)
+        found = np.full(len(positions), None, dtype=object)
+        hit = positions >= 0
+        found[hit] = regions[positions[hit]]
+        return [None if pd.isna(region) else region for region in found.tolist()]
+
+
+def region_name(index, position):
+    if position < 0:
+        return None
+    region = index.regions[position]
+    return None if pd.isna(region) else region
+
+
+# -------- HTTP/JSON Server --------
+class RegionLookupHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self.reply(200, {"status": "ok", "countries": sorted(self.server.service.indexes)})
+        if url.path != "/lookup":
+            return self.reply(404, {"error": "not found"})
+
+        query = parse_qs(url.query)
+        try:
+            country = query["country"][0].lower()
+            lat, lon = float(query["lat"][0]), float(query["lon"][0])
+            region = self.server.service.lookup(country, lat, lon)
+        except (KeyError, ValueError) as e:
+            return self.reply(400, {"error": str(e)})
+        except IndexUnavailable as e:
+            return self.reply(503, {"error": str(e)})
+        except Exception as e:
+            return self.reply(500, {"error": f"{type(e).__name__}: {e}"})
+        return self.reply(200, {"country": country, "lat": lat, "lon": lon, "region": region})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/lookup/batch":
+            return self.reply(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            country = body["country"].lower()
+            if "points" in body:
+                points = np.asarray(body["points"], dtype="float64").reshape(-1, 2)
+                lats, lons = points[:, 0], points[:, 1]
+            else:
+                lats, lons = body["lat"], body["lon"]
+            if len(lats) != len(lons) or len(lats) > MAX_BATCH_SIZE:
+                raise ValueError(f"lat/lon must be the same length and at most {MAX_BATCH_SIZE} points")
+            regions = self.server.service.lookup_batch(country, lats, lons)
+        except (KeyError, ValueError, TypeError) as e:
+            return self.reply(400, {"error": str(e)})
+        except IndexUnavailable as e:
+            return self.reply(503, {"error": str(e)})
+        except Exception as e:
+            return self.reply(500, {"error": f"{type(e).__name__}: {e}"})
+        return self.reply(200, {"country": country, "regions": regions})
+
+    def reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RegionLookupServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, RegionLookupHandler)
+        self.service = service
+
+
+def start_server(service, host="127.0.0.1", port=0):
+    """Serve `service` on a background thread (port=0 picks a free port)"""
+    server = RegionLookupServer((host, port), service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON point-in-region lookup service")
+    parser.add_argument("--countries", default="all", help="Comma-separated country codes to preload, or 'all'")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    countries = list(COUNTRY_CONFIG) if args.countries == "all" else args.countries.lower().split(",")
+    service = RegionLookupService(countries)
+    server = RegionLookupServer((args.host, args.port), service)
+    print(f"🌐 Region lookup service for {', '.join(countries)} on http://{args.host}:{args.port}")
+    print("   GET /lookup?country=au&lat=-33.87&lon=151.21 · POST /lookup/batch · GET /health")
+    server.serve_forever()
@@ -1,90 +1,39 @@
 import pandas as pd
-import requests
 import os
-import time
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT
+from scripts.geocode_cache import ReverseGeocodeCache, CACHE_DB, FIELDS
+from scripts.geocode_worker import ReverseGeocoder, NOMINATIM_URL
+from scripts.table_io import find_table, read_table, with_format, write_table
 
 # -------- Paths --------
 INPUT_CSV = "data/suburbs_geocoded.csv"
 OUTPUT_CSV = "output/final_output_with_real_regions.csv"
-CACHE_CSV = "cache/reverse_lookup_cache.csv"
-
-# -------- Setup --------
-os.makedirs("cache", exist_ok=True)
-os.makedirs("output", exist_ok=True)
-
-# Load input
-df = pd.read_csv(INPUT_CSV)
-
-# Load or create cache
-if os.path.exists(CACHE_CSV):
-    cache_df = pd.read_csv(CACHE_CSV)
-else:
-    cache_df = pd.DataFrame(columns=["latitude", "longitude", "county", "state_district", "state"])
-
-# -------- Reverse Geocode Function --------
-def reverse_geocode(lat, lon):
-    """Call Nominatim reverse API for a lat/lon"""
-    url = f"https://nominatim.openstreetmap.org/reverse"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "format": "jsonv2",
-        "zoom": 10,
-        "addressdetails": 1
-    }
-    headers = {
-        "User-Agent": "AutoMapAU-Geocoder"
-    }
 
-    try:
-        res = requests.get(url, params=params, headers=headers, timeout=10)
-        if res.status_code == 200:
-            data = res.json()
-            addr = data.get("address", {})
-            return (
-                addr.get("county", "Unknown"),
-                addr.get("state_district", addr.get("region", "Unknown")),
-                addr.get("state", "Unknown")
-            )
-    except Exception as e:
-        print(f"⚠️ Error for ({lat}, {lon}): {e}")
-    return "Unknown", "Unknown", "Unknown"
 
-# -------- Processing Loop --------
-regions = []
+def main(endpoint=NOMINATIM_URL, rate=None, concurrency=1, output_format=OUTPUT_FORMAT):
+    # Load input
+    df = read_table(find_table(INPUT_CSV))
+    cache = ReverseGeocodeCache(CACHE_DB)
 
-for idx, row in df.iterrows():
-    lat = round(float(row['latitude']), 6)
-    lon = round(float(row['longitude']), 6)
+    # -------- Reverse Geocode (cached, de-duplicated, rate limited) --------
+    geocoder = ReverseGeocoder(cache, endpoint=endpoint, rate=rate, concurrency=concurrency)
+    regions = geocoder.geocode_frame(df)
+    geocoder.close()
 
-    # Check cache
-    cached = cache_df[(cache_df['latitude'] == lat) & (cache_df['longitude'] == lon)]
-    if not cached.empty:
-        county = cached.iloc[0]['county']
-        district = cached.iloc[0]['state_district']
-        state = cached.iloc[0]['state']
-    else:
-        print(f"🔍 Reverse geocoding ({lat}, {lon})...")
-        county, district, state = reverse_geocode(lat, lon)
-        cache_df = pd.concat([cache_df, pd.DataFrame([{
-            "latitude": lat,
-            "longitude": lon,
-            "county": county,
-            "state_district": district,
-            "state": state
-        }])], ignore_index=True)
-        time.sleep(1.1)  # Respect rate limits
+    # -------- Merge & Save --------
+    merged = pd.concat([df, regions[list(FIELDS)].fillna("Unknown")], axis=1)
+    saved = write_table(merged, with_format(OUTPUT_CSV, output_format))
+    cache.close()
 
-    regions.append({
-        "county": county,
-        "state_district": district,
-        "state": state
-    })
+    print(f"✅ Region mapping complete. Output saved to {saved}")
+    print(f"📊 Cache: {len(cache)} cached coordinates, {geocoder.stats['fetched']} fetched this run")
 
-# -------- Merge & Save --------
-region_df = pd.DataFrame(regions)
-merged = pd.concat([df, region_df], axis=1)
-merged.to_csv(OUTPUT_CSV, index=False)
-cache_df.to_csv(CACHE_CSV, index=False)
 
-print(f"✅ Region mapping complete. Output saved to {OUTPUT_CSV}")
+if __name__ == "__main__":
+    # Arguments live in the unified CLI: `python scripts/automap.py reverse-geocode ...`
+    from scripts.automap import main
+    sys.exit(main(["reverse-geocode", *sys.argv[1:]]))
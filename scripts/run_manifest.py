@@ -0,0 +1,118 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# -------- Settings --------
+MANIFEST_VERSION = 3
+HASH_COL = "_row_hash"
+POS_COL = "_row_pos"
+
+
+def manifest_paths(output_path):
+    return output_path + ".manifest.json", output_path + ".rows.npz"
+
+
+def row_hashes(df):
+    """64-bit content hash per input row (suburb, state, lat, lon and any other input columns)"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def tag_rows(df):
+    """Add hash/position columns that ride through the join so output rows trace back to input rows"""
+    return df.assign(**{HASH_COL: row_hashes(df), POS_COL: np.arange(len(df))})
+
+
+# -------- Read / Write --------
+def _column_list(columns):
+    return None if columns is None else list(columns)
+
+
+def _extent_list(extent):
+    return None if extent is None else [float(v) for v in extent]
+
+
+def save_manifest(output_path, output_df, boundary_hash, input_columns, boundary_columns=None, index_version=None,
+                  extent=None):
+    """
+    Record the boundary hash, boundary columns, index version and clip extent, and the input row
+    behind each output row
+    """
+    manifest_path, rows_path = manifest_paths(output_path)
+    np.savez(rows_path, hashes=output_df[HASH_COL].to_numpy(), positions=output_df[POS_COL].to_numpy())
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "boundary_hash": boundary_hash,
+        "input_columns": list(input_columns),
+        "boundary_columns": _column_list(boundary_columns),
+        "index_version": index_version,
+        "extent": _extent_list(extent),
+        "output_columns": [c for c in output_df.columns if c not in (HASH_COL, POS_COL)],
+        "rows": len(output_df),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def invalidate_manifest(output_path):
+    for path in manifest_paths(output_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_previous_run(output_path, boundary_hash, input_columns, boundary_columns=None, index_version=None,
+                      extent=None, read_output=pd.read_csv):
+    """
+    Previous output tagged with row hashes, or None when a full recompute is needed. The boundary
+    columns and index version decide which attributes rows carry, and `index_right` counts
+    polygons within the clip extent, so changing any of them recomputes.
+    """
+    manifest_path, rows_path = manifest_paths(output_path)
+    if not (os.path.exists(manifest_path) and os.path.exists(rows_path) and os.path.exists(output_path)):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    if manifest["boundary_hash"] != boundary_hash:
+        print("🔁 Boundary file changed since the last run, recomputing everything")
+        return None
+    if manifest["input_columns"] != list(input_columns):
+        print("🔁 Input columns changed since the last run, recomputing everything")
+        return None
+    if (manifest.get("boundary_columns") != _column_list(boundary_columns)
+            or manifest.get("index_version") != index_version):
+        print("🔁 Boundary columns or index version changed since the last run, recomputing everything")
+        return None
+    if manifest.get("extent") != _extent_list(extent):
+        print("🔁 Boundary clip extent changed since the last run, recomputing everything")
+        return None
+
+    previous = read_output(output_path)
+    rows = np.load(rows_path)
+    if len(previous) != len(rows["hashes"]) or previous.columns.tolist() != manifest["output_columns"]:
+        return None
+    return previous.assign(**{HASH_COL: rows["hashes"], POS_COL: rows["positions"]})
+
+
+# -------- Incremental Merge --------
+def split_changed(tagged_df, previous):
+    """Boolean mask of input rows whose content hash was not seen in the previous run"""
+    return ~np.isin(tagged_df[HASH_COL].to_numpy(), previous[HASH_COL].to_numpy())
+
+
+def merge_incremental(tagged_df, changed, previous, mapped_changed):
+    """Combine reused output rows with freshly mapped ones, in input order"""
+    # Identical input rows map identically, so reuse the output of each hash's first occurrence
+    first_pos = previous.groupby(HASH_COL)[POS_COL].transform("min")
+    reusable = previous[previous[POS_COL] == first_pos].drop(columns=[POS_COL])
+
+    unchanged = tagged_df.loc[~changed, [HASH_COL, POS_COL]]
+    reused = unchanged.merge(reusable, on=HASH_COL, how="left")
+    pieces = [reused, mapped_changed] if len(mapped_changed) else [reused]
+    combined = pd.concat(pieces, ignore_index=True)
+    combined = combined.sort_values(POS_COL, kind="stable").reset_index(drop=True)
+    return combined[previous.columns]
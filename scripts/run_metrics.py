@@ -0,0 +1,144 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# -------- Settings --------
+METRICS_DIR = "qa_logs"
+METRICS_FILE = "pipeline_metrics.jsonl"
+PROFILE_TOP = 20
+
+
+def children_cpu_s():
+    """CPU time of reaped child processes (worker pools), 0 where unavailable"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss_mb():
+    """High-water resident set size of this process so far (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageMetrics:
+    """
+    Wall time, CPU time, peak RSS and row counts per pipeline stage, appended as one JSON line
+    per run to qa_logs/pipeline_metrics.jsonl. Re-entering a stage (e.g. once per chunk)
+    accumulates into the same record.
+    """
+
+    def __init__(self, country_code, profile_stage=None, metrics_dir=METRICS_DIR, **run_info):
+        self.country_code = country_code
+        self.metrics_dir = metrics_dir
+        self.run_info = run_info
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.children_cpu_start = children_cpu_s()
+        self.stages = {}
+        self.profile_stage = profile_stage
+        self.profiler = cProfile.Profile() if profile_stage else None
+
+    def _record(self, name):
+        return self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "rows_in": None, "rows_out": None})
+
+    def note(self, **info):
+        """Attach run-level values (e.g. QA counts) to the record"""
+        self.run_info.update(info)
+
+    def add_rows(self, name, rows_in=None, rows_out=None):
+        record = self._record(name)
+        if rows_in is not None:
+            record["rows_in"] = (record["rows_in"] or 0) + int(rows_in)
+        if rows_out is not None:
+            record["rows_out"] = (record["rows_out"] or 0) + int(rows_out)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = self._record(name)
+        profiling = self.profiler is not None and name == self.profile_stage
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiling:
+            self.profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiling:
+                self.profiler.disable()
+            record["wall_s"] += time.perf_counter() - wall
+            record["cpu_s"] += time.process_time() - cpu
+            record["peak_rss_mb"] = peak_rss_mb()
+            self.add_rows(name, rows_in=rows_in)
+
+    def timed_iter(self, name, iterable):
+        """Yield from `iterable`, charging the time spent producing each item to stage `name`"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    # -------- Output --------
+    def summary(self):
+        stages = []
+        for name, record in self.stages.items():
+            rows = record["rows_out"] if record["rows_out"] is not None else record["rows_in"]
+            stages.append({
+                "stage": name,
+                "wall_s": round(record["wall_s"], 4),
+                "cpu_s": round(record["cpu_s"], 4),
+                "peak_rss_mb": record.get("peak_rss_mb"),
+                "rows_in": record["rows_in"],
+                "rows_out": record["rows_out"],
+                "rows_per_s": round(rows / record["wall_s"], 1) if rows and record["wall_s"] else None,
+            })
+        return {
+            "country": self.country_code,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            **self.run_info,
+            "wall_s": round(time.perf_counter() - self.start, 4),
+            "cpu_s": round(time.process_time() - self.cpu_start, 4),
+            "worker_cpu_s": round(children_cpu_s() - self.children_cpu_start, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+        }
+
+    def finish(self):
+        """Append the run record, dump the profile if enabled, and return the record"""
+        record = self.summary()
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        with open(os.path.join(self.metrics_dir, METRICS_FILE), "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+        print("📊 Stage timings:")
+        for s in record["stages"]:
+            rate = f" · {s['rows_per_s']:,.0f} rows/s" if s["rows_per_s"] else ""
+            print(f"   {s['stage']:<16} {s['wall_s']:8.2f}s wall {s['cpu_s']:8.2f}s cpu{rate}")
+        print(f"📊 Total {record['wall_s']:.2f}s · peak RSS {record['peak_rss_mb']} MB → "
+              f"{os.path.join(self.metrics_dir, METRICS_FILE)}")
+
+        if self.profiler is not None:
+            stamp = self.started_at.strftime("%Y%m%d-%H%M%S")
+            profile_path = os.path.join(self.metrics_dir, f"profile_{self.country_code}_{self.profile_stage}_{stamp}.prof")
+            self.profiler.dump_stats(profile_path)
+            print(f"🔬 cProfile of '{self.profile_stage}' saved to {profile_path} (open with snakeviz or pstats)")
+            pstats.Stats(profile_path).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return record
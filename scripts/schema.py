@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+from scripts.table_io import read_table
+
+# -------- Settings --------
+SUBURB_COLUMNS = ("suburb", "matched_suburb", "matched_place")
+STATE_COLUMNS = ("state", "state_left", "state_right")
+REGION_COLUMNS = ("assigned_region", "final_region", "SA4_NAME21", "patched_region")
+COORDINATE_COLUMNS = ("latitude", "longitude")
+SUBURB_DTYPE = pd.StringDtype("pyarrow")
+# float32 is ~1 m at Australian longitudes, plenty for read-only views (QA, dashboard). Frames that
+# are written back keep float64 so 1e-6° reverse-geocode cache keys and row hashes stay stable.
+COORDINATE_DTYPE = "float32"
+STORED_COORDINATE_DTYPE = "float64"
+
+
+def country_schema(country_code=None):
+    """Column groups for a country; its region_field (and the _right copy from joins) are region columns"""
+    config = COUNTRY_CONFIG.get(country_code, {}) if country_code else {}
+    regions = list(REGION_COLUMNS)
+    if config.get("region_field"):
+        regions += [config["region_field"], config["region_field"] + "_right"]
+    return {"suburb": SUBURB_COLUMNS, "state": STATE_COLUMNS, "region": tuple(regions)}
+
+
+def shared_categories(df, columns, extra=None):
+    """Sorted union of the values in `columns` (plus `extra`), so those columns share one category list"""
+    parts = [pd.Index(extra).dropna()] if extra is not None else []
+    for col in columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            parts.append(values.cat.categories)
+        else:
+            parts.append(pd.Index(values.unique()).dropna())
+    if not parts:
+        return pd.Index([], dtype=object)
+    categories = parts[0].append(parts[1:]).unique() if len(parts) > 1 else parts[0].unique()
+    return categories.astype(object).sort_values()
+
+
+def _as_categorical(values, categories):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.set_categories(categories)
+    return pd.Categorical(values.astype(object), categories=categories)
+
+
+def apply_schema(df, country_code=None, regions=None, coordinate_dtype=COORDINATE_DTYPE):
+    """
+    Compact in-memory layout: state and region columns become categoricals sharing one category
+    list per group (so they compare and concatenate without decoding), coordinates
+    `coordinate_dtype` and suburb names Arrow strings. `regions` adds known regions (e.g. a
+    boundary index) to the list.
+    """
+    schema = country_schema(country_code)
+    out = df.copy(deep=False)
+    for group, extra in (("state", None), ("region", regions)):
+        columns = [c for c in schema[group] if c in out.columns]
+        if not columns:
+            continue
+        categories = shared_categories(out, columns, extra)
+        for col in columns:
+            out[col] = _as_categorical(out[col], categories)
+    for col in COORDINATE_COLUMNS:
+        if col in out.columns and pd.api.types.is_float_dtype(out[col]):
+            out[col] = out[col].astype(coordinate_dtype)
+    for col in schema["suburb"]:
+        if col in out.columns and (out[col].dtype == object or pd.api.types.is_string_dtype(out[col])):
+            out[col] = out[col].astype(SUBURB_DTYPE)
+    return out
+
+
+def read_typed_table(path, country_code=None, columns=None, coordinate_dtype=COORDINATE_DTYPE):
+    """read_table() with the country's typed schema applied"""
+    return apply_schema(read_table(path, columns=columns), country_code, coordinate_dtype=coordinate_dtype)
+
+
+def memory_mb(df):
+    return float(np.round(df.memory_usage(deep=True).sum() / 2**20, 2))
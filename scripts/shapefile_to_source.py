@@ -1,27 +1,47 @@
-import geopandas as gpd
 import pandas as pd
+import argparse
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.boundary_index import read_boundaries
+from scripts.table_io import FORMATS, with_format, write_table
 
 # Path to India's shapefile
 shapefile = "countries/in/boundaries/india-districts.shp"
-gdf = gpd.read_file(shapefile)
-
-# Reproject to a meter-based CRS for accurate centroids
-gdf = gdf.to_crs(epsg=3857)
-gdf["centroid"] = gdf.geometry.centroid
-gdf = gdf.set_geometry("centroid").to_crs(epsg=4326)
-
-# Extract required fields
-df = pd.DataFrame({
-    "suburb": gdf["DISTRICT"].str.strip(),
-    "state": gdf["ST_NM"].str.strip(),
-    "latitude": gdf.geometry.y,
-    "longitude": gdf.geometry.x
-})
-
-# Save to CSV
 output_path = "countries/in/source.csv"
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-df.to_csv(output_path, index=False)
 
-print(f"✅ Saved source.csv with {len(df)} rows at {output_path}")
+
+def main(output_format="csv", bbox=None):
+    # bbox (min_lon, min_lat, max_lon, max_lat) keeps only districts around a region of interest
+    gdf = read_boundaries(shapefile, bbox=bbox, columns=["DISTRICT", "ST_NM"])
+
+    # Reproject to a meter-based CRS for accurate centroids
+    gdf = gdf.to_crs(epsg=3857)
+    gdf["centroid"] = gdf.geometry.centroid
+    gdf = gdf.set_geometry("centroid").to_crs(epsg=4326)
+
+    # Extract required fields
+    df = pd.DataFrame({
+        "suburb": gdf["DISTRICT"].str.strip(),
+        "state": gdf["ST_NM"].str.strip(),
+        "latitude": gdf.geometry.y,
+        "longitude": gdf.geometry.x
+    })
+
+    # Save source table
+    saved = write_table(df, with_format(output_path, output_format))
+    print(f"✅ Saved source table with {len(df)} rows at {saved}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the India source table from district centroids")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv", help="Output file format")
+    parser.add_argument("--bbox", default=None,
+                        help="Only districts intersecting min_lon,min_lat,max_lon,max_lat (degrees)")
+    args = parser.parse_args()
+    bbox = tuple(float(v) for v in args.bbox.split(",")) if args.bbox else None
+    if bbox is not None and len(bbox) != 4:
+        parser.error("--bbox needs four comma-separated values")
+    main(output_format=args.format, bbox=bbox)
@@ -1,31 +1,166 @@
 import geopandas as gpd
 import pandas as pd
+import numpy as np
+import shapely
+import argparse
+import hashlib
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import OUTPUT_FORMAT
+from scripts.boundary_index import hash_boundary_file
+from scripts.table_io import FORMATS, read_table, with_format, write_table
 
 # Set your working directory appropriately or use absolute paths
 sal_path = "data/shapefiles/sal/SAL_2021_AUST_GDA2020.shp"
 sa4_path = "data/shapefiles/sa4/SA4_2021_AUST_GDA2020.shp"
 output_path = "data/sal_to_sa4_mapping.csv"
 
-# Load shapefiles
-print("🔄 Loading SAL and SA4 shapefiles...")
-sal_gdf = gpd.read_file(sal_path)
-sa4_gdf = gpd.read_file(sa4_path)
+# -------- Settings --------
+CACHE_DIR = "cache/sal_to_sa4"
+ASSIGNMENT_VERSION = 1
+CHUNK_SIZE = 2000
+
+
+# -------- Fast Assignment --------
+_worker = {}
+
+
+def _init_worker(sa4_geoms):
+    _worker["sa4"] = sa4_geoms
+    _worker["tree"] = shapely.STRtree(sa4_geoms)
+    shapely.prepare(sa4_geoms)
+
+
+def _assign_chunk(sal_geoms):
+    return assign_polygons(sal_geoms, _worker["sa4"], _worker["tree"])
+
+
+def assign_polygons(sal_geoms, sa4_geoms, tree=None):
+    """
+    SA4 position per SAL polygon (-1 if it touches none) and whether the overlap tiebreak was needed.
+
+    Each SAL goes to the SA4 holding its representative point. Only SALs that are not wholly
+    inside that SA4 (edges crossing a border, or the point falling outside every SA4) are
+    resolved by the largest intersection area.
+    """
+    tree = tree or shapely.STRtree(sa4_geoms)
+    shapely.prepare(sa4_geoms)
+    positions = np.full(len(sal_geoms), -1, dtype=np.int64)
+
+    # Bounding-box candidates, then point-in-polygon against the prepared SA4s
+    points = shapely.point_on_surface(sal_geoms)
+    x, y = shapely.get_x(points), shapely.get_y(points)
+    point_idx, poly_idx = tree.query(points)
+    inside = shapely.contains_xy(sa4_geoms[poly_idx], x[point_idx], y[point_idx])
+    order = np.lexsort((poly_idx[inside], point_idx[inside]))
+    point_idx, poly_idx = point_idx[inside][order], poly_idx[inside][order]
+    first = np.r_[True, point_idx[1:] != point_idx[:-1]] if len(point_idx) else np.zeros(0, dtype=bool)
+    positions[point_idx[first]] = poly_idx[first]
+
+    located = np.flatnonzero(positions >= 0)
+    clean = np.zeros(len(sal_geoms), dtype=bool)
+    clean[located] = shapely.contains(sa4_geoms[positions[located]], sal_geoms[located])
+    ambiguous = np.flatnonzero(~clean)
+
+    sal_idx, sa4_idx = tree.query(sal_geoms[ambiguous], predicate="intersects")
+    single = np.bincount(sal_idx, minlength=len(ambiguous))[sal_idx] == 1
+    positions[ambiguous[sal_idx[single]]] = sa4_idx[single]  # touches one SA4 only: no areas needed
+    sal_idx, sa4_idx = sal_idx[~single], sa4_idx[~single]
+    if len(sal_idx):
+        areas = shapely.area(shapely.intersection(sal_geoms[ambiguous][sal_idx], sa4_geoms[sa4_idx]))
+        order = np.lexsort((-areas, sal_idx))  # largest overlap first within each SAL
+        best = order[np.r_[True, sal_idx[order][1:] != sal_idx[order][:-1]]]
+        positions[ambiguous[sal_idx[best]]] = sa4_idx[best]
+    return positions, ~clean
+
+
+def assign_sal_to_sa4(sal_gdf, sa4_gdf, workers=1):
+    """Fast SAL → SA4 mapping frame (suburb, state, assigned_region), optionally on a process pool"""
+    sal_geoms = np.asarray(sal_gdf.geometry.values, dtype=object)
+    sa4_geoms = np.asarray(sa4_gdf.geometry.values, dtype=object)
+    chunks = [sal_geoms[i:i + CHUNK_SIZE] for i in range(0, len(sal_geoms), CHUNK_SIZE)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(sa4_geoms,)) as pool:
+            results = list(pool.map(_assign_chunk, chunks))
+    else:
+        tree = shapely.STRtree(sa4_geoms)
+        results = [assign_polygons(chunk, sa4_geoms, tree) for chunk in chunks]
+    positions = np.concatenate([r[0] for r in results]) if results else np.zeros(0, dtype=np.int64)
+    ambiguous = np.concatenate([r[1] for r in results]) if results else np.zeros(0, dtype=bool)
+
+    matched = positions >= 0
+    sa4_attrs = sa4_gdf[["STE_NAME21", "SA4_NAME21"]].reset_index(drop=True)
+    picked = sa4_attrs.reindex(np.where(matched, positions, -1)).reset_index(drop=True)
+    result = pd.DataFrame({
+        "suburb": sal_gdf["SAL_NAME21"].to_numpy(),
+        "state": picked["STE_NAME21"].fillna(sal_gdf["STE_NAME21"].reset_index(drop=True)).to_numpy(),
+        "assigned_region": picked["SA4_NAME21"].to_numpy(),
+    })
+    print(f"📐 {len(result)} localities: {(~ambiguous).sum()} by representative point, "
+          f"{(ambiguous & matched).sum()} by largest overlap, {(~matched).sum()} outside every SA4")
+    return result
+
+
+# -------- Cache --------
+def cache_path(sal_hash, sa4_hash):
+    key = hashlib.sha256(f"{ASSIGNMENT_VERSION}:{sal_hash}:{sa4_hash}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def build_mapping(mode="fast", workers=1):
+    """suburb, state, assigned_region for every SAL, read straight from the two shapefiles"""
+    # Load shapefiles
+    print("🔄 Loading SAL and SA4 shapefiles...")
+    sal_gdf = gpd.read_file(sal_path)
+    sa4_gdf = gpd.read_file(sa4_path)
+
+    # Ensure CRS match
+    sal_gdf = sal_gdf.to_crs(sa4_gdf.crs)
+
+    if mode == "fast":
+        print("📌 Assigning localities by representative point...")
+        sa4_gdf = sa4_gdf[sa4_gdf.geometry.notna()]  # some ABS "no usual address" rows have no geometry
+        return assign_sal_to_sa4(sal_gdf, sa4_gdf, workers=workers)
+
+    # Spatial join
+    print("📌 Performing spatial join...")
+    joined = gpd.sjoin(sal_gdf, sa4_gdf, how="left", predicate="within")
+    print("🧾 Columns available after join:", joined.columns.tolist())
+
+    # Select and rename columns
+    result = pd.DataFrame(joined[["SAL_NAME21", "STE_NAME21_right", "SA4_NAME21"]])
+    result.columns = ["suburb", "state", "assigned_region"]
+    return result
+
 
-# Ensure CRS match
-sal_gdf = sal_gdf.to_crs(sa4_gdf.crs)
+def main(output_format=OUTPUT_FORMAT, mode="fast", workers=1, rebuild=False):
+    saved_path = with_format(output_path, output_format)
+    if mode == "fast":
+        cached = cache_path(hash_boundary_file(sal_path), hash_boundary_file(sa4_path))
+        if not rebuild and os.path.exists(cached):
+            saved = write_table(read_table(cached), saved_path)
+            print(f"♻️ Shapefiles unchanged, reused cached mapping {cached} → {saved}")
+            return
 
-# Spatial join
-print("📌 Performing spatial join...")
-joined = gpd.sjoin(sal_gdf, sa4_gdf, how="left", predicate="within")
-print("🧾 Columns available after join:", joined.columns.tolist())
+    result = build_mapping(mode=mode, workers=workers)
+    if mode == "fast":
+        write_table(result, cached)
 
+    # Save output
+    saved = write_table(result, saved_path)
+    print(f"✅ Done! Mapping saved to: {saved}")
 
-# Select and rename columns
-result = joined[["SAL_NAME21", "STE_NAME21_right", "SA4_NAME21"]]
-result.columns = ["suburb", "state", "assigned_region"]
 
-# Save output
-os.makedirs("data", exist_ok=True)
-result.to_csv(output_path, index=False)
-print(f"✅ Done! Mapping saved to: {output_path}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map ABS SAL localities to SA4 regions")
+    parser.add_argument("--format", choices=list(FORMATS), default=OUTPUT_FORMAT, help="Output file format")
+    parser.add_argument("--mode", choices=["fast", "within"], default="fast",
+                        help="fast: representative point + largest-overlap tiebreak (cached); within: full polygon sjoin")
+    parser.add_argument("--workers", type=int, default=1, help="Assign chunks of localities on N worker processes")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cached mapping")
+    args = parser.parse_args()
+    main(output_format=args.format, mode=args.mode, workers=args.workers, rebuild=args.rebuild)
@@ -0,0 +1,83 @@
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.boundary_index import BoundaryIndex
+
+# -------- Settings --------
+AU_EXTENT = (113.0, -44.0, 154.0, -10.0)
+AU_STATES = ["NSW", "VIC", "QLD", "SA", "WA", "TAS", "NT", "ACT"]
+SYLLABLES = [
+    "ba", "bel", "bon", "cal", "dar", "del", "ger", "ham", "kin", "lam", "mar", "mel",
+    "nor", "oak", "par", "quin", "ros", "sun", "tar", "wal", "wil", "yar", "ton", "vale",
+]
+
+
+# -------- Boundaries --------
+def synthetic_boundaries(polygons, extent=AU_EXTENT, seed=0, region_field="region"):
+    """Voronoi regions over `extent`, densified so point-in-polygon costs look like real boundaries"""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = extent
+    seeds = shapely.multipoints(np.column_stack([rng.uniform(minx, maxx, polygons), rng.uniform(miny, maxy, polygons)]))
+    cells = shapely.get_parts(shapely.voronoi_polygons(seeds, extend_to=shapely.box(*extent)))
+    cells = shapely.segmentize(shapely.intersection(cells, shapely.box(*extent)), (maxx - minx) / 2000)
+    return gpd.GeoDataFrame({region_field: [f"Region {i}" for i in range(len(cells))]}, geometry=cells, crs="EPSG:4326")
+
+
+def synthetic_index(polygons, extent=AU_EXTENT, seed=0):
+    boundaries = synthetic_boundaries(polygons, extent, seed)
+    return BoundaryIndex(boundaries.geometry.values, boundaries.drop(columns="geometry"), "region")
+
+
+# -------- Suburbs --------
+def suburb_names(n, seed=0):
+    """`n` distinct pronounceable place names"""
+    rng = np.random.default_rng(seed)
+    names = set()
+    while len(names) < n:
+        parts = rng.integers(0, len(SYLLABLES), size=(n, 4))
+        lengths = rng.integers(2, 5, size=n)
+        names.update("".join(SYLLABLES[p] for p in row[:k]).title() for row, k in zip(parts, lengths))
+    return sorted(names)[:n]
+
+
+def synthetic_suburbs(points, names=None, extent=AU_EXTENT, seed=1):
+    """Geocoded suburb rows (suburb, state, latitude, longitude) scattered over `extent`"""
+    rng = np.random.default_rng(seed)
+    names = names or max(points // 5, 10)
+    vocabulary = np.array(suburb_names(names, seed))
+    states = np.array(AU_STATES)[rng.integers(0, len(AU_STATES), names)]
+    picks = rng.integers(0, names, points)
+    minx, miny, maxx, maxy = extent
+    return pd.DataFrame({
+        "suburb": vocabulary[picks],
+        "state": states[picks],
+        "latitude": rng.uniform(miny, maxy, points),
+        "longitude": rng.uniform(minx, maxx, points),
+    })
+
+
+def misspell(names, fraction, seed=2):
+    """Swap two adjacent letters in a random `fraction` of names (exact match fails, fuzzy recovers)"""
+    rng = np.random.default_rng(seed)
+    names = names.to_numpy(dtype=object).copy()
+    for i in np.flatnonzero(rng.random(len(names)) < fraction):
+        name = names[i]
+        j = rng.integers(1, len(name) - 1)
+        names[i] = name[:j] + name[j + 1] + name[j] + name[j + 2:]
+    return names
+
+
+def synthetic_reference(suburbs, boundary_index):
+    """SAL→region style mapping (one row per suburb/state) with the region under its first point"""
+    reference = suburbs.drop_duplicates(["suburb", "state"]).reset_index(drop=True)
+    positions = boundary_index.locate(reference["longitude"].to_numpy(), reference["latitude"].to_numpy())
+    regions = boundary_index.regions
+    reference["assigned_region"] = np.where(positions >= 0, regions[np.maximum(positions, 0)], None)
+    return reference
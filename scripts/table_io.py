@@ -0,0 +1,182 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from config.settings import OUTPUT_FORMATS
+
+# -------- Settings --------
+FORMATS = {fmt: f".{fmt}" for fmt in OUTPUT_FORMATS}
+CATEGORICAL_COLUMNS = ("state", "assigned_region", "SA4_NAME21", "final_region", "region_source")
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+# Columns whose type a streamed first chunk can't be trusted to show (they may be all-null there)
+TEXT_COLUMNS = ("suburb", "matched_suburb", "matched_place", "patched_region", "region_patched_at")
+NUMERIC_COLUMNS = ("latitude", "longitude", "match_score", "fallback_distance_km")
+
+
+# -------- Paths --------
+def format_of(path):
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"❌ Unsupported table format: {path}")
+
+
+def with_format(path, fmt):
+    """Swap the extension of `path` for the one used by `fmt`"""
+    if fmt not in FORMATS:
+        raise ValueError(f"❌ Unsupported output format: {fmt} (choose from {', '.join(FORMATS)})")
+    return os.path.splitext(path)[0] + FORMATS[fmt]
+
+
+def find_table(path):
+    """Most recently written variant of `path` across formats (the path itself if none exist)"""
+    candidates = [with_format(path, fmt) for fmt in FORMATS]
+    existing = [candidate for candidate in candidates if os.path.exists(candidate)]
+    return max(existing, key=os.path.getmtime) if existing else path
+
+
+# -------- Read / Write --------
+def categorize(df, columns=CATEGORICAL_COLUMNS):
+    """Store low-cardinality region/state columns as categoricals (dictionary-encoded on disk)"""
+    converts = {
+        col: "category" for col in columns
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        and (df[col].dtype == object or pd.api.types.is_string_dtype(df[col]))
+    }
+    return df.astype(converts) if converts else df
+
+
+def table_columns(path):
+    """Column names without reading the data"""
+    fmt = format_of(path)
+    if fmt == "parquet":
+        return pq.read_schema(path).names
+    if fmt == "feather":
+        return feather.read_table(path, memory_map=True).schema.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_table(path, columns=None):
+    """Read CSV, Parquet or Feather by extension; columnar files are memory-mapped"""
+    fmt = format_of(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    if fmt == "feather":
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_table(path, chunksize):
+    """Yield frames of at most `chunksize` rows without loading the whole file"""
+    fmt = format_of(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif fmt == "parquet":
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        table = feather.read_table(path, memory_map=True)
+        for start in range(0, table.num_rows, chunksize):
+            yield table.slice(start, chunksize).to_pandas()
+
+
+def write_table(df, path):
+    """Write by extension, atomically; categorical columns stay dictionary-encoded"""
+    fmt = format_of(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".partial"
+    if fmt == "csv":
+        df.to_csv(tmp_path, index=False)
+    else:
+        table = pa.Table.from_pandas(categorize(df), preserve_index=False)
+        if fmt == "parquet":
+            pq.write_table(table, tmp_path)
+        else:
+            feather.write_feather(table, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+class TableWriter:
+    """Append frames chunk by chunk to a CSV, Parquet or Feather file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fmt = format_of(path)
+        self.tmp_path = path + ".partial"
+        self.schema = None
+        self.dictionaries = {}
+        self.writer = None
+        self.started = False
+        self.rows = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _schema_for(self, df):
+        # Fix the schema from the first chunk. Region/state columns are dictionaries, known text
+        # columns strings and ints widen to float. A column that is all-null in this chunk gives no
+        # type (CSV reads it as float64), so unless it is a known numeric column it becomes a string.
+        # Feather can't grow an empty dictionary, so there an all-null region column is a string too.
+        fields = []
+        for col in df.columns:
+            dtype = df[col].dtype
+            categorical = col in CATEGORICAL_COLUMNS or isinstance(dtype, pd.CategoricalDtype)
+            if categorical and (self.fmt == "parquet" or df[col].notna().any()):
+                fields.append(pa.field(col, DICTIONARY_TYPE))
+            elif col in TEXT_COLUMNS:
+                fields.append(pa.field(col, pa.string()))
+            elif pd.api.types.is_bool_dtype(dtype):
+                fields.append(pa.field(col, pa.bool_()))
+            elif pd.api.types.is_numeric_dtype(dtype) and (col in NUMERIC_COLUMNS or df[col].notna().any()):
+                fields.append(pa.field(col, pa.float64()))
+            else:
+                fields.append(pa.field(col, pa.string()))
+        # Keep the pandas metadata write_table() stores, so both read back with the same dtypes
+        metadata = pa.Schema.from_pandas(categorize(df), preserve_index=False).metadata
+        return pa.schema(fields, metadata=metadata)
+
+    def _encode(self, col, values):
+        # One dictionary per column that only ever grows, so every chunk's dictionary extends the
+        # previous one (Feather files only accept such deltas, not replacements)
+        text = values.astype(object).where(values.notna(), None)
+        known = self.dictionaries.get(col, pd.Index([], dtype=object))
+        new = pd.Index(text.dropna().map(str).unique()).difference(known)
+        if len(new):
+            known = self.dictionaries[col] = known.append(new)
+        codes = known.get_indexer(text.map(lambda v: v if v is None else str(v)))
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, type=pa.int32(), mask=codes < 0), pa.array(known.to_numpy(), type=pa.string())
+        )
+
+    def _column(self, field, values):
+        if pa.types.is_dictionary(field.type):
+            return self._encode(field.name, values)
+        if pa.types.is_string(field.type) and not (values.dtype == object or pd.api.types.is_string_dtype(values)):
+            values = values.astype(object).where(values.notna(), None).map(lambda v: v if v is None else str(v))
+        return pa.Array.from_pandas(values, type=field.type)
+
+    def write(self, df):
+        if self.fmt == "csv":
+            df.to_csv(self.tmp_path, mode="a" if self.started else "w", header=not self.started, index=False)
+        else:
+            if self.schema is None:
+                self.schema = self._schema_for(df)
+                if self.fmt == "parquet":
+                    self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+                else:
+                    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                    self.writer = pa.ipc.new_file(self.tmp_path, self.schema, options=options)
+            columns = [self._column(field, df[field.name]) for field in self.schema]
+            self.writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+        self.started = True
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if os.path.exists(self.tmp_path):
+            os.replace(self.tmp_path, self.path)
+        return self.path
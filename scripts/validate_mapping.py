@@ -1,36 +1,44 @@
-import pandas as pd
-import argparse
 import os
 import sys
-import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from config.settings import COUNTRY_CONFIG
+from scripts.qa_engine import report_path, run_qa, write_report
+from scripts.schema import read_typed_table
+from scripts.table_io import find_table, table_columns
+
+QA_COLUMNS = ["final_region", "latitude", "longitude", "was_different"]
+
 
 def validate_output(country_code):
     config = COUNTRY_CONFIG.get(country_code)
     if not config:
         raise ValueError(f"❌ Unsupported country code: {country_code}")
 
-    df = pd.read_csv(config["output_file"])
-    total = len(df)
-    missing = df['final_region'].isna().sum()
-    placeholder_values = ["Unknown", "None", "", "Regional", "Unmappable - Needs Manual Classification"]
-    bad_values = df['final_region'].astype(str).str.strip().isin(placeholder_values).sum()
-
-    lat_ok = df['latitude'].between(-90, 90).all()
-    lon_ok = df['longitude'].between(-180, 180).all()
+    path = find_table(config["output_file"])
+    columns = [c for c in QA_COLUMNS if c in table_columns(path)]
+    report = run_qa(read_typed_table(path, country_code, columns=columns), bbox=config.get("bbox"))
+    report["country"] = country_code
+    saved = write_report(report, report_path(country_code))
 
+    coords = report["coordinates"]
     print(f"\n🔍 QA Report for {config['name']}")
-    print(f"📦 Total rows: {total}")
-    print(f"✅ Mapped: {total - (missing + bad_values)}")
-    print(f"🚫 Missing final_region: {missing}")
-    print(f"🚫 Placeholder/Bad region values: {bad_values}")
-    print(f"🌐 Coordinates valid: {lat_ok and lon_ok}")
+    print(f"📦 Total rows: {report['rows']}")
+    print(f"✅ Mapped: {report['mapped']} ({report['mapped_pct']}%)")
+    print(f"🚫 Missing final_region: {report['missing']}")
+    print(f"🚫 Placeholder/Bad region values: {report['placeholder']}")
+    print(f"🌐 Coordinates valid: {coords['invalid'] == 0}")
+    if "outside_bbox" in coords:
+        print(f"🗺️ Outside {config['name']} bounding box: {coords['outside_bbox']}")
+    if "was_different" in report:
+        print(f"🔁 Region changed by spatial join: {report['was_different']['count']} "
+              f"({report['was_different']['rate']:.2%})")
+    print(f"🌐 Unique regions: {report['unique_regions']}")
+    print(f"📝 JSON report saved to {saved}")
     print("✅ QA Complete.\n")
+    return report
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Cross-country QA validation")
-    parser.add_argument("--country", required=True, help="Country code (au, nz, in)")
-    args = parser.parse_args()
-    validate_output(args.country.lower())
+    # Arguments live in the unified CLI: `python scripts/automap.py validate ...`
+    from scripts.automap import main
+    sys.exit(main(["validate", *sys.argv[1:]]))
@@ -8,6 +8,11 @@ import os
 # ✅ Ensure config/settings.py is importable (important for Streamlit Cloud)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config.settings import COUNTRY_CONFIG
+from scripts.schema import read_typed_table
+from scripts.table_io import find_table
+from streamlit_app.dashboard_index import DashboardIndex
+from streamlit_app.exports import EXPORT_FORMATS, ExportCache, export_bytes
+from streamlit_app.map_layers import MAX_CLUSTER_POINTS, cluster_layer, grid_aggregate, grid_layer, map_bounds
 
 # ------------------------
 # PAGE CONFIG
@@ -33,15 +38,31 @@ country_code = next(code for code, cfg in COUNTRY_CONFIG.items() if cfg["name"]
 config = COUNTRY_CONFIG[country_code]
 
 # ------------------------
-# LOAD DATA (Only CSVs)
+# LOAD DATA (Parquet/Feather preferred, CSV fallback)
 # ------------------------
 
-@st.cache_data
-def load_data(path):
-    return pd.read_csv(path)
+# cache_resource shares one read-only frame and its filter index across sessions and reruns
+# (cache_data would hand every rerun a fresh copy of the whole dataset)
+@st.cache_resource
+def load_data(path, mtime, country_code):
+    # mtime is part of the cache key so a re-run pipeline is picked up; regions/states load as
+    # categoricals, coordinates as float32 and suburbs as Arrow strings
+    return read_typed_table(path, country_code)
+
+@st.cache_resource
+def load_index(path, mtime, country_code):
+    return DashboardIndex(load_data(path, mtime, country_code))
+
+@st.cache_resource
+def export_cache():
+    # Shared LRU of encoded downloads, so exports are built on request and only once per filter state
+    return ExportCache()
 
 try:
-    df = load_data(config["output_file"])
+    data_path = find_table(config["output_file"])
+    data_mtime = os.path.getmtime(data_path)
+    df = load_data(data_path, data_mtime, country_code)
+    index = load_index(data_path, data_mtime, country_code)
 except Exception as e:
     st.error(f"❌ Could not load data for {country_display}: {e}")
     st.stop()
@@ -50,10 +71,9 @@ except Exception as e:
 # GLOBAL METRICS
 # ------------------------
 
-unmapped_keywords = ["Unknown", "None", "", "Regional", "Unmappable - Needs Manual Classification"]
 total = len(df)
-unique_regions = df['final_region'].nunique()
-unmapped = df['final_region'].isna().sum() + df['final_region'].astype(str).str.strip().isin(unmapped_keywords).sum()
+unique_regions = len(index.regions)
+unmapped = index.unmapped_count()
 
 col1, col2, col3 = st.columns(3)
 col1.metric("🧾 Total Suburbs", total)
@@ -68,24 +88,22 @@ st.markdown("---")
 
 with st.sidebar:
     st.header("🔎 Refine Your View")
-    selected_state = st.selectbox("Select State", ["All"] + sorted(df["state"].dropna().unique().tolist()))
-    selected_region = st.selectbox("Select Region", ["All"] + sorted(df["final_region"].dropna().unique().tolist()))
+    selected_state = st.selectbox("Select State", ["All"] + index.state_options())
+    selected_region = st.selectbox("Select Region", ["All"] + index.region_options())
     selected_suburb = st.text_input("Search Suburb (partial match, case-insensitive)")
+    map_mode = st.radio("Map Mode", ["Region grid", "Clustered points"],
+                        help="Region grid aggregates every filtered suburb into cells coloured by their main region")
 
 # ------------------------
 # FILTER DATA
 # ------------------------
 
-filtered = df.copy()
-
-if selected_state != "All":
-    filtered = filtered[filtered["state"] == selected_state]
-
-if selected_region != "All":
-    filtered = filtered[filtered["final_region"] == selected_region]
-
-if selected_suburb:
-    filtered = filtered[filtered["suburb"].str.lower().str.contains(selected_suburb.lower())]
+positions = index.filter(
+    state=None if selected_state == "All" else selected_state,
+    region=None if selected_region == "All" else selected_region,
+    suburb_query=selected_suburb,
+)
+filtered = df.iloc[positions]
 
 # ------------------------
 # FILTERED METRICS
@@ -95,10 +113,7 @@ st.markdown("---")
 st.subheader(f"📂 Filtered Results for {country_display}")
 
 filtered_total = len(filtered)
-filtered_unmapped = (
-    filtered['final_region'].isna().sum() +
-    filtered['final_region'].astype(str).str.strip().isin(unmapped_keywords).sum()
-)
+filtered_unmapped = index.unmapped_count(positions)
 filtered_mapped = filtered_total - filtered_unmapped
 mapped_percent = (filtered_mapped / filtered_total * 100) if filtered_total > 0 else 0
 
@@ -119,25 +134,23 @@ st.dataframe(filtered[["suburb", "state", "final_region", "latitude", "longitude
 # MAP WITH FOLIUM
 # ------------------------
 
-MAX_MARKERS = 500
-filtered_map = filtered.head(MAX_MARKERS)
+region_codes = index.region_codes[positions]
+lats = filtered["latitude"].to_numpy(dtype=float)
+lons = filtered["longitude"].to_numpy(dtype=float)
+bounds = map_bounds(lats, lons)
 
-if not filtered_map.empty:
+if bounds is not None:
     st.subheader("🗺️ Map View (Filtered)")
-    avg_lat = filtered_map["latitude"].mean()
-    avg_lon = filtered_map["longitude"].mean()
-    m = folium.Map(location=[avg_lat, avg_lon], zoom_start=6)
-    for _, row in filtered_map.iterrows():
-        folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
-            radius=4,
-            color="blue",
-            fill=True,
-            fill_color="blue",
-            fill_opacity=0.7,
-            popup=f"{row['suburb']} ({row['state']}) → {row['final_region']}"
-        ).add_to(m)
-    st_data = st_folium(m, width=1000)
+    use_clusters = map_mode == "Clustered points" and filtered_total <= MAX_CLUSTER_POINTS
+    if map_mode == "Clustered points" and not use_clusters:
+        st.caption(f"⚠️ {filtered_total:,} suburbs is too many to cluster in the browser; showing the region grid instead.")
+    m = folium.Map(zoom_start=6)
+    if use_clusters:
+        cluster_layer(filtered, region_codes).add_to(m)
+    else:
+        grid_layer(grid_aggregate(lats, lons, region_codes), index.regions).add_to(m)
+    m.fit_bounds(bounds)
+    st_data = st_folium(m, width=1000, returned_objects=[])
 else:
     st.info("No suburbs to show on map.")
 
@@ -146,19 +159,30 @@ else:
 # ------------------------
 
 st.markdown("### 📥 Download Filtered Results")
-st.download_button(
-    label="Download CSV (Filtered)",
-    data=filtered.to_csv(index=False),
-    file_name=f"filtered_suburbs_{country_code}.csv",
-    mime="text/csv"
-)
-
-unmapped_df = df[df['final_region'].isna() | df['final_region'].astype(str).str.strip().isin(unmapped_keywords)]
-if not unmapped_df.empty:
+export_format = st.radio("Export Format", list(EXPORT_FORMATS), horizontal=True)
+export_ext, export_mime = EXPORT_FORMATS[export_format]
+exports = export_cache()
+
+def download(label, name, frame, filter_key):
+    # Encoding runs only after a click; later reruns with the same filters reuse the cached bytes
+    key = (data_path, data_mtime, name, *filter_key, export_ext)
+    data = exports.peek(key)
+    slot = st.empty()  # the prepare button is replaced by the download button in place
+    if data is None:
+        if not slot.button(f"Prepare {label}", key=f"prepare_{name}"):
+            return
+        with st.spinner(f"Preparing {label}..."):
+            data = exports.get(key, lambda: export_bytes(frame(), export_ext))
+    slot.download_button(
+        label=f"Download {label}",
+        data=data,
+        file_name=f"{name}_suburbs_{country_code}.{export_ext}",
+        mime=export_mime,
+        key=f"download_{name}",
+    )
+
+download("Filtered Export", "filtered", lambda: filtered, (selected_state, selected_region, selected_suburb))
+
+if unmapped > 0:
     st.markdown("### 🚧 Export Only Unmapped or Edge Cases")
-    st.download_button(
-        label="Download Unmapped CSV",
-        data=unmapped_df.to_csv(index=False),
-        file_name=f"unmapped_suburbs_{country_code}.csv",
-        mime="text/csv"
-    )
\ No newline at end of file
+    download("Unmapped Export", "unmapped", lambda: df.iloc[index.unmapped_positions()], ())
@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.qa_engine import unmapped_mask
+
+NGRAM = 3
+
+
+def ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class DashboardIndex:
+    """
+    Filter indexes built once per loaded dataset.
+
+    State and region filters compare integer category codes, suburb search goes through an
+    inverted trigram index over the distinct suburb names, and the unmapped flag is precomputed.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.state_codes, self.states = pd.factorize(df["state"], sort=True)
+        self.region_codes, self.regions = pd.factorize(df["final_region"], sort=True)
+
+        self.unmapped = unmapped_mask(df["final_region"])
+
+        # Trigram postings point at distinct lower-cased names, not rows
+        self.name_codes, names = pd.factorize(df["suburb"].astype(str).str.lower())
+        self.names = np.asarray(names, dtype=object)
+        postings = defaultdict(list)
+        for name_id, name in enumerate(self.names):
+            for gram in ngrams(name):
+                postings[gram].append(name_id)
+        self.postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    # -------- Lookups --------
+    def state_options(self):
+        return self.states.tolist()
+
+    def region_options(self):
+        return self.regions.tolist()
+
+    def matching_names(self, query):
+        """Ids of distinct suburb names containing `query` (case-insensitive, literal)"""
+        query = query.lower()
+        grams = ngrams(query)
+        if not grams:
+            # Shorter than an n-gram: scan the distinct names (far fewer than rows)
+            return np.flatnonzero([query in name for name in self.names])
+        lists = sorted((self.postings.get(gram) for gram in grams), key=lambda ids: 0 if ids is None else len(ids))
+        if lists[0] is None:
+            return np.array([], dtype=np.int64)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return candidates
+        # Trigrams can all be present without the full substring, so verify candidates
+        return candidates[[query in self.names[i] for i in candidates]]
+
+    def filter(self, state=None, region=None, suburb_query=None):
+        """Row positions matching every active filter"""
+        mask = np.ones(self.size, dtype=bool)
+        if state is not None:
+            mask &= self.state_codes == self.states.get_loc(state)
+        if region is not None:
+            mask &= self.region_codes == self.regions.get_loc(region)
+        if suburb_query:
+            name_hit = np.zeros(len(self.names), dtype=bool)
+            name_hit[self.matching_names(suburb_query)] = True
+            mask &= name_hit[self.name_codes]
+        return np.flatnonzero(mask)
+
+    def unmapped_count(self, positions=None):
+        return int(self.unmapped.sum() if positions is None else self.unmapped[positions].sum())
+
+    def unmapped_positions(self):
+        return np.flatnonzero(self.unmapped)
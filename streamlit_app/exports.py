@@ -0,0 +1,84 @@
+from collections import OrderedDict
+
+import gzip
+import io
+import os
+import sys
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.table_io import categorize
+
+# label → (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "CSV": ("csv", "text/csv"),
+}
+CHUNK_ROWS = 100_000
+EXPORT_CACHE_MB = 256
+
+
+def export_bytes(df, ext, chunk_rows=CHUNK_ROWS):
+    """
+    `df` as a downloadable file, encoded `chunk_rows` rows at a time. Gzip CSV and Parquet only
+    ever hold one chunk's uncompressed text or table; plain CSV builds up the full text.
+    """
+    buffer = io.BytesIO()
+    chunks = [df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)] or [df]
+    if ext == "parquet":
+        # Schema from the whole frame: a mostly-null column (e.g. region_source) can be all-null
+        # in the first chunk, which would otherwise pin it to Arrow's null type
+        schema = pa.Schema.from_pandas(categorize(df), preserve_index=False)
+        with pq.ParquetWriter(buffer, schema, compression="zstd") as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(categorize(chunk), schema=schema, preserve_index=False))
+        return buffer.getvalue()
+
+    stream = gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) if ext == "csv.gz" else buffer
+    for i, chunk in enumerate(chunks):
+        stream.write(chunk.to_csv(index=False, header=i == 0).encode())
+    if stream is not buffer:
+        stream.close()
+    return buffer.getvalue()
+
+
+class ExportCache:
+    """
+    Encoded exports keyed by data file and filter state, least recently used evicted first once
+    their total size passes `max_bytes`. One instance is shared by every dashboard session.
+    """
+
+    def __init__(self, max_mb=EXPORT_CACHE_MB):
+        self.max_bytes = int(max_mb * 2**20)
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def peek(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def get(self, key, build):
+        """Cached bytes for `key`, or `build()`'s result (kept unless it alone exceeds the budget)"""
+        data = self.peek(key)
+        if data is not None:
+            return data
+        data = build()
+        if len(data) > self.max_bytes:
+            return data
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = data
+                self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+        return data
@@ -0,0 +1,124 @@
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster
+
+MAX_GRID_CELLS = 2500
+MAX_CLUSTER_POINTS = 50_000
+UNMAPPED_COLOUR = "#9e9e9e"
+REGION_PALETTE = [
+    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#bcbd22",
+    "#17becf", "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94", "#dbdb8d",
+]
+
+# One JS callback builds every marker client-side, so Python never loops over points
+POINT_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: 4, color: row[3], fillColor: row[3], fillOpacity: 0.7, weight: 1});
+    marker.bindPopup(row[2]);
+    return marker;
+};
+"""
+
+
+def region_colour(code):
+    return UNMAPPED_COLOUR if code < 0 else REGION_PALETTE[code % len(REGION_PALETTE)]
+
+
+def valid_points(lat, lon):
+    return np.isfinite(lat) & np.isfinite(lon)
+
+
+def map_bounds(lat, lon):
+    ok = valid_points(lat, lon)
+    if not ok.any():
+        return None
+    return [[float(lat[ok].min()), float(lon[ok].min())], [float(lat[ok].max()), float(lon[ok].max())]]
+
+
+# -------- Grid Aggregation --------
+def grid_aggregate(lat, lon, region_codes, max_cells=MAX_GRID_CELLS):
+    """
+    Bin points into square cells (at most about `max_cells` of them over the data extent) and
+    return, per occupied cell: its south-west corner, size, point count, and dominant region
+    code with its share of the cell.
+    """
+    ok = valid_points(lat, lon)
+    lat, lon, region_codes = lat[ok], lon[ok], np.asarray(region_codes)[ok]
+    if not len(lat):
+        return None
+
+    lat0, lon0 = lat.min(), lon.min()
+    span = max(lat.max() - lat0, lon.max() - lon0)
+    size = max(span / np.sqrt(max_cells), 1e-4)
+    nx = int((lon.max() - lon0) // size) + 1
+    cell = ((lat - lat0) // size).astype(np.int64) * nx + ((lon - lon0) // size).astype(np.int64)
+
+    cells, totals = np.unique(cell, return_counts=True)
+
+    # Count (cell, region) pairs; the last pair per cell after sorting by count is the dominant one
+    n_codes = int(region_codes.max()) + 2
+    pairs, pair_counts = np.unique(cell * n_codes + region_codes + 1, return_counts=True)
+    pair_cells = pairs // n_codes
+    order = np.lexsort((pair_counts, pair_cells))
+    last = np.r_[pair_cells[order][1:] != pair_cells[order][:-1], True]
+    dominant = order[last]
+
+    return {
+        "lat": lat0 + (cells // nx) * size,
+        "lon": lon0 + (cells % nx) * size,
+        "size": size,
+        "count": totals,
+        "region_code": (pairs[dominant] % n_codes) - 1,
+        "share": pair_counts[dominant] / totals,
+    }
+
+
+def grid_layer(cells, regions):
+    """One GeoJSON layer of cells coloured by dominant region, opacity scaled by point count"""
+    size = cells["size"]
+    max_log = np.log1p(cells["count"].max())
+    features = []
+    for lat, lon, count, code, share in zip(cells["lat"], cells["lon"], cells["count"],
+                                            cells["region_code"], cells["share"]):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [[
+                [lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat],
+            ]]},
+            "properties": {
+                "region": "Unmapped" if code < 0 else str(regions[code]),
+                "suburbs": int(count),
+                "share": f"{share:.0%}",
+                "colour": region_colour(code),
+                "opacity": round(0.25 + 0.5 * np.log1p(count) / max_log, 3),
+            },
+        })
+    return folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        name="Region grid",
+        style_function=lambda f: {
+            "fillColor": f["properties"]["colour"],
+            "color": f["properties"]["colour"],
+            "weight": 0.5,
+            "fillOpacity": f["properties"]["opacity"],
+        },
+        tooltip=folium.GeoJsonTooltip(fields=["region", "suburbs", "share"],
+                                      aliases=["Dominant region", "Suburbs", "Share"]),
+    )
+
+
+# -------- Clustered Points --------
+def cluster_layer(df, region_codes):
+    """All points in a single client-side cluster layer, coloured by region"""
+    lat = df["latitude"].to_numpy(dtype=float)
+    lon = df["longitude"].to_numpy(dtype=float)
+    ok = valid_points(lat, lon)
+    popups = (
+        df["suburb"].astype(str) + " (" + df["state"].astype(str) + ") → " + df["final_region"].astype(str)
+    ).to_numpy()
+    colours = np.array(REGION_PALETTE + [UNMAPPED_COLOUR])[
+        np.where(np.asarray(region_codes) < 0, len(REGION_PALETTE), np.asarray(region_codes) % len(REGION_PALETTE))
+    ]
+    data = list(zip(lat[ok].tolist(), lon[ok].tolist(), popups[ok].tolist(), colours[ok].tolist()))
+    return FastMarkerCluster(data, callback=POINT_CALLBACK, name="Suburbs")
@@ -1,20 +1,31 @@
 
 # tests/qa_mappings.py
 
-import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+from scripts.qa_engine import run_qa
+from scripts.table_io import find_table, read_table
+
+
+def qa_report():
+    # Parquet by default since the table_io switch; find_table picks the newest written variant
+    df = read_table(find_table('output/final_output_cleaned_by_abs.csv'))
+    return run_qa(df, bbox=COUNTRY_CONFIG["au"]["bbox"])
 
 def test_no_unmapped_regions():
-    df = pd.read_csv('output/final_output_cleaned_by_abs.csv')
-    assert df['final_region'].notna().all(), "There are still unmapped (null) final regions!"
+    assert qa_report()["missing"] == 0, "There are still unmapped (null) final regions!"
 
 def test_valid_coordinates():
-    df = pd.read_csv('output/final_output_cleaned_by_abs.csv')
-    assert df['latitude'].between(-44, -10).all(), "Some latitudes are out of bounds for Australia"
-    assert df['longitude'].between(110, 155).all(), "Some longitudes are out of bounds for Australia"
+    coords = qa_report()["coordinates"]
+    assert coords["invalid"] == 0 and coords["outside_bbox"] == 0, "Some coordinates are out of bounds for Australia"
 
 def test_region_correction_logged():
-    df = pd.read_csv('output/final_output_cleaned_by_abs.csv')
-    changed = df['was_different'].sum()
-    total = len(df)
+    report = qa_report()
+    changed = report["was_different"]["count"]
+    total = report["rows"]
     print(f"{changed} out of {total} suburbs had corrected regions.")
     assert changed > 0, "No regions were corrected — check if patching logic was applied"
@@ -0,0 +1,44 @@
+
+# tests/test_automap.py
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+from scripts.automap import main
+
+AUTOMAP = os.path.join(os.path.dirname(__file__), "..", "scripts", "automap.py")
+
+
+def test_validate_starts_without_geospatial_libraries():
+    done = subprocess.run(
+        [sys.executable, AUTOMAP, "--startup-only", "validate", "--country", "au"],
+        capture_output=True, text=True, check=True,
+    )
+    loaded = done.stdout.split("(loaded: ", 1)[1]
+    assert "pandas" in loaded
+    assert not any(name in loaded for name in ("geopandas", "shapely", "pyogrio", "scipy"))
+
+    check = "import sys; sys.argv = ['automap']; import scripts.automap as a; a.build_parser(); print('pandas' in sys.modules)"
+    done = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True,
+                          cwd=os.path.join(os.path.dirname(__file__), ".."))
+    assert done.stdout.strip() == "False"
+
+
+def test_validate_subcommand_runs_the_qa_report(tmp_path, monkeypatch, capsys):
+    output = tmp_path / "output.csv"
+    pd.DataFrame({
+        "suburb": ["a", "b"], "latitude": [-41.3, -36.8], "longitude": [174.8, 174.7],
+        "final_region": ["Wellington", None],
+    }).to_csv(output, index=False)
+    monkeypatch.setitem(COUNTRY_CONFIG["nz"], "output_file", str(output))
+    monkeypatch.chdir(tmp_path)
+
+    assert main(["validate", "--country", "NZ"]) == 0
+    assert "Mapped: 1 (50.0%)" in capsys.readouterr().out
+    assert os.path.exists(tmp_path / "qa_logs" / "qa_report_nz.json")
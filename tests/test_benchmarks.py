@@ -0,0 +1,33 @@
+
+# tests/test_benchmarks.py
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import benchmarks.run_benchmarks as run_benchmarks
+from benchmarks.run_benchmarks import BENCH_COUNTRY, STAGES, compare, run_suite
+from config.settings import COUNTRY_CONFIG
+
+
+def test_suite_runs_every_stage_at_small_scale():
+    report = run_suite([500], [20], repeat=1)
+    assert [r["stage"] for r in report["results"]] == list(STAGES)
+    assert all(r["seconds_min"] > 0 for r in report["results"])
+
+    slower = {**report, "results": [{**r, "seconds_min": r["seconds_min"] * 2} for r in report["results"]]}
+    assert len(compare(slower, report, threshold=1.5)) == len(STAGES)
+    assert compare(report, slower, threshold=1.5) == []
+
+
+def test_failing_stage_does_not_leave_the_bench_country_behind(monkeypatch):
+    def boom(data):
+        raise RuntimeError("stage failed")
+
+    monkeypatch.setitem(run_benchmarks.STAGES, "boom", boom)
+    with pytest.raises(RuntimeError):
+        run_suite([200], [10], stages=["validate_mapping", "boom"], repeat=1)
+    assert BENCH_COUNTRY not in COUNTRY_CONFIG
@@ -0,0 +1,101 @@
+
+# tests/test_boundary_index.py
+
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.boundary_index import build_index, input_extent, load_or_build_index, read_boundaries
+
+
+def write_boundaries(path):
+    gdf = gpd.GeoDataFrame(
+        {"REGION": ["West", "East", "Overlap"], "state": ["A", "B", "B"]},
+        geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1), box(1.5, 0, 2.5, 1)],
+        crs="EPSG:4326",
+    )
+    gdf.to_file(path)
+    return gdf
+
+
+def test_join_matches_geopandas_sjoin(tmp_path):
+    shp = str(tmp_path / "regions.shp")
+    boundaries = write_boundaries(shp)
+    df = pd.DataFrame({
+        "suburb": ["a", "b", "c", "d"],
+        "state": ["A", "B", "B", "X"],
+        "latitude": [0.5, 0.5, 0.5, 5.0],
+        "longitude": [0.5, 1.25, 1.75, 5.0],
+    })
+
+    joined = build_index(shp, "REGION").join(df)
+
+    points = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs="EPSG:4326")
+    expected = gpd.sjoin(points, boundaries, how="left", predicate="within").drop(columns=["geometry"])
+    assert joined.columns.tolist() == expected.columns.tolist()
+    assert joined["REGION"].fillna("").tolist() == expected["REGION"].fillna("").tolist()
+    assert joined["suburb"].tolist() == ["a", "b", "c", "c", "d"]
+
+
+def test_index_is_reused_until_boundaries_change(tmp_path):
+    shp = str(tmp_path / "regions.shp")
+    artifact = str(tmp_path / "index.pkl")
+    write_boundaries(shp)
+
+    first = load_or_build_index(shp, "REGION", artifact)
+    mtime = os.path.getmtime(artifact)
+    second = load_or_build_index(shp, "REGION", artifact)
+    assert os.path.getmtime(artifact) == mtime
+    assert second.source_hash == first.source_hash
+    assert second.join(pd.DataFrame({"latitude": [0.5], "longitude": [0.5]}))["REGION"].tolist() == ["West"]
+
+    gpd.GeoDataFrame({"REGION": ["Only"]}, geometry=[box(0, 0, 3, 3)], crs="EPSG:4326").to_file(shp)
+    rebuilt = load_or_build_index(shp, "REGION", artifact)
+    assert rebuilt.source_hash != first.source_hash
+    assert rebuilt.regions.tolist() == ["Only"]
+
+
+def test_grid_lookup_matches_exact_query(tmp_path):
+    shp = str(tmp_path / "regions.shp")
+    write_boundaries(shp)
+    exact = build_index(shp, "REGION")
+    gridded = build_index(shp, "REGION", grid_resolution=0.1)
+    assert 0 < gridded.grid.resolved_share < 1
+
+    rng = np.random.default_rng(0)
+    lon = np.concatenate([rng.uniform(-0.5, 3, 5000), [1.0, 0.0, 2.5, np.nan, 0.3]])
+    lat = np.concatenate([rng.uniform(-0.5, 1.5, 5000), [0.5, 0.5, 1.0, 0.5, np.nan]])
+    for got, expected in zip(gridded.query(lon, lat), exact.query(lon, lat)):
+        np.testing.assert_array_equal(got, expected)
+    assert [gridded.locate_point(x, y) for x, y in [(0.5, 0.5), (1.75, 0.5), (5, 5)]] == [0, 1, -1]
+
+    # Changing the configured resolution rebuilds only the grid
+    artifact = str(tmp_path / "index.pkl")
+    load_or_build_index(shp, "REGION", artifact, grid_resolution=0.1)
+    assert load_or_build_index(shp, "REGION", artifact, grid_resolution=0.25).grid_resolution == 0.25
+
+
+def test_clipped_read_matches_full_index_inside_extent(tmp_path):
+    shp = str(tmp_path / "regions.shp")
+    write_boundaries(shp)
+    full = build_index(shp, "REGION")
+
+    lon, lat = np.array([0.2, 0.9, np.nan]), np.array([0.5, 0.1, 0.5])
+    bbox = input_extent(lon, lat, margin=0.2)
+    clipped = build_index(shp, "REGION", columns=["REGION"], bbox=bbox)
+    assert clipped.regions.tolist() == ["West", "East"]  # "Overlap" starts at x=1.5
+    assert clipped.attributes.columns.tolist() == ["REGION"]
+    assert clipped.source_hash == full.source_hash
+    np.testing.assert_array_equal(clipped.locate(lon, lat), full.locate(lon, lat))
+
+    # The bounds sidecar is reused until the shapefile changes
+    sidecar = os.path.splitext(shp)[0] + ".bounds.npz"
+    mtime = os.path.getmtime(sidecar)
+    assert len(read_boundaries(shp, bbox=(10, 10, 11, 11), columns=["REGION"])) == 0
+    assert os.path.getmtime(sidecar) == mtime
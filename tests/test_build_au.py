@@ -0,0 +1,43 @@
+
+# tests/test_build_au.py
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scripts.build_au as build_au
+from test_spatial_join_sal_to_sa4 import write_inputs
+
+
+def write_geocoded(path, far_longitude=1.7):
+    pd.DataFrame({
+        "suburb": ["Inside", "Straddler", "Elsewhere"], "state": ["NSW", "VIC", "VIC"],
+        "latitude": [0.3, 0.3, 0.5], "longitude": [0.3, 1.2, far_longitude],
+    }).to_csv(path, index=False)
+
+
+def test_au_build_reruns_only_stages_after_a_changed_input(tmp_path, monkeypatch):
+    write_inputs(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build_au.sal_join, "sal_path", str(tmp_path / "sal.shp"))
+    monkeypatch.setattr(build_au.sal_join, "sa4_path", str(tmp_path / "sa4.shp"))
+    monkeypatch.setattr(build_au.abs_patch, "SA4_PATH", str(tmp_path / "sa4.shp"))
+    os.makedirs("data")
+    write_geocoded(build_au.enrich.geo_path)
+
+    report = build_au.main(target="abs_patched", output_format="csv")
+    assert all(entry["action"] == "run" for entry in report.values())
+    final = pd.read_csv(build_au.EXPORTS["abs_patched"])
+    assert final.set_index("suburb")["final_region"].to_dict() == {"Inside": "West", "Straddler": "East", "Elsewhere": "East"}
+    assert not os.path.exists(build_au.EXPORTS["enriched"])  # intermediates stay in the artifact cache
+
+    # The geocoded table changed, the shapefiles did not: the SAL join is not redone
+    write_geocoded(build_au.enrich.geo_path, far_longitude=0.4)
+    report = build_au.main(target="abs_patched", output_format="csv")
+    assert report["sal_to_sa4"]["action"] == "load"
+    assert [report[name]["action"] for name in ("enriched", "geo_fallback", "abs_patched")] == ["run"] * 3
+    final = pd.read_csv(build_au.EXPORTS["abs_patched"])
+    assert final.set_index("suburb").loc["Elsewhere", "final_region"] == "West"
@@ -0,0 +1,101 @@
+
+# tests/test_dag.py
+
+import importlib.util
+import os
+import sys
+import threading
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.dag import DagRunner, Stage, stage_key
+
+
+def chain(tmp_path, calls, barrier=None):
+    """left and right read their own source files; both feed total"""
+    def source(path):
+        calls.append(os.path.basename(path))
+        if barrier is not None:
+            barrier.wait()
+        return pd.read_csv(path)
+
+    def total(left, right):
+        calls.append("total")
+        return pd.DataFrame({"value": [left["value"].sum() + right["value"].sum()]})
+
+    left, right = tmp_path / "left.csv", tmp_path / "right.csv"
+    return [
+        Stage("left", source, files=[str(left)], params={"path": str(left)}),
+        Stage("right", source, files=[str(right)], params={"path": str(right)}),
+        Stage("total", total, inputs=["left", "right"]),
+    ]
+
+
+def write_sources(tmp_path, left=(1, 2), right=(10,)):
+    pd.DataFrame({"value": list(left)}).to_csv(tmp_path / "left.csv", index=False)
+    pd.DataFrame({"value": list(right)}).to_csv(tmp_path / "right.csv", index=False)
+
+
+def test_unchanged_stages_are_skipped_and_changes_rerun_only_downstream(tmp_path):
+    write_sources(tmp_path)
+    calls = []
+    runner = DagRunner(chain(tmp_path, calls), cache_dir=str(tmp_path / "dag"))
+    frames, report = runner.run()
+    assert frames["total"]["value"].tolist() == [13]
+    assert sorted(calls) == ["left.csv", "right.csv", "total"]
+
+    # Nothing changed: the target comes straight from its artifact
+    calls.clear()
+    frames, report = DagRunner(chain(tmp_path, calls), cache_dir=str(tmp_path / "dag")).run()
+    assert calls == []
+    assert frames["total"]["value"].tolist() == [13]
+    assert [report[name]["action"] for name in ("left", "right", "total")] == ["skip", "skip", "load"]
+
+    # One source changed: its stage and the join rerun, the other side is loaded from cache
+    write_sources(tmp_path, left=(1, 2, 3))
+    frames, report = DagRunner(chain(tmp_path, calls), cache_dir=str(tmp_path / "dag")).run()
+    assert calls == ["left.csv", "total"]
+    assert report["right"]["action"] == "load"
+    assert frames["total"]["value"].tolist() == [16]
+
+    # Forcing a stage reruns it and everything after it
+    calls.clear()
+    DagRunner(chain(tmp_path, calls), cache_dir=str(tmp_path / "dag")).run(force=["right"])
+    assert calls == ["right.csv", "total"]
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    write_sources(tmp_path)
+    barrier = threading.Barrier(2, timeout=10)  # breaks unless left and right are in flight together
+    frames, _ = DagRunner(chain(tmp_path, [], barrier), cache_dir=str(tmp_path / "dag"), workers=2).run()
+    assert frames["total"]["value"].tolist() == [13]
+
+
+def test_prune_keeps_only_current_artifacts(tmp_path):
+    write_sources(tmp_path)
+    DagRunner(chain(tmp_path, []), cache_dir=str(tmp_path / "dag")).run()
+    write_sources(tmp_path, right=(20,))
+    runner = DagRunner(chain(tmp_path, []), cache_dir=str(tmp_path / "dag"))
+    runner.run()
+    assert runner.prune() == 2  # the old right and total
+    assert len([f for f in os.listdir(tmp_path / "dag") if f.endswith(".parquet")]) == 3
+
+
+def test_editing_a_called_module_changes_the_stage_key(tmp_path):
+    callee = tmp_path / "callee.py"
+    callee.write_text("def double(df):\n    return df * 2\n")
+    spec = importlib.util.spec_from_file_location("callee", callee)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    def wrapper(df):
+        return module.double(df)
+
+    stage = Stage("doubled", wrapper, code=[module])
+    before = stage_key(stage, {}, {})
+    assert stage_key(Stage("doubled", wrapper), {}, {}) != before
+
+    callee.write_text("def double(df):\n    return df + df  # same result, new code\n")
+    assert stage_key(stage, {}, {}) != before
@@ -0,0 +1,52 @@
+
+# tests/test_dashboard_index.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_app.dashboard_index import DashboardIndex
+
+
+def sample_frame():
+    return pd.DataFrame({
+        "suburb": ["Carlton", "North Carlton", "Fitzroy", "Carlingford", "St. Kilda", "Arlton"],
+        "state": ["VIC", "VIC", "VIC", "NSW", "VIC", None],
+        "final_region": ["Melbourne - Inner", "Melbourne - Inner", None, "Sydney - Parramatta", "Regional", "Unknown"],
+    }).astype({"state": "category", "final_region": "category"})
+
+
+def naive_filter(df, state=None, region=None, query=None):
+    mask = pd.Series(True, index=df.index)
+    if state is not None:
+        mask &= df["state"] == state
+    if region is not None:
+        mask &= df["final_region"] == region
+    if query:
+        mask &= df["suburb"].str.lower().str.contains(query.lower(), regex=False)
+    return np.flatnonzero(mask.to_numpy())
+
+
+def test_filters_match_naive_scan():
+    df = sample_frame()
+    index = DashboardIndex(df)
+    cases = [
+        {}, {"state": "VIC"}, {"region": "Melbourne - Inner"}, {"query": "carl"}, {"query": "ARLTON"},
+        {"query": "rl"}, {"query": "st."}, {"query": "zzz"}, {"state": "VIC", "query": "carlton"},
+        {"state": "NSW", "region": "Melbourne - Inner"},
+    ]
+    for case in cases:
+        expected = naive_filter(df, **case)
+        got = index.filter(case.get("state"), case.get("region"), case.get("query"))
+        assert got.tolist() == expected.tolist(), case
+
+
+def test_unmapped_bitmap_and_options():
+    index = DashboardIndex(sample_frame())
+    assert index.unmapped_positions().tolist() == [2, 4, 5]
+    assert index.unmapped_count(index.filter(state="VIC")) == 2
+    assert index.state_options() == ["NSW", "VIC"]
@@ -0,0 +1,66 @@
+
+# tests/test_exports.py
+
+import gzip
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_app.exports import ExportCache, export_bytes
+
+
+def sample_frame(rows=250):
+    return pd.DataFrame({
+        "suburb": pd.array([f"Suburb {i}" for i in range(rows)], dtype="string[pyarrow]"),
+        "state": pd.Categorical(np.where(np.arange(rows) % 2, "VIC", "NSW")),
+        "final_region": pd.Categorical(np.where(np.arange(rows) % 3, "Melbourne - Inner", None)),
+        "latitude": np.linspace(-38, -33, rows).astype("float32"),
+    })
+
+
+def test_chunked_exports_round_trip():
+    df = sample_frame()
+    plain = export_bytes(df, "csv", chunk_rows=100)
+    assert plain == df.to_csv(index=False).encode()
+    assert gzip.decompress(export_bytes(df, "csv.gz", chunk_rows=100)) == plain
+
+    back = pd.read_parquet(io.BytesIO(export_bytes(df, "parquet", chunk_rows=100)))
+    pd.testing.assert_frame_equal(back.astype(object), df.astype(object), check_dtype=False)
+    assert len(export_bytes(df.iloc[:0], "parquet")) > 0
+
+
+def test_parquet_export_survives_a_null_first_chunk():
+    df = sample_frame(rows=250)
+    df["region_source"] = [None] * 200 + ["nominatim"] * 50
+    df["region_patched_at"] = [None] * 200 + ["2026-10-18T00:00:00+00:00"] * 50
+    back = pd.read_parquet(io.BytesIO(export_bytes(df, "parquet", chunk_rows=100)))
+    assert back["region_source"].isna().sum() == 200
+    assert back["region_patched_at"].iloc[-1] == "2026-10-18T00:00:00+00:00"
+
+
+def test_export_cache_builds_once_and_evicts_least_recently_used():
+    cache = ExportCache(max_mb=3 / 2**20)  # room for three bytes
+    builds = []
+
+    def build(value):
+        return lambda: builds.append(value) or value
+
+    assert cache.get("a", build(b"a")) == b"a"
+    assert cache.get("a", build(b"a")) == b"a"
+    assert builds == [b"a"]
+
+    cache.get("b", build(b"b"))
+    cache.get("c", build(b"c"))
+    cache.peek("a")  # a is now the most recently used
+    cache.get("d", build(b"d"))
+    assert cache.peek("b") is None
+    assert [cache.peek(key) for key in "acd"] == [b"a", b"c", b"d"]
+
+    # Larger than the whole budget: returned but never cached
+    assert cache.get("big", build(b"big!")) == b"big!"
+    assert cache.peek("big") is None and cache.size == 3
@@ -0,0 +1,65 @@
+
+# tests/test_forward_geocode.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scripts.forward_geocode as forward_geocode
+from scripts.forward_geocode import ForwardGeocoder, geocode_frame, load_or_build_forward_index
+
+DUMP = [
+    ("AU", "2000", "Sydney", "New South Wales", "NSW", -33.86, 151.20),
+    ("AU", "2001", "Sydney", "New South Wales", "NSW", -33.88, 151.22),
+    ("AU", "3000", "Melbourne", "Victoria", "VIC", -37.81, 144.96),
+    ("AU", "4870", "Cairns", "Queensland", "QLD", -16.92, 145.77),
+    ("NA", "9000", "Windhoek", "Khomas", "KH", -22.56, 17.08),
+]
+
+
+def write_dump(path):
+    with open(path, "w") as f:
+        for country, postcode, place, admin1, code1, lat, lon in DUMP:
+            f.write("\t".join([country, postcode, place, admin1, code1, "", "", "", "", str(lat), str(lon), "4"]) + "\n")
+
+
+def test_exact_fuzzy_and_cached_lookups(tmp_path, monkeypatch):
+    dump = str(tmp_path / "postal.txt")
+    write_dump(dump)
+    monkeypatch.setattr(forward_geocode, "FORWARD_INDEX_DIR", str(tmp_path / "index"))
+    index = load_or_build_forward_index(dump)
+    assert sorted(index["country"].unique().tolist()) == ["AU", "NA"]  # Namibia is not a missing value
+    assert load_or_build_forward_index(dump)["place_key"].tolist() == index["place_key"].tolist()
+
+    df = pd.DataFrame({
+        "suburb": ["Sydney", "MELBOURNE ", "Melborne", "Cairns", "Nowhere", "Sydney"],
+        "state": ["NSW", "Victoria", "VIC", "NSW", "QLD", "NSW"],
+    })
+    cache_path = str(tmp_path / "geocode_cache.csv")
+    out = geocode_frame(df, ForwardGeocoder(index, "au"), cache_path=cache_path)
+    assert out["match_type"].tolist() == ["exact", "exact", "fuzzy", None, None, "exact"]
+    np.testing.assert_allclose(out["latitude"].iloc[[0, 1, 2]], [-33.87, -37.81, -37.81], atol=1e-4)
+    assert out["latitude"].iloc[[3, 4]].isna().all()  # Cairns is in QLD, not NSW
+
+    cache = pd.read_csv(cache_path)
+    assert cache.columns.tolist() == ["suburb", "state", "latitude", "longitude"]
+    assert cache["suburb"].tolist() == ["Sydney", "MELBOURNE "]  # the fuzzy "Melborne" guess is not kept
+
+    # Cached pairs are reused, manual edits to the cache win, and fuzzy pairs are matched again
+    cache.loc[cache["suburb"] == "Sydney", "latitude"] = -34.0
+    cache.to_csv(cache_path, index=False)
+    again = geocode_frame(df, ForwardGeocoder(index, "au"), cache_path=cache_path)
+    assert again["match_type"].tolist() == ["cache", "cache", "fuzzy", None, None, "cache"]
+    assert again["latitude"].iloc[0] == -34.0
+
+    # Lookups match cached pairs on normalized names, and the cache keeps one row per normalized pair
+    respelled = pd.DataFrame({"suburb": [" sydney", "Melbourne"], "state": ["New South Wales", "VIC"]})
+    hits = geocode_frame(respelled, ForwardGeocoder(index, "au"), cache_path=cache_path)
+    assert hits["match_type"].tolist() == ["cache", "cache"]
+    assert hits["latitude"].iloc[0] == -34.0
+    forward_geocode.update_geocode_cache(hits, cache_path)
+    assert len(pd.read_csv(cache_path)) == 2
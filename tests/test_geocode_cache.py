@@ -0,0 +1,53 @@
+
+# tests/test_geocode_cache.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.geocode_cache import ReverseGeocodeCache
+
+
+def test_writes_survive_reopen_and_keys_are_quantized(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ReverseGeocodeCache(path, precision=4, legacy_csv=None)
+    cache.put(-33.86881, 151.20929, "Sydney", None, "New South Wales")
+    cache.close()
+
+    reopened = ReverseGeocodeCache(path, precision=4, legacy_csv=None)
+    assert reopened.get(-33.868812, 151.209288)["county"] == "Sydney"
+    assert reopened.get(-33.9, 151.2) is None
+    assert (reopened.hits, reopened.misses) == (1, 1)
+
+
+def test_get_many_aligns_with_frame(tmp_path):
+    cache = ReverseGeocodeCache(str(tmp_path / "cache.sqlite"), legacy_csv=None)
+    cache.put_many([
+        {"latitude": -37.8136, "longitude": 144.9631, "county": "Melbourne", "state": "Victoria"},
+    ])
+    df = pd.DataFrame({"latitude": [-37.8136, -27.4705, -37.8136], "longitude": [144.9631, 153.026, 144.9631]},
+                      index=[7, 8, 9])
+
+    found = cache.get_many(df)
+    assert found.index.tolist() == [7, 8, 9]
+    assert found["cached"].tolist() == [True, False, True]
+    assert found.loc[9, "county"] == "Melbourne"
+    assert cache.stats()["hits"] == 2
+
+
+def test_non_finite_coordinates_are_rejected_as_keys_and_never_cached(tmp_path):
+    cache = ReverseGeocodeCache(str(tmp_path / "cache.sqlite"), legacy_csv=None)
+    with pytest.raises(ValueError):
+        cache.key(np.nan, 151.2)
+    with pytest.raises(ValueError):
+        cache.quantize([-33.9, np.inf])
+
+    cache.put(-33.9, 151.2, "Sydney")
+    found = cache.get_many(pd.DataFrame({"latitude": [np.nan, -33.9], "longitude": [151.2, 151.2]}))
+    assert found["cached"].tolist() == [False, True]
+    assert pd.isna(found["county"].iloc[0]) and found["county"].iloc[1] == "Sydney"
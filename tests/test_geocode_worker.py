@@ -0,0 +1,49 @@
+
+# tests/test_geocode_worker.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.geocode_cache import ReverseGeocodeCache
+from scripts.geocode_worker import ReverseGeocoder
+from scripts.mock_nominatim import start_server
+
+
+def test_duplicates_fetched_once_and_reruns_resume_from_cache(tmp_path):
+    server = start_server()
+    endpoint = f"http://127.0.0.1:{server.server_port}/reverse"
+    df = pd.DataFrame({"latitude": [-33.5, -33.5, -37.1], "longitude": [151.2, 151.2, 144.9]})
+    try:
+        cache = ReverseGeocodeCache(str(tmp_path / "cache.sqlite"), legacy_csv=None)
+        geocoder = ReverseGeocoder(cache, endpoint=endpoint, rate=1000, concurrency=2)
+        found = geocoder.geocode_frame(df)
+        assert found["cached"].all()
+        assert found["county"].tolist() == ["County -33_151", "County -33_151", "County -37_144"]
+        assert server.stats["requests"] == 2
+
+        rerun = ReverseGeocoder(cache, endpoint=endpoint, rate=1000)
+        rerun.geocode_frame(df)
+        assert rerun.stats["requested"] == 0
+        assert server.stats["requests"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_rows_without_finite_coordinates_are_skipped(tmp_path):
+    server = start_server()
+    endpoint = f"http://127.0.0.1:{server.server_port}/reverse"
+    df = pd.DataFrame({"latitude": [np.nan, -33.5, np.nan, -33.5], "longitude": [151.2, 151.2, np.nan, np.inf]})
+    try:
+        cache = ReverseGeocodeCache(str(tmp_path / "cache.sqlite"), legacy_csv=None)
+        geocoder = ReverseGeocoder(cache, endpoint=endpoint, rate=1000, concurrency=2)
+        found = geocoder.geocode_frame(df)
+        assert found["cached"].tolist() == [False, True, False, False]
+        assert geocoder.stats["skipped"] == 3
+        assert server.stats["requests"] == 1
+    finally:
+        server.shutdown()
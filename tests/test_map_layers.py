@@ -0,0 +1,24 @@
+
+# tests/test_map_layers.py
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_app.map_layers import grid_aggregate
+
+
+def test_grid_aggregate_counts_and_dominant_region():
+    # Two clusters far apart: the first mostly region 0, the second mostly unmapped (-1)
+    lat = np.array([-33.0, -33.0, -33.0, -20.0, -20.0, np.nan])
+    lon = np.array([151.0, 151.0, 151.0, 130.0, 130.0, 140.0])
+    codes = np.array([0, 0, 1, -1, -1, 0])
+    cells = grid_aggregate(lat, lon, codes, max_cells=16)
+
+    assert cells["count"].sum() == 5
+    by_count = dict(zip(cells["count"].tolist(), zip(cells["region_code"].tolist(), cells["share"].tolist())))
+    assert by_count[3][0] == 0 and np.isclose(by_count[3][1], 2 / 3)
+    assert by_count[2] == (-1, 1.0)
@@ -0,0 +1,55 @@
+
+# tests/test_nearest_region.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.join_geocoded_with_region_fallback import nearest_region_fallback
+from scripts.nearest_region import NearestRegionIndex, load_or_build_nearest_index
+
+
+def test_distances_are_great_circle_and_votes_weighted():
+    # At 60°S a degree of longitude is half a degree of latitude on the ground,
+    # so "East" (1° lon away) is nearer than "North" (0.8° lat away)
+    index = NearestRegionIndex([-60.0, -59.2, -60.0], [10.0, 9.0, 11.0], ["West", "North", "East"])
+    votes = index.query([-60.0], [10.2], k=1)
+    assert votes["region"].tolist() == ["West"]
+    assert abs(votes["distance_km"].iloc[0] - 11.1) < 0.2
+
+    votes = index.query([-59.6], [9.0], k=1)
+    assert votes["region"].tolist() == ["North"]
+    votes = index.query([-60.0, -59.6], [10.55, 9.0], k=3, max_distance_km=50)
+    assert votes["region"].tolist() == ["East", "North"]
+    assert (votes["vote_share"] > 0.5).all()
+
+    assert index.query([10.0, np.nan], [10.0, 0.0], max_distance_km=100)["region"].isna().all()
+
+
+def test_fallback_keeps_rows_aligned_and_in_order(tmp_path):
+    # A reference row without coordinates used to shift every later region by one
+    df_map = pd.DataFrame({
+        "latitude": [np.nan, -33.87, -37.81],
+        "longitude": [151.0, 151.21, 144.96],
+        "assigned_region": ["Nowhere", "Sydney - City", "Melbourne - Inner"],
+    })
+    df_geo = pd.DataFrame({
+        "suburb": ["a", "b", "c"],
+        "latitude": [-37.80, -33.0, -33.86],
+        "longitude": [144.95, 151.0, 151.20],
+        "assigned_region": ["Regional VIC", "Hunter", "Regional NSW"],
+    }, index=[5, 5, 7])
+
+    cache_path = str(tmp_path / "nearest.pkl")
+    out = nearest_region_fallback(df_geo, df_map, max_distance_km=20, cache_path=cache_path)
+    assert out["suburb"].tolist() == ["a", "b", "c"]
+    assert out["assigned_region"].tolist() == ["Melbourne - Inner", "Hunter", "Sydney - City"]
+    assert out["fallback_distance_km"].notna().tolist() == [True, False, True]
+
+    mtime = os.path.getmtime(cache_path)
+    load_or_build_nearest_index(df_map, cache_path)
+    assert os.path.getmtime(cache_path) == mtime
@@ -0,0 +1,107 @@
+
+# tests/test_pipeline.py
+
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import COUNTRY_CONFIG
+from scripts.pipeline import _PrefixedStream, country_workers, parse_countries, run_pipeline
+from scripts.synthetic_data import synthetic_boundaries, synthetic_suburbs
+from scripts.table_io import read_table
+
+BOUNDARY_EXTENT = (0.0, 0.0, 4.0, 4.0)
+
+
+def write_country(tmp_path, monkeypatch, points=120, extent=BOUNDARY_EXTENT, outside=None):
+    """
+    A "test" country in tmp_path: Voronoi boundaries over BOUNDARY_EXTENT and suburbs scattered
+    over `extent`, with the rows in the `outside` slice moved east of every polygon
+    """
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("boundaries")
+    synthetic_boundaries(12, extent=BOUNDARY_EXTENT, region_field="REGION").to_file("boundaries/regions.shp")
+    suburbs = synthetic_suburbs(points, extent=extent)
+    if outside is not None:
+        suburbs.loc[outside, "longitude"] += BOUNDARY_EXTENT[2] + 1
+    suburbs.to_csv("source.csv", index=False)
+    monkeypatch.setitem(COUNTRY_CONFIG, "test", {
+        "name": "Test", "input_file": "source.csv", "output_file": "output.csv",
+        "boundary_file": "boundaries/regions.shp", "region_field": "REGION", "grid_resolution": 0.5,
+        "bbox": BOUNDARY_EXTENT,
+    })
+    return suburbs
+
+
+def test_parse_countries():
+    assert parse_countries("ALL") == list(COUNTRY_CONFIG)
+    assert parse_countries("nz, au") == ["nz", "au"]
+    with pytest.raises(ValueError):
+        parse_countries("au,zz")
+
+
+def test_country_workers_share_the_worker_budget():
+    assert country_workers(8, 2) == 4
+    assert country_workers(3, 2) == 1
+    assert country_workers(1, 3) == 1
+
+
+def test_prefixed_stream_marks_every_line():
+    out = io.StringIO()
+    stream = _PrefixedStream(out, "[nz] ")
+    stream.write("one\ntw")
+    stream.write("o\nthree\n")
+    assert out.getvalue() == "[nz] one\n[nz] two\n[nz] three\n"
+
+
+@pytest.mark.parametrize("clip_boundaries", [False, True])
+def test_worker_pool_matches_a_single_process_run(tmp_path, monkeypatch, clip_boundaries):
+    # Suburbs in the west half only, so the clipped index holds a subset of the polygons
+    suburbs = write_country(tmp_path, monkeypatch, extent=(0.0, 0.0, 1.5, 4.0) if clip_boundaries else BOUNDARY_EXTENT)
+    runs = {}
+    for workers in (1, 2):
+        run_pipeline("test", workers=workers, full=True, output_format="csv", clip_boundaries=clip_boundaries)
+        runs[workers] = read_table("output.csv")
+
+    pd.testing.assert_frame_equal(runs[2], runs[1])
+    assert runs[2]["suburb"].tolist() == suburbs["suburb"].tolist()
+    assert runs[2]["final_region"].notna().all()
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "csv"])
+def test_streamed_run_matches_a_whole_file_run(tmp_path, monkeypatch, output_format):
+    # With 20-row chunks, the fourth chunk (rows 60-79) falls outside every polygon
+    write_country(tmp_path, monkeypatch, outside=slice(60, 79))
+    output_path = f"output.{output_format}"
+    run_pipeline("test", full=True, output_format=output_format)
+    whole = read_table(output_path)
+    run_pipeline("test", chunksize=20, output_format=output_format)
+    streamed = read_table(output_path)
+
+    # Streamed dictionaries grow in first-seen order, so only the category order may differ
+    pd.testing.assert_frame_equal(streamed, whole, check_categorical=False)
+    assert whole["final_region"].iloc[60:80].isna().all()
+    assert whole["final_region"].drop(index=range(60, 80)).notna().all()
+
+
+def test_incremental_run_remaps_only_edited_rows_and_matches_a_full_run(tmp_path, monkeypatch):
+    suburbs = write_country(tmp_path, monkeypatch)
+    run_pipeline("test")
+
+    # Move two suburbs and add two new ones
+    suburbs.loc[[3, 10], "latitude"] = [0.5, 3.5]
+    added = synthetic_suburbs(2, extent=BOUNDARY_EXTENT, seed=7)
+    pd.concat([suburbs, added], ignore_index=True).to_csv("source.csv", index=False)
+    record = run_pipeline("test")
+    sjoin = next(stage for stage in record["stages"] if stage["stage"] == "sjoin")
+    assert sjoin["rows_in"] == 4
+    incremental = read_table("output.parquet")
+
+    run_pipeline("test", full=True)
+    pd.testing.assert_frame_equal(incremental, read_table("output.parquet"))
+    assert len(incremental) == 122
@@ -0,0 +1,45 @@
+
+# tests/test_qa_engine.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.qa_engine import region_contains, run_qa, same_region, unmapped_mask
+
+
+def sample_output():
+    return pd.DataFrame({
+        "final_region": ["Sydney", " Regional ", None, "Unknown", "Sydney", "Hunter"],
+        "latitude": [-33.9, -30.0, -35.0, np.nan, -33.8, 51.5],
+        "longitude": [151.2, 150.0, 149.0, 150.0, 151.1, -0.1],
+        "was_different": [True, False, False, False, True, False],
+    })
+
+
+def test_report_counts():
+    df = sample_output()
+    report = run_qa(df, bbox=(110.0, -44.0, 155.0, -10.0))
+    assert (report["rows"], report["mapped"], report["missing"], report["placeholder"]) == (6, 3, 1, 2)
+    assert report["coordinates"]["invalid"] == 1
+    assert report["coordinates"]["outside_bbox"] == 1
+    assert report["regions"] == {"Sydney": 2, "Hunter": 1}
+    assert report["was_different"] == {"count": 2, "rate": round(2 / 6, 4)}
+
+    categorical = run_qa(df.astype({"final_region": "category"}), bbox=(110.0, -44.0, 155.0, -10.0))
+    assert {k: v for k, v in categorical.items() if k != "created_at"} == \
+        {k: v for k, v in report.items() if k != "created_at"}
+    assert unmapped_mask(df["final_region"]).tolist() == [False, True, True, True, False, False]
+
+
+def test_region_comparisons_match_row_wise_lambdas():
+    left = pd.Series(["Sydney", "sydney ", None, "Hunter", None])
+    right = pd.Series(["SYDNEY", "Sydney - City", "x", None, None])
+    expected_same = [str(a).strip().lower() == str(b).strip().lower() for a, b in zip(left, right)]
+    assert same_region(left, right).tolist() == expected_same
+    assert region_contains(pd.Series(["sydney", "Hunter", None]), pd.Series(["Sydney - City", "Illawarra", "x"])).tolist() == \
+        [True, False, False]
@@ -0,0 +1,39 @@
+
+# tests/test_region_matcher.py
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.region_matcher import match_regions
+
+REFERENCE = pd.DataFrame({
+    "suburb": ["Richmond", "Richmond", "Carlton", "Parramatta"],
+    "state": ["Victoria", "New South Wales", "Victoria", "New South Wales"],
+    "assigned_region": ["Melbourne - Inner", "Sydney - Outer West", "Melbourne - Inner", "Sydney - Parramatta"],
+})
+
+
+def test_exact_match_respects_state():
+    df = pd.DataFrame({"suburb": ["Richmond", " richmond "], "state": ["NSW", "vic"]})
+    result = match_regions(df, REFERENCE)
+    assert result["assigned_region"].tolist() == ["Sydney - Outer West", "Melbourne - Inner"]
+    assert result["match_type"].tolist() == ["exact", "exact"]
+    assert result["match_score"].tolist() == [100.0, 100.0]
+
+
+def test_fuzzy_match_is_blocked_by_state():
+    df = pd.DataFrame(
+        {"suburb": ["Parramata", "Parramata", "Nowhere"], "state": ["NSW", "VIC", "NSW"]},
+        index=[10, 10, 11],
+    )
+    result = match_regions(df, REFERENCE)
+    assert result.index.tolist() == [10, 10, 11]
+    assert result["assigned_region"].iloc[0] == "Sydney - Parramatta"
+    assert result["matched_suburb"].iloc[0] == "parramatta"
+    assert result["match_type"].iloc[0] == "fuzzy"
+    assert 90 <= result["match_score"].iloc[0] < 100
+    assert result["assigned_region"].iloc[1:].isna().all()
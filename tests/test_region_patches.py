@@ -0,0 +1,56 @@
+
+# tests/test_region_patches.py
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.region_patches import apply_region_patches, build_patches, first_match
+
+
+def test_patches_apply_by_key_with_provenance():
+    df = pd.DataFrame({
+        "suburb": ["Oaks Estate", "Williamsdale", "Oaks Estate"],
+        "state": ["ACT", "ACT", "NSW"],
+        "latitude": [-35.34, -35.4404, -35.34],
+        "longitude": [149.228, 149.2114, 149.228],
+        "final_region": ["Unknown", "Capital Region", None],
+    })
+    patches = pd.DataFrame({
+        "suburb": ["Oaks Estate", "Williamsdale", "Nowhere"],
+        "state": ["ACT", "ACT", "ACT"],
+        "latitude": [-35.34, -35.4404, 0.0],
+        "longitude": [149.228, 149.2114, 0.0],
+        "final_region": ["Australian Capital Territory", None, "Ignored"],
+    })
+
+    patched, count = apply_region_patches(df, patches, source="manual", timestamp="2025-01-01T00:00:00+00:00")
+
+    assert count == 1
+    assert patched["final_region"].tolist() == ["Australian Capital Territory", "Capital Region", None]
+    assert patched["region_source"].tolist() == ["manual", None, None]
+    assert patched["region_patched_at"].iloc[0] == "2025-01-01T00:00:00+00:00"
+    assert df["final_region"].iloc[0] == "Unknown"
+
+
+def test_overlapping_matches_resolve_to_the_first_polygon():
+    # Row 1 sits where polygons 5 and 2 overlap; the join listed polygon 5 first
+    joined = pd.DataFrame({
+        "suburb": ["a", "b", "b", "c"], "state": ["VIC"] * 4,
+        "latitude": [-37.0, -37.5, -37.5, -38.0], "longitude": [145.0] * 4,
+        "final_region": [None] * 4,
+        "index_right": [3.0, 5.0, 2.0, None],
+        "SA4_NAME21": ["North", "West", "East", None],
+    }, index=[0, 1, 1, 2])
+
+    resolved = first_match(joined)
+    assert resolved.index.tolist() == [0, 1, 2]
+    assert resolved["SA4_NAME21"].tolist() == ["North", "East", None]
+
+    patched, count = apply_region_patches(resolved, build_patches(resolved, "SA4_NAME21", source="abs_sa4"))
+    assert count == 2
+    assert patched["final_region"].tolist() == ["North", "East", None]
+    assert first_match(joined.iloc[[0, 2, 1, 3]])["SA4_NAME21"].tolist() == ["North", "East", None]
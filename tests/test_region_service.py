@@ -0,0 +1,71 @@
+
+# tests/test_region_service.py
+
+import http.client
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.boundary_index import BoundaryIndex
+import scripts.region_service as region_service
+from scripts.region_service import RegionLookupService, start_server
+
+
+def make_service():
+    index = BoundaryIndex(
+        np.array([box(150, -35, 151, -34), box(151, -35, 152, -34)], dtype=object),
+        pd.DataFrame({"SA4_NAME21": ["Illawarra", "Sydney"]}),
+        "SA4_NAME21",
+    )
+    return RegionLookupService(indexes={"au": index})
+
+
+def test_single_and_batch_lookups_agree():
+    service = make_service()
+    lats, lons = [-34.5, -34.5, -20.0], [150.5, 151.5, 140.0]
+    assert [service.lookup("au", lat, lon) for lat, lon in zip(lats, lons)] == ["Illawarra", "Sydney", None]
+    assert service.lookup_batch("au", lats, lons) == ["Illawarra", "Sydney", None]
+
+
+def test_http_endpoints():
+    server = start_server(make_service())
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        conn.request("GET", "/lookup?country=au&lat=-34.5&lon=151.5")
+        assert json.loads(conn.getresponse().read())["region"] == "Sydney"
+
+        conn.request("POST", "/lookup/batch", body=json.dumps({"country": "au", "points": [[-34.5, 150.5], [0, 0]]}))
+        assert json.loads(conn.getresponse().read())["regions"] == ["Illawarra", None]
+
+        conn.request("GET", "/lookup?country=au&lat=abc&lon=1")
+        assert conn.getresponse().status == 400
+        conn.close()
+    finally:
+        server.shutdown()
+
+
+def test_index_load_failure_is_a_json_error(monkeypatch):
+    def missing(country_code):
+        raise FileNotFoundError(f"no boundary file for {country_code}")
+
+    monkeypatch.setattr(region_service, "load_index", missing)
+    server = start_server(make_service())
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        conn.request("GET", "/lookup?country=nz&lat=-41.3&lon=174.8")
+        response = conn.getresponse()
+        assert response.status == 503
+        assert "no boundary file for nz" in json.loads(response.read())["error"]
+
+        # The connection survives for the next request
+        conn.request("POST", "/lookup/batch", body=json.dumps({"country": "nz", "points": [[-41.3, 174.8]]}))
+        assert conn.getresponse().status == 503
+        conn.close()
+    finally:
+        server.shutdown()
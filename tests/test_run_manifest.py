@@ -0,0 +1,63 @@
+
+# tests/test_run_manifest.py
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.run_manifest import (
+    HASH_COL, POS_COL, tag_rows, split_changed, merge_incremental, load_previous_run, save_manifest,
+)
+
+
+def fake_map(df):
+    # Stand-in for the spatial join: "b" sits in two overlapping regions
+    out = df.loc[df.index.repeat((df["suburb"] == "b") + 1)].copy()
+    out["final_region"] = out["suburb"].str.upper() + "-" + out["latitude"].astype(str)
+    return out
+
+
+def test_incremental_merge_matches_full_recompute():
+    before = tag_rows(pd.DataFrame({"suburb": ["a", "b", "c"], "latitude": [1.0, 2.0, 3.0]}))
+    previous = fake_map(before)
+    previous = previous[["suburb", "latitude", "final_region", HASH_COL, POS_COL]]
+
+    after = tag_rows(pd.DataFrame({"suburb": ["b", "c", "d", "a", "b"], "latitude": [2.0, 3.5, 4.0, 1.0, 2.0]}))
+    changed = split_changed(after, previous)
+    assert changed.tolist() == [False, True, True, False, False]
+
+    merged = merge_incremental(after, changed, previous, fake_map(after[changed]))
+    full = fake_map(after)[previous.columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(merged, full)
+
+
+def test_changed_boundary_columns_force_a_full_recompute(tmp_path):
+    output_path = str(tmp_path / "output.csv")
+    tagged = fake_map(tag_rows(pd.DataFrame({"suburb": ["a", "b"], "latitude": [1.0, 2.0]})))
+    tagged.drop(columns=[HASH_COL, POS_COL]).to_csv(output_path, index=False)
+    save_manifest(output_path, tagged, "hash", ["suburb", "latitude"], boundary_columns=["name"], index_version=3)
+
+    def previous(columns, version=3):
+        return load_previous_run(output_path, "hash", ["suburb", "latitude"], boundary_columns=columns,
+                                 index_version=version)
+
+    assert previous(["name"]) is not None
+    assert previous(["name", "TA2023_V1_00_NAME"]) is None
+    assert previous(["name"], version=4) is None
+
+
+def test_changed_clip_extent_forces_a_full_recompute(tmp_path):
+    output_path = str(tmp_path / "output.csv")
+    tagged = fake_map(tag_rows(pd.DataFrame({"suburb": ["a", "b"], "latitude": [1.0, 2.0]})))
+    tagged.drop(columns=[HASH_COL, POS_COL]).to_csv(output_path, index=False)
+    save_manifest(output_path, tagged, "hash", ["suburb", "latitude"], extent=(150.0, -34.0, 151.5, -33.0))
+
+    def previous(extent):
+        return load_previous_run(output_path, "hash", ["suburb", "latitude"], extent=extent)
+
+    assert previous((150.0, -34.0, 151.5, -33.0)) is not None
+    assert previous((150.0, -34.0, 152.0, -33.0)) is None  # index_right counts a different polygon subset
+    assert previous(None) is None
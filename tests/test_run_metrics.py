@@ -0,0 +1,29 @@
+
+# tests/test_run_metrics.py
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.run_metrics import METRICS_FILE, StageMetrics
+
+
+def test_stages_accumulate_and_append_json(tmp_path):
+    metrics = StageMetrics("au", metrics_dir=str(tmp_path), mode="full")
+    for chunk in ([1, 2], [3]):
+        with metrics.stage("sjoin", rows_in=len(chunk)):
+            sum(range(10_000))
+    assert list(metrics.timed_iter("load_input", iter("ab"))) == ["a", "b"]
+    metrics.add_rows("load_input", rows_out=2)
+
+    metrics.finish()
+    metrics.finish()
+    lines = (tmp_path / METRICS_FILE).read_text().splitlines()
+    assert len(lines) == 2
+    record = json.loads(lines[-1])
+    assert record["country"] == "au" and record["mode"] == "full"
+    stages = {s["stage"]: s for s in record["stages"]}
+    assert stages["sjoin"]["rows_in"] == 3 and stages["sjoin"]["wall_s"] > 0
+    assert stages["load_input"]["rows_out"] == 2
@@ -0,0 +1,52 @@
+
+# tests/test_schema.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.join_geocoded_with_region_fallback import assign_regions
+from scripts.schema import STORED_COORDINATE_DTYPE, SUBURB_DTYPE, apply_schema
+
+
+def test_regions_share_categories_and_values_survive():
+    df = pd.DataFrame({
+        "suburb": ["Sydney", "Parkes", None],
+        "state": ["NSW", "NSW", "VIC"],
+        "latitude": [-33.868812, -33.1, np.nan],
+        "longitude": [151.209288, 148.2, 144.9],
+        "assigned_region": ["Sydney - City", "Regional NSW", None],
+        "SA4_NAME21": pd.Categorical(["Sydney - City", "Central West", "Melbourne - Inner"]),
+    })
+    typed = apply_schema(df, "au", regions=["Hunter Valley"])
+
+    assert typed["state"].cat.categories.tolist() == ["NSW", "VIC"]
+    regions = typed["assigned_region"].cat.categories
+    assert regions.tolist() == sorted(["Central West", "Hunter Valley", "Melbourne - Inner", "Regional NSW", "Sydney - City"])
+    assert typed["SA4_NAME21"].cat.categories.equals(regions)
+    assert (typed["assigned_region"] == typed["SA4_NAME21"]).tolist() == [True, False, False]
+    assert typed["assigned_region"].tolist()[:2] == df["assigned_region"].tolist()[:2]
+    assert typed["assigned_region"].isna().tolist() == [False, False, True]
+
+    assert typed["suburb"].dtype == SUBURB_DTYPE
+    assert typed["latitude"].dtype == np.float32
+    big = pd.concat([df] * 1000, ignore_index=True)
+    assert apply_schema(big, "au").memory_usage(deep=True).sum() * 3 < big.memory_usage(deep=True).sum()
+
+    # Frames written back keep exact coordinates and the same row hashes
+    stored = apply_schema(df, "au", coordinate_dtype=STORED_COORDINATE_DTYPE)
+    assert stored["latitude"].tolist()[:2] == df["latitude"].tolist()[:2]
+    assert (pd.util.hash_pandas_object(stored, index=False) == pd.util.hash_pandas_object(df, index=False)).all()
+
+
+def test_fallback_labels_fit_into_typed_frames():
+    df_geo = apply_schema(pd.DataFrame({"suburb": ["Sydney", "Nowhere"], "state": ["NSW", "NSW"]}), "au")
+    df_map = apply_schema(pd.DataFrame({
+        "suburb": ["Sydney"], "state": ["NSW"], "assigned_region": ["Sydney - City"],
+    }), "au")
+    out = assign_regions(df_geo, df_map)
+    assert out["assigned_region"].tolist() == ["Sydney - City", "Regional NSW"]
@@ -0,0 +1,53 @@
+
+# tests/test_spatial_join_sal_to_sa4.py
+
+import os
+import sys
+
+import geopandas as gpd
+from shapely.geometry import box
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scripts.spatial_join_sal_to_sa4 as sal_join
+
+
+def write_inputs(tmp_path):
+    sa4 = gpd.GeoDataFrame(
+        {"SA4_NAME21": ["West", "East"], "STE_NAME21": ["New South Wales", "Victoria"]},
+        geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1)], crs="EPSG:7844",
+    )
+    sal = gpd.GeoDataFrame(
+        {"SAL_NAME21": ["Inside", "Straddler", "Offshore"], "STE_NAME21": ["New South Wales", "Victoria", "Other"]},
+        geometry=[box(0.2, 0.2, 0.4, 0.4), box(0.9, 0.2, 1.5, 0.4), box(5, 5, 6, 6)], crs="EPSG:7844",
+    )
+    sa4.to_file(tmp_path / "sa4.shp")
+    sal.to_file(tmp_path / "sal.shp")
+    return sal, sa4
+
+
+def test_fast_assignment_uses_largest_overlap(tmp_path):
+    sal, sa4 = write_inputs(tmp_path)
+    result = sal_join.assign_sal_to_sa4(sal, sa4)
+    assert result["assigned_region"].tolist()[:2] == ["West", "East"]
+    assert result["assigned_region"].isna().tolist() == [False, False, True]
+    assert result["state"].tolist() == ["New South Wales", "Victoria", "Other"]
+
+    # The within-join leaves the border-crossing locality unassigned
+    within = gpd.sjoin(sal, sa4, how="left", predicate="within")
+    assert within["SA4_NAME21"].isna().sum() == 2
+
+
+def test_mapping_is_cached_on_both_shapefiles(tmp_path, monkeypatch):
+    write_inputs(tmp_path)
+    monkeypatch.setattr(sal_join, "sal_path", str(tmp_path / "sal.shp"))
+    monkeypatch.setattr(sal_join, "sa4_path", str(tmp_path / "sa4.shp"))
+    monkeypatch.setattr(sal_join, "output_path", str(tmp_path / "mapping.csv"))
+    monkeypatch.setattr(sal_join, "CACHE_DIR", str(tmp_path / "cache"))
+
+    sal_join.main(output_format="csv")
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+    monkeypatch.setattr(sal_join.gpd, "read_file", lambda *a, **k: (_ for _ in ()).throw(AssertionError("re-read")))
+    sal_join.main(output_format="parquet")
+    assert os.path.exists(tmp_path / "mapping.parquet")
@@ -0,0 +1,43 @@
+
+# tests/test_table_io.py
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.table_io import TableWriter, iter_table, read_table
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_streamed_write_survives_a_null_only_first_chunk(tmp_path, fmt):
+    source = tmp_path / "input.csv"
+    pd.DataFrame({
+        "suburb": [f"s{i}" for i in range(30)],
+        "latitude": [-33.0] * 30,
+        "fallback_distance_km": [None] * 25 + [4.5] * 5,
+        "final_region": ["West"] * 10 + [None] * 10 + ["East"] * 10,
+        "region_source": [None] * 20 + ["nominatim"] * 10,
+        "region_patched_at": [None] * 20 + ["2026-10-18"] * 10,
+    }).to_csv(source, index=False)
+
+    path = str(tmp_path / f"output.{fmt}")
+    writer = TableWriter(path)
+    for chunk in iter_table(str(source), chunksize=10):
+        writer.write(chunk)
+    writer.close()
+
+    out = read_table(path)
+    assert out["region_patched_at"].tolist() == [None] * 20 + ["2026-10-18"] * 10
+    assert out["region_source"].astype(object).iloc[-1] == "nominatim"
+    assert out["final_region"].astype(object).iloc[[0, 29]].tolist() == ["West", "East"]
+    assert out["final_region"].isna().sum() == 10
+    assert out["fallback_distance_km"].iloc[-1] == 4.5
+
+    schema = pq.read_schema(path) if fmt == "parquet" else feather.read_table(path).schema
+    assert str(schema.field("final_region").type).startswith("dictionary")